@@ -0,0 +1,154 @@
+import threading
+import time
+from functools import wraps
+
+from flask import current_app
+from flask_jwt_extended import get_jwt_claims, get_jwt_identity, get_raw_jwt
+
+from app.database.models.admin_revocation import AdminRevocationModel
+from app.database.models.revoked_token import RevokedTokenModel
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+
+
+class AdminRevocations:
+    """
+    Registry of the users whose admin status was revoked, used to reject
+    the admin claim of the tokens they got before.
+
+    Revocations are stored in the database and copied in memory, so
+    checking a token does not need a query. The copy is synchronized with
+    the database every ADMIN_REVOCATIONS_SYNC_SECONDS, which bounds how long
+    the other processes trust an admin claim after it was revoked. The
+    process where the revocation happens updates its copy at once.
+    """
+
+    def __init__(self):
+        self.revoked_at_by_user_id = {}
+        self.synced_at = None
+        self.lock = threading.Lock()
+
+    def revoke(self, user_id):
+        revoked_at = time.time()
+        revocation = AdminRevocationModel.find_by_user_id(user_id)
+        if revocation is None:
+            revocation = AdminRevocationModel(user_id, revoked_at)
+        revocation.revoked_at = revoked_at
+        db.session.add(revocation)
+        db.session.commit()
+
+        with self.lock:
+            self.revoked_at_by_user_id[user_id] = revoked_at
+
+    def restore(self, user_id):
+        """Trusts again the admin claims of the user, who became admin again."""
+        AdminRevocationModel.query.filter_by(user_id=user_id).delete()
+        db.session.commit()
+
+        with self.lock:
+            self.revoked_at_by_user_id.pop(user_id, None)
+
+    def is_revoked(self, user_id, issued_at):
+        """Returns True if the admin status of the user was revoked after the token was issued."""
+        self.sync_if_outdated()
+        revoked_at = self.revoked_at_by_user_id.get(user_id)
+        return revoked_at is not None and issued_at <= revoked_at
+
+    def sync_if_outdated(self):
+        now = time.monotonic()
+        if self.synced_at is not None and now - self.synced_at < current_app.config['ADMIN_REVOCATIONS_SYNC_SECONDS']:
+            return
+
+        revoked_at_by_user_id = dict(db.session.query(AdminRevocationModel.user_id, AdminRevocationModel.revoked_at))
+        with self.lock:
+            self.revoked_at_by_user_id = revoked_at_by_user_id
+            self.synced_at = now
+
+
+admin_revocations = AdminRevocations()
+
+
+class TokenRevocations:
+    """
+    Registry of the revoked access and refresh tokens, e.g. at logout,
+    checked on every authenticated request.
+
+    Revocations are stored in the database and the ids of the revoked
+    tokens are copied in memory, so checking a token is a set lookup
+    without a query. Every TOKEN_REVOCATIONS_SYNC_SECONDS the copy loads
+    the revocations made since the last synchronization by the other
+    processes. A revocation is forgotten once its token has expired, since
+    the token is rejected anyway.
+    """
+
+    def __init__(self):
+        self.expires_at_by_jti = {}
+        self.last_revoked_at = 0
+        self.synced_at = None
+        self.lock = threading.Lock()
+
+    def revoke(self, decoded_token):
+        now = time.time()
+        RevokedTokenModel.query.filter(RevokedTokenModel.expires_at < now).delete()
+        db.session.merge(RevokedTokenModel(decoded_token['jti'], now, decoded_token['exp']))
+        db.session.commit()
+
+        with self.lock:
+            self.expires_at_by_jti[decoded_token['jti']] = decoded_token['exp']
+
+    def is_revoked(self, jti):
+        self.sync_if_outdated()
+        return jti in self.expires_at_by_jti
+
+    def sync_if_outdated(self):
+        now = time.monotonic()
+        if self.synced_at is not None and now - self.synced_at < current_app.config['TOKEN_REVOCATIONS_SYNC_SECONDS']:
+            return
+
+        # a revocation can be committed after a later one was loaded, so the last second is loaded again
+        new_revocations = db.session.query(
+            RevokedTokenModel.jti, RevokedTokenModel.revoked_at, RevokedTokenModel.expires_at
+        ).filter(RevokedTokenModel.revoked_at >= self.last_revoked_at - 1).all()
+
+        current_time = time.time()
+        with self.lock:
+            for jti, revoked_at, expires_at in new_revocations:
+                self.expires_at_by_jti[jti] = expires_at
+                self.last_revoked_at = max(self.last_revoked_at, revoked_at)
+            self.expires_at_by_jti = {jti: expires_at for jti, expires_at in self.expires_at_by_jti.items()
+                                      if expires_at > current_time}
+            self.synced_at = now
+
+
+token_revocations = TokenRevocations()
+
+
+def is_current_user_admin():
+    claims = get_jwt_claims()
+    user_id = get_jwt_identity()
+
+    if 'is_admin' not in claims:
+        # tokens issued before the claims were added to them
+        user = UserModel.find_by_id(user_id)
+        return user is not None and bool(user.is_admin)
+
+    return claims['is_admin'] and not admin_revocations.is_revoked(user_id, get_raw_jwt()['iat'])
+
+
+def admin_required(message):
+    """
+    Decorator that only lets admins call a resource method, using the
+    admin claim of the access token. It has to be placed below jwt_required.
+
+    :param message: message of the 403 response returned to other users
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_current_user_admin():
+                return {"message": message}, 403
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
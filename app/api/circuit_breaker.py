@@ -0,0 +1,68 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Stops the calls to a failing service for a while.
+
+    After failure_threshold consecutive failures the circuit opens and no
+    calls are made for reset_seconds. Then a single trial call is let
+    through, which closes the circuit when it succeeds and opens it again
+    when it fails. A trial that ends without either, because it was
+    cancelled or never reported back within reset_seconds, lets another
+    call be the trial.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold, reset_seconds):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CircuitBreaker.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+        self.lock = threading.Lock()
+
+    def get_seconds_until_call(self):
+        """Returns 0 when a call can be made now, otherwise the seconds to wait before asking again."""
+        with self.lock:
+            if self.state == CircuitBreaker.CLOSED:
+                return 0
+
+            if self.state == CircuitBreaker.OPEN:
+                remaining_seconds = self.opened_at + self.reset_seconds - time.monotonic()
+                if remaining_seconds > 0:
+                    return remaining_seconds
+                self.state = CircuitBreaker.HALF_OPEN
+                self.trial_started_at = time.monotonic()
+                return 0
+
+            # a trial call is running, unless it was cancelled or timed out
+            if self.trial_started_at is not None:
+                remaining_seconds = self.trial_started_at + self.reset_seconds - time.monotonic()
+                if remaining_seconds > 0:
+                    return remaining_seconds
+            self.trial_started_at = time.monotonic()
+            return 0
+
+    def cancel_trial(self):
+        """Ends a trial call that did not reach the service, so the next call is the trial instead."""
+        with self.lock:
+            if self.state == CircuitBreaker.HALF_OPEN:
+                self.trial_started_at = None
+
+    def record_success(self):
+        with self.lock:
+            self.state = CircuitBreaker.CLOSED
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.state == CircuitBreaker.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = CircuitBreaker.OPEN
+                self.opened_at = time.monotonic()
@@ -1,8 +1,33 @@
-from app.database.models.user import UserModel
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import chain
+
+from app.api.authorization import admin_revocations
+from app.api.login_throttle import login_throttle
+from app.database.models.user import UserModel, users_cache
+from app.database.sqlalchemy_extension import db
 
 
 class AdminDAO:
 
+    # user fields admins can export, every column except the password hash
+    EXPORTABLE_USER_FIELDS = (
+        'id', 'name', 'username', 'email', 'registration_date', 'terms_and_conditions_checked', 'is_admin',
+        'is_email_verified', 'email_verification_date', 'current_mentorship_role', 'membership_status', 'bio',
+        'location', 'occupation', 'organization', 'slack_username', 'social_media_links', 'skills', 'interests',
+        'resume_url', 'photo_url', 'need_mentoring', 'available_to_mentor', 'updated_at'
+    )
+
+    # number of users fetched from the database at a time while exporting
+    EXPORT_BATCH_SIZE = 1000
+
+    EXPORT_MIMETYPES = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv'
+    }
+
     @staticmethod
     def assign_new_user(assigner_user_id, data):
 
@@ -20,6 +45,7 @@ class AdminDAO:
 
             new_admin_user.is_admin = True
             new_admin_user.save_to_db()
+            admin_revocations.restore(new_admin_user.id)
 
             return {"message": "User is now an Admin."}, 200
 
@@ -42,7 +68,64 @@ class AdminDAO:
 
             new_admin_user.is_admin = False
             new_admin_user.save_to_db()
+            # the admin claim of the tokens the user already has stops being trusted
+            admin_revocations.revoke(new_admin_user.id)
 
             return {"message": "User admin status was revoked."}, 200
 
         return {"message": "User does not exist."}, 404
+
+    @staticmethod
+    def export_users(columns=None, export_format='ndjson'):
+        """
+        Returns a generator of the users in the given format, one chunk of
+        text per user, which only ever holds one batch of users in memory.
+
+        :param columns: user fields to export, all exportable fields by default
+        :param export_format: either 'ndjson' or 'csv'
+        """
+        if not columns:
+            columns = AdminDAO.EXPORTABLE_USER_FIELDS
+
+        invalid_columns = [column for column in columns if column not in AdminDAO.EXPORTABLE_USER_FIELDS]
+        if invalid_columns:
+            return {"message": "These fields cannot be exported: %s." % ', '.join(invalid_columns)}, 400
+
+        query = db.session.query(*[getattr(UserModel, column) for column in columns]) \
+            .order_by(UserModel.id) \
+            .yield_per(AdminDAO.EXPORT_BATCH_SIZE)
+
+        if export_format == 'csv':
+            return AdminDAO.generate_csv(columns, query), 200
+        return AdminDAO.generate_ndjson(columns, query), 200
+
+    @staticmethod
+    def get_export_value(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def generate_ndjson(columns, rows):
+        for row in rows:
+            yield json.dumps({column: AdminDAO.get_export_value(value) for column, value in zip(columns, row)}) + '\n'
+
+    @staticmethod
+    def generate_csv(columns, rows):
+        # the writer fills a reusable buffer, which is emptied after every line
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        for values in chain([columns], rows):
+            writer.writerow([AdminDAO.get_export_value(value) for value in values])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    @staticmethod
+    def get_metrics():
+        """Returns the counters of the in-memory components of this process."""
+        return {
+            'login_throttle': login_throttle.get_stats(),
+            'users_cache': users_cache.get_stats()
+        }, 200
@@ -0,0 +1,138 @@
+import smtplib
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import or_
+
+from app.api.circuit_breaker import CircuitBreaker
+from app.api.mail_extension import mail
+from app.database.models.email_outbox import EmailOutboxModel
+from app.database.sqlalchemy_extension import db
+
+
+class EmailOutboxDAO:
+
+    # errors of a single message, after which the SMTP connection can send the next ones
+    MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+    @staticmethod
+    def claim_emails(dispatcher_id, batch_size):
+        """
+        Claims a batch of unsent emails that are due for a dispatcher and
+        returns them.
+
+        The emails are claimed with an UPDATE that checks they are still
+        unclaimed, so concurrent dispatchers never claim the same email.
+        The claims of a dispatcher that died expire after
+        EMAIL_OUTBOX_CLAIM_SECONDS and the emails are claimed again.
+        """
+        now = datetime.now()
+        claim_expiration = now - timedelta(seconds=current_app.config['EMAIL_OUTBOX_CLAIM_SECONDS'])
+
+        is_claimable = or_(EmailOutboxModel.claimed_at.is_(None), EmailOutboxModel.claimed_at < claim_expiration)
+
+        claimable_ids = [email_id for email_id, in db.session.query(EmailOutboxModel.id).filter(
+            EmailOutboxModel.sent_at.is_(None),
+            EmailOutboxModel.attempts < current_app.config['EMAIL_OUTBOX_MAX_ATTEMPTS'],
+            or_(EmailOutboxModel.next_attempt_at.is_(None), EmailOutboxModel.next_attempt_at <= now),
+            is_claimable
+        ).order_by(EmailOutboxModel.id).limit(batch_size)]
+        if not claimable_ids:
+            return []
+
+        # the claim condition is checked again, in case another dispatcher claimed some of the emails meanwhile
+        EmailOutboxModel.query.filter(EmailOutboxModel.id.in_(claimable_ids), is_claimable) \
+            .update({'claimed_by': dispatcher_id, 'claimed_at': now}, synchronize_session=False)
+        db.session.commit()
+
+        return EmailOutboxModel.query.filter_by(claimed_by=dispatcher_id, sent_at=None) \
+            .order_by(EmailOutboxModel.id).all()
+
+    @staticmethod
+    def dispatch_emails(batch_size=None):
+        """
+        Sends a batch of emails of the outbox over one SMTP connection.
+
+        Sent emails are marked as sent. An email that the SMTP server
+        refuses is released to be retried after
+        EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS, doubled after every attempt, up
+        to EMAIL_OUTBOX_MAX_ATTEMPTS attempts. If the SMTP server cannot be
+        reached or the connection breaks, the rest of the batch is released
+        without counting an attempt, and the circuit breaker of the
+        dispatchers stops them from connecting again for a while after
+        MAIL_CIRCUIT_BREAKER_THRESHOLD such failures in a row.
+
+        :return: number of emails sent and number of emails that were not sent
+        """
+        if batch_size is None:
+            batch_size = current_app.config['EMAIL_OUTBOX_BATCH_SIZE']
+
+        circuit_breaker = EmailOutboxDAO.get_circuit_breaker()
+        if circuit_breaker.get_seconds_until_call() > 0:
+            return 0, 0
+
+        is_call_recorded = False
+        try:
+            emails = EmailOutboxDAO.claim_emails(uuid.uuid4().hex, batch_size)
+            if not emails:
+                return 0, 0
+            sent_count, failed_count = EmailOutboxDAO.send_emails(emails, circuit_breaker)
+            is_call_recorded = True
+            return sent_count, failed_count
+        finally:
+            # a pass that did not reach the SMTP server, e.g. without due emails, is not a trial of the server
+            if not is_call_recorded:
+                circuit_breaker.cancel_trial()
+
+    @staticmethod
+    def send_emails(emails, circuit_breaker):
+        """Sends claimed emails over one SMTP connection, recording its success or failure in circuit_breaker."""
+        sent_count = 0
+        failed_count = 0
+        pending_emails = list(emails)
+        try:
+            with mail.connect() as connection:
+                circuit_breaker.record_success()
+                while pending_emails:
+                    email = pending_emails[0]
+                    try:
+                        connection.send(Message(email.subject, recipients=[email.recipient], html=email.html,
+                                                sender=current_app.config['MAIL_DEFAULT_SENDER']))
+                    except EmailOutboxDAO.MESSAGE_ERRORS as error:
+                        EmailOutboxDAO.release_email(email, error)
+                        failed_count += 1
+                    else:
+                        email.sent_at = datetime.now()
+                        email.attempts += 1
+                        sent_count += 1
+                    pending_emails.pop(0)
+                    # each email is marked right away, so it is not sent twice if the dispatcher dies
+                    db.session.commit()
+        except (smtplib.SMTPException, OSError) as error:
+            # the SMTP server failed, not the emails, so they are released without counting an attempt
+            circuit_breaker.record_failure()
+            for email in pending_emails:
+                email.last_error = str(error)
+                email.claimed_by = None
+                email.claimed_at = None
+            failed_count += len(pending_emails)
+            db.session.commit()
+
+        return sent_count, failed_count
+
+    @staticmethod
+    def release_email(email, error):
+        email.attempts += 1
+        email.last_error = str(error)
+        email.claimed_by = None
+        email.claimed_at = None
+        backoff_seconds = current_app.config['EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS'] * 2 ** (email.attempts - 1)
+        email.next_attempt_at = datetime.now() + timedelta(seconds=backoff_seconds)
+
+    @staticmethod
+    def get_circuit_breaker():
+        # one per application, kept between batches so every dispatcher thread of the process stops together
+        return current_app.extensions.setdefault('email_outbox_circuit_breaker', CircuitBreaker(
+            current_app.config['MAIL_CIRCUIT_BREAKER_THRESHOLD'], current_app.config['MAIL_CIRCUIT_BREAKER_RESET_SECONDS']))
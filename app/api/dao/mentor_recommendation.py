@@ -0,0 +1,195 @@
+import hashlib
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import and_, or_
+
+from app.api.dao.user import UserDAO
+from app.database.models.mentor_recommendation import MentorRecommendationModel, MentorRecommendationsRunModel
+from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.models.user import UserModel
+from app.database.models.users_version import UsersVersionModel
+from app.database.sqlalchemy_extension import db
+from app.matching.mentor_matching_engine import MentorMatchingEngine
+
+
+class MentorRecommendationDAO:
+
+    DEFAULT_NUMBER_OF_RECOMMENDATIONS = 10
+    MAX_NUMBER_OF_RECOMMENDATIONS = 50
+
+    # number of mentees whose recommendations are written per transaction
+    PRECOMPUTATION_CHUNK_SIZE = 1000
+
+    @staticmethod
+    def available_mentors_filter():
+        return and_(UserModel.available_to_mentor == True,
+                    ~MentorshipRelationModel.has_accepted_relation(UserModel.id))
+
+    @staticmethod
+    def get_available_mentors():
+        """
+        Returns (id, skills, location, organization) rows of the users
+        available to mentor who are not in an accepted mentorship relation.
+        """
+        return db.session.query(UserModel.id, UserModel.skills, UserModel.location, UserModel.organization) \
+            .filter(MentorRecommendationDAO.available_mentors_filter()) \
+            .order_by(UserModel.id) \
+            .all()
+
+    @staticmethod
+    def get_mentors_fingerprint(mentors):
+        """
+        Returns a digest that changes whenever a mentor is added or removed,
+        or the skills, location or organization the mentors are scored by
+        change. Other updates of the mentors, such as logins, keep it.
+        """
+        digest = hashlib.sha1()
+        for mentor in mentors:
+            digest.update(repr(tuple(mentor)).encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def build_matching_engine(mentors):
+        use_lsh = len(mentors) >= current_app.config['MENTOR_MATCHING_LSH_THRESHOLD']
+        return MentorMatchingEngine(mentors, use_lsh=use_lsh)
+
+    @staticmethod
+    def get_matching_engine():
+        """
+        Returns the matching engine of the available mentors kept by the
+        application. The mentors are only loaded and the engine built again
+        when the users version changed, which happens whenever a user is
+        added, updated or removed, or joins or leaves an accepted relation.
+        """
+        users_version = UsersVersionModel.get_version()
+        cached_users_version, engine = current_app.extensions.get('mentor_matching_engine', (None, None))
+        if cached_users_version != users_version:
+            engine = MentorRecommendationDAO.keep_matching_engine(
+                users_version, MentorRecommendationDAO.get_available_mentors())
+        return engine
+
+    @staticmethod
+    def keep_matching_engine(users_version, mentors):
+        """Builds the matching engine of the mentors loaded at users_version and keeps it for the requests."""
+        engine = MentorRecommendationDAO.build_matching_engine(mentors)
+        # replaced as one tuple, so concurrent requests never see an engine with another version
+        current_app.extensions['mentor_matching_engine'] = (users_version, engine)
+        return engine
+
+    @staticmethod
+    def recommend_mentors(user_id, limit=None):
+
+        user = UserModel.find_by_id(user_id)
+        if user is None:
+            return {'message': 'User does not exist.'}, 404
+
+        if not user.need_mentoring:
+            return {'message': 'You are not available to be mentored.'}, 400
+
+        if limit is None:
+            limit = MentorRecommendationDAO.DEFAULT_NUMBER_OF_RECOMMENDATIONS
+        limit = min(limit, MentorRecommendationDAO.MAX_NUMBER_OF_RECOMMENDATIONS)
+
+        last_run = MentorRecommendationsRunModel.find_last()
+        if last_run is not None and user.updated_at is not None and user.updated_at < last_run.started_at:
+            return MentorRecommendationDAO.get_precomputed_recommendations(user_id, limit), 200
+
+        # the profile changed after the last precomputation, so it is computed now
+        engine = MentorRecommendationDAO.get_matching_engine()
+        top_mentors = engine.get_top_mentors(user.interests, user.location, user.organization,
+                                             k=limit, exclude_ids={user_id})
+
+        return MentorRecommendationDAO.get_mentors_profiles(user_id, top_mentors), 200
+
+    @staticmethod
+    def get_precomputed_recommendations(user_id, limit):
+        """
+        Returns the stored recommendations of a mentee, reading them through
+        the primary key index. Mentors that stopped being available since
+        the last precomputation are left out.
+        """
+        rows = UserDAO.public_users_query(user_id) \
+            .add_columns(MentorRecommendationModel.score) \
+            .join(MentorRecommendationModel, MentorRecommendationModel.mentor_id == UserModel.id) \
+            .filter(MentorRecommendationModel.mentee_id == user_id,
+                    MentorRecommendationDAO.available_mentors_filter()) \
+            .order_by(MentorRecommendationModel.rank) \
+            .limit(limit) \
+            .all()
+        return [row._asdict() for row in rows]
+
+    @staticmethod
+    def precompute_recommendations():
+        """
+        Stores the top mentors of every mentee who needs mentoring.
+
+        When the available mentors are the same as in the last run, only
+        the mentees whose profile changed since then are computed again.
+        Otherwise the recommendations of every mentee are replaced. The
+        rows of each chunk of mentees are replaced in one transaction, so
+        mentees keep their previous recommendations until then.
+
+        :return: the number of mentees whose recommendations were computed
+        """
+        started_at = datetime.now()
+        users_version = UsersVersionModel.get_version()
+        mentors = MentorRecommendationDAO.get_available_mentors()
+        mentors_fingerprint = MentorRecommendationDAO.get_mentors_fingerprint(mentors)
+        last_run = MentorRecommendationsRunModel.find_last()
+
+        recommendations_table = MentorRecommendationModel.__table__
+        mentees_query = db.session.query(UserModel.id, UserModel.interests, UserModel.location,
+                                         UserModel.organization) \
+            .filter(UserModel.need_mentoring == True)
+
+        if last_run is not None and last_run.mentors_fingerprint == mentors_fingerprint:
+            mentees_query = mentees_query.filter(or_(UserModel.updated_at == None,
+                                                     UserModel.updated_at >= last_run.started_at))
+
+        # users deleted or no longer needing mentoring keep no recommendations
+        mentees_ids = db.session.query(UserModel.id).filter(UserModel.need_mentoring == True)
+        db.session.execute(recommendations_table.delete().where(
+            ~recommendations_table.c.mentee_id.in_(mentees_ids.subquery())))
+        db.session.commit()
+
+        mentees = mentees_query.all()
+        # the job builds the engine the requests use afterwards
+        engine = MentorRecommendationDAO.keep_matching_engine(users_version, mentors)
+        number_of_recommendations = MentorRecommendationDAO.MAX_NUMBER_OF_RECOMMENDATIONS
+
+        for start in range(0, len(mentees), MentorRecommendationDAO.PRECOMPUTATION_CHUNK_SIZE):
+            chunk = mentees[start:start + MentorRecommendationDAO.PRECOMPUTATION_CHUNK_SIZE]
+
+            recommendations = []
+            for mentee in chunk:
+                top_mentors = engine.get_top_mentors(mentee.interests, mentee.location, mentee.organization,
+                                                     k=number_of_recommendations, exclude_ids={mentee.id})
+                recommendations += [{'mentee_id': mentee.id, 'rank': rank, 'mentor_id': mentor_id, 'score': score}
+                                    for rank, (mentor_id, score) in enumerate(top_mentors)]
+
+            db.session.execute(recommendations_table.delete().where(
+                recommendations_table.c.mentee_id.in_([mentee.id for mentee in chunk])))
+            if recommendations:
+                db.session.execute(recommendations_table.insert(), recommendations)
+            db.session.commit()
+
+        MentorRecommendationsRunModel(started_at, mentors_fingerprint, len(mentees)).save_to_db()
+        return len(mentees)
+
+    @staticmethod
+    def get_mentors_profiles(user_id, mentors_scores):
+        """Returns the public profiles of the (mentor id, score) pairs, with their score."""
+        mentors_ids = [mentor_id for mentor_id, _ in mentors_scores]
+        if not mentors_ids:
+            return []
+
+        rows = UserDAO.public_users_query(user_id).filter(UserModel.id.in_(mentors_ids)).all()
+        profiles_by_id = {row.id: row._asdict() for row in rows}
+
+        recommendations = []
+        for mentor_id, score in mentors_scores:
+            if mentor_id in profiles_by_id:
+                recommendations += [dict(profiles_by_id[mentor_id], score=score)]
+
+        return recommendations
@@ -1,8 +1,12 @@
 from datetime import datetime, timedelta
 
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import joinedload
+
 from app.database.models.mentorship_relation import MentorshipRelationModel
 from app.database.models.tasks_list import TasksListModel
 from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
 from app.utils.enum_utils import MentorshipRelationState
 
 
@@ -10,6 +14,10 @@ class MentorshipRelationDAO:
 
     MAXIMUM_MENTORSHIP_DURATION = timedelta(weeks=24)  # 6 months = approximately 6*4
     MINIMUM_MENTORSHIP_DURATION = timedelta(weeks=4)
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 100
+    NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+    TOTAL_COUNT_HEADER = 'X-Total-Count'
 
     def create_mentorship_relation(self, user_id, data):
         action_user_id = user_id
@@ -61,17 +69,13 @@ class MentorshipRelationDAO:
             return {'message': 'Mentee user is not available to be mentored.'}, 400
 
 
-        # TODO add tests for this portion
-
-        all_mentor_relations = mentor_user.mentor_relations + mentor_user.mentee_relations
-        for relation in all_mentor_relations:
-            if relation.state is MentorshipRelationState.ACCEPTED:
-                return {'message': 'Mentor user is already in a relationship.'}, 400
+        # validate if mentor is not in a relation already
+        if mentor_user.active_relation_id is not None:
+            return {'message': 'Mentor user is already in a relationship.'}, 400
 
-        all_mentee_relations = mentee_user.mentor_relations + mentee_user.mentee_relations
-        for relation in all_mentee_relations:
-            if relation.state is MentorshipRelationState.ACCEPTED:
-                return {'message': 'Mentee user is already in a relationship.'}, 400
+        # validate if mentee is not in a relation already
+        if mentee_user.active_relation_id is not None:
+            return {'message': 'Mentee user is already in a relationship.'}, 400
 
         # All validations were checked
 
@@ -92,30 +96,139 @@ class MentorshipRelationDAO:
         return {'message': 'Mentorship relation was sent successfully.'}, 200
 
     @staticmethod
-    def list_mentorship_relations(user_id=None, accepted=None, pending=None, completed=None, cancelled=None, rejected=None):
-        if pending is not None:
-            return {'message': 'Not implemented.'}, 200
-        if completed is not None:
-            return {'message': 'Not implemented.'}, 200
-        if cancelled is not None:
-            return {'message': 'Not implemented.'}, 200
-        if accepted is not None:
-            return {'message': 'Not implemented.'}, 200
-        if rejected is not None:
-            return {'message': 'Not implemented.'}, 200
-
+    def list_mentorship_relations(user_id=None, accepted=None, pending=None, completed=None, cancelled=None, rejected=None,
+                                  after=None, limit=None, include_total=False):
+        """
+        Lists one page of the mentorship relations of a user, from the most
+        recent. If any of the state flags is True, only the relations in the
+        flagged states are listed.
+        """
         user = UserModel.find_by_id(user_id)
 
         if user is None:
             return {'message': 'User does not exist.'}, 404
 
-        all_relations = user.mentor_relations + user.mentee_relations
+        state_flags = {
+            MentorshipRelationState.ACCEPTED: accepted,
+            MentorshipRelationState.PENDING: pending,
+            MentorshipRelationState.COMPLETED: completed,
+            MentorshipRelationState.CANCELLED: cancelled,
+            MentorshipRelationState.REJECTED: rejected
+        }
+        states = [state for state, flag in state_flags.items() if flag]
+
+        criteria = [MentorshipRelationModel.state.in_(states)] if states else []
+        return MentorshipRelationDAO.get_relations_page(user_id, criteria, after, limit, include_total)
+
+    @staticmethod
+    def get_relations_query(user_id, *criteria):
+        # the mentor and mentee ids and names are part of the listing, so they are loaded in the same query
+        return MentorshipRelationModel.query \
+            .options(joinedload(MentorshipRelationModel.mentor).load_only('id', 'name'),
+                     joinedload(MentorshipRelationModel.mentee).load_only('id', 'name')) \
+            .filter(MentorshipRelationModel.involves_user(user_id), *criteria)
+
+    @staticmethod
+    def get_relations(user_id, *criteria):
+        """
+        Returns the mentorship relations of a user that meet the given
+        criteria, filtered by the database, with the extra sent_by_me field
+        of the API response.
+        """
+        relations = MentorshipRelationDAO.get_relations_query(user_id, *criteria) \
+            .order_by(MentorshipRelationModel.id) \
+            .all()
+
+        for relation in relations:
+            setattr(relation, 'sent_by_me', relation.action_user_id == user_id)
+
+        return relations
 
-        # add extra field for api response
-        for relation in all_relations:
+    @staticmethod
+    def get_relations_page(user_id, criteria, after=None, limit=None, include_total=False):
+        """
+        Returns one page of the mentorship relations of a user that meet the
+        given criteria, ordered from the most recent.
+
+        Pages are seeked with (creation_date, id) < after instead of using
+        OFFSET, so every page costs the same. When there are more relations
+        to list, the cursor to send as after for the next page is returned in
+        the X-Next-Cursor header. If include_total is True, the number of
+        relations of all pages is returned in the X-Total-Count header.
+        """
+        if limit is None:
+            limit = MentorshipRelationDAO.DEFAULT_PAGE_SIZE
+        limit = min(limit, MentorshipRelationDAO.MAX_PAGE_SIZE)
+
+        query = MentorshipRelationDAO.get_relations_query(user_id, *criteria)
+        if after is not None:
+            after_creation_date, after_id = after
+            query = query.filter(or_(MentorshipRelationModel.creation_date < after_creation_date,
+                                     and_(MentorshipRelationModel.creation_date == after_creation_date,
+                                          MentorshipRelationModel.id < after_id)))
+
+        # fetching one extra row tells if there is a next page
+        relations = query.order_by(MentorshipRelationModel.creation_date.desc(), MentorshipRelationModel.id.desc()) \
+            .limit(limit + 1) \
+            .all()
+
+        headers = {}
+        if len(relations) > limit:
+            relations = relations[:limit]
+            headers[MentorshipRelationDAO.NEXT_CURSOR_HEADER] = MentorshipRelationDAO.get_cursor(relations[-1])
+        if include_total:
+            headers[MentorshipRelationDAO.TOTAL_COUNT_HEADER] = MentorshipRelationDAO.count_relations(user_id, *criteria)
+
+        for relation in relations:
             setattr(relation, 'sent_by_me', relation.action_user_id == user_id)
 
-        return all_relations, 200
+        return relations, 200, headers
+
+    @staticmethod
+    def get_cursor(relation):
+        # repr keeps every digit of the timestamp, so the cursor matches the relation exactly
+        return '%r,%d' % (relation.creation_date, relation.id)
+
+    @staticmethod
+    def count_relations(user_id, *criteria):
+        """
+        Returns the number of mentorship relations of a user that meet the
+        given criteria. Without criteria, the counter of relations kept in
+        the user row is read. Otherwise the relations are counted: the
+        relations as mentor and as mentee are found with two index scans,
+        merged, and read to check the criteria.
+        """
+        if not criteria:
+            return db.session.query(UserModel.number_of_relations).filter(UserModel.id == user_id).scalar()
+
+        return db.session.query(func.count(MentorshipRelationModel.id)) \
+            .filter(MentorshipRelationModel.involves_user(user_id), *criteria) \
+            .scalar()
+
+    @staticmethod
+    def get_relations_version(user_id, *criteria):
+        """
+        Returns the version marker of the mentorship relations of a user,
+        None if the user does not exist. It is read from the user row: the
+        relations version is increased in the flush of every change of the
+        user relations and of the names of the other users in them.
+        """
+        return db.session.query(UserModel.id, UserModel.updated_at, UserModel.relations_version) \
+            .filter(UserModel.id == user_id) \
+            .first()
+
+    @staticmethod
+    def get_pending_relations_version(user_id):
+        relations_version = MentorshipRelationDAO.get_relations_version(user_id)
+        if relations_version is None:
+            return None
+
+        # pending requests stop being listed once their end date passes, which changes the count
+        number_of_pending_relations = MentorshipRelationDAO.count_relations(
+            user_id,
+            MentorshipRelationModel.state == MentorshipRelationState.PENDING,
+            MentorshipRelationModel.end_date > datetime.now().timestamp())
+        return tuple(relations_version) + (number_of_pending_relations,)
 
     @staticmethod
     def accept_request(user_id, request_id):
@@ -144,16 +257,20 @@ class MentorshipRelationDAO:
         if not (request.mentee_id is user_id or request.mentor_id is user_id):
             return {'message': 'You cannot accept a mentorship relation where you are not involved.'}, 400
 
-        requests = user.mentee_relations + user.mentor_relations
-
         # verify if I'm on a current relation
-        for request in requests:
-            if request.state is MentorshipRelationState.ACCEPTED:
-                return {'message': 'You are currently involved in a mentorship relation.'}, 400
+        if user.active_relation_id is not None:
+            return {'message': 'You are currently involved in a mentorship relation.'}, 400
+
+        # verify if both users are still free, while marking them as in this relation
+        user_ids = [request.mentor_id, request.mentee_id]
+        if not UserModel.set_active_relation(user_ids, request.id):
+            db.session.rollback()
+            return {'message': 'A user of this mentorship relation is currently involved in another one.'}, 400
 
         # All was checked
         request.state = MentorshipRelationState.ACCEPTED
         request.save_to_db()
+        UserModel.invalidate_cached_users(user_ids)
 
         return {'message': 'Mentorship relation was accepted successfully.'}, 200
 
@@ -215,7 +332,9 @@ class MentorshipRelationDAO:
 
         # All was checked
         request.state = MentorshipRelationState.CANCELLED
+        user_ids = UserModel.clear_active_relations([request.id])
         request.save_to_db()
+        UserModel.invalidate_cached_users(user_ids)
 
         return {'message': 'Mentorship relation was cancelled successfully.'}, 200
 
@@ -248,7 +367,11 @@ class MentorshipRelationDAO:
         return {'message': 'Mentorship relation was deleted successfully.'}, 200
 
     @staticmethod
-    def list_past_mentorship_relations(user_id):
+    def list_past_mentorship_relations(user_id, after=None, limit=None, include_total=False):
+        """
+        Lists one page of the mentorship relations of a user whose end date
+        has passed, from the most recent.
+        """
 
         user = UserModel.find_by_id(user_id)
 
@@ -256,16 +379,8 @@ class MentorshipRelationDAO:
         if user is None:
             return {'message': 'User does not exist.'}, 404
 
-        now_timestamp = datetime.now().timestamp()
-        past_relations = []
-        all_relations = user.mentor_relations + user.mentee_relations
-
-        for relation in all_relations:
-            if relation.end_date < now_timestamp:
-                setattr(relation, 'sent_by_me', relation.action_user_id == user_id)
-                past_relations += [relation]
-
-        return past_relations, 200
+        criteria = [MentorshipRelationModel.end_date < datetime.now().timestamp()]
+        return MentorshipRelationDAO.get_relations_page(user_id, criteria, after, limit, include_total)
 
     @staticmethod
     def list_current_mentorship_relation(user_id):
@@ -276,12 +391,11 @@ class MentorshipRelationDAO:
         if user is None:
             return {'message': 'User does not exist.'}, 404
 
-        all_relations = user.mentor_relations + user.mentee_relations
+        current_relations = MentorshipRelationDAO.get_relations(
+            user_id, MentorshipRelationModel.state == MentorshipRelationState.ACCEPTED)
 
-        for relation in all_relations:
-            if relation.state is MentorshipRelationState.ACCEPTED:
-                setattr(relation, 'sent_by_me', relation.action_user_id == user_id)
-                return relation
+        if current_relations:
+            return current_relations[0]
 
         return {'message': 'You are not in a current mentorship relation.'}, 200
 
@@ -294,13 +408,9 @@ class MentorshipRelationDAO:
         if user is None:
             return {'message': 'User does not exist.'}, 404
 
-        now_timestamp = datetime.now().timestamp()
-        pending_requests = []
-        all_relations = user.mentor_relations + user.mentee_relations
-
-        for relation in all_relations:
-            if relation.state is MentorshipRelationState.PENDING and relation.end_date > now_timestamp:
-                setattr(relation, 'sent_by_me', relation.action_user_id == user_id)
-                pending_requests += [relation]
+        pending_requests = MentorshipRelationDAO.get_relations(
+            user_id,
+            MentorshipRelationModel.state == MentorshipRelationState.PENDING,
+            MentorshipRelationModel.end_date > datetime.now().timestamp())
 
         return pending_requests, 200
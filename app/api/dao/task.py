@@ -1,7 +1,11 @@
 from datetime import datetime
 
+from sqlalchemy import or_
+
 from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.models.tasks_list import TasksListModel
 from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
 from app.utils.enum_utils import MentorshipRelationState
 
 
@@ -28,6 +32,18 @@ class TaskDAO:
 
         return {"message": "Task was created successfully."}, 200
 
+    @staticmethod
+    def get_tasks_version(user_id, mentorship_relation_id):
+        """
+        Returns the version marker of the tasks list of a mentorship relation,
+        None if the relation does not exist or the user is not involved in it.
+        """
+        return db.session.query(TasksListModel.id, TasksListModel.updated_at) \
+            .join(MentorshipRelationModel, MentorshipRelationModel.tasks_list_id == TasksListModel.id) \
+            .filter(MentorshipRelationModel.id == mentorship_relation_id,
+                    or_(MentorshipRelationModel.mentor_id == user_id, MentorshipRelationModel.mentee_id == user_id)) \
+            .first()
+
     @staticmethod
     def list_tasks(user_id, mentorship_relation_id):
 
@@ -1,7 +1,17 @@
 from datetime import datetime
 
-from app.api.email_utils import confirm_token
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from app.api.email_utils import add_email_verification_message_to_outbox, \
+    add_email_verification_messages_to_outbox, confirm_token
+from app.api.login_throttle import login_throttle
+from app.api.models.user import public_user_api_model
+from app.database.full_text_search import search_users_ids
+from app.database.models.mentorship_relation import MentorshipRelationModel
 from app.database.models.user import UserModel
+from app.database.models.users_version import UsersVersionModel
+from app.database.sqlalchemy_extension import db
 from app.utils.validation_utils import is_email_valid
 
 
@@ -9,6 +19,10 @@ class UserDAO:
     FAIL_USER_ALREADY_EXISTS = "FAIL_USER_ALREADY_EXISTS"
     SUCCESS_USER_CREATED = "SUCCESS_USER_CREATED"
     MIN_NUMBER_OF_ADMINS = 1
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 100
+    NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+    NEXT_PAGE_HEADER = 'X-Next-Page'
 
     @staticmethod
     def create_user(data):
@@ -18,14 +32,6 @@ class UserDAO:
         email = data['email']
         terms_and_conditions_checked = data['terms_and_conditions_checked']
 
-        existing_user = UserModel.find_by_username(data['username'])
-        if existing_user:
-            return {"message": "A user with that username already exists"}, 400
-        else:
-            existing_user = UserModel.find_by_email(data['email'])
-            if existing_user:
-                return {"message": "A user with that email already exists"}, 400
-
         user = UserModel(name, username, password, email, terms_and_conditions_checked)
         if 'need_mentoring' in data:
             user.need_mentoring = data['need_mentoring']
@@ -33,12 +39,39 @@ class UserDAO:
         if 'available_to_mentor' in data:
             user.available_to_mentor = data['available_to_mentor']
 
-        user.save_to_db()
+        # the verification email is committed with the user, and sent later by the email dispatcher
+        add_email_verification_message_to_outbox(name, email)
+
+        # the unique indexes check the username and email in the same round trip as the insert
+        try:
+            user.save_to_db()
+        except IntegrityError:
+            db.session.rollback()
+            uniqueness_error = UserDAO.get_uniqueness_error(username, email)
+            if uniqueness_error is None:
+                raise
+            return uniqueness_error, 400
 
         return {"message": "User was created successfully. "
                            "A confirmation email has been sent via email. "
                            "After confirming your email you can login."}, 200
 
+    @staticmethod
+    def get_uniqueness_error(username, email):
+        """
+        Returns the error message of a username or an email already taken,
+        regardless of case, with a single query. Returns None if both are free.
+        """
+        is_username_taken_by_user = db.session.query(UserModel.username_lower == username.lower()) \
+            .filter(or_(UserModel.username_lower == username.lower(), UserModel.email_lower == email.lower())) \
+            .all()
+
+        if any(is_username_taken for is_username_taken, in is_username_taken_by_user):
+            return {"message": "A user with that username already exists"}
+        if is_username_taken_by_user:
+            return {"message": "A user with that email already exists"}
+        return None
+
     @staticmethod
     def delete_user(user_id):
         user = UserModel.find_by_id(user_id)
@@ -60,6 +93,20 @@ class UserDAO:
     def get_user(user_id):
         return UserModel.find_by_id(user_id)
 
+    @staticmethod
+    def get_user_version(user_id):
+        """Returns the version marker of a user profile, None if the user does not exist."""
+        return db.session.query(UserModel.id, UserModel.updated_at).filter(UserModel.id == user_id).first()
+
+    @staticmethod
+    def get_users_version(user_id):
+        """
+        Returns the version marker of the users list seen by user_id. It
+        changes when a user is added, updated or removed, as the users
+        version row is increased in the same transaction.
+        """
+        return user_id, UsersVersionModel.get_version()
+
     @staticmethod
     def get_user_by_email(email):
         return UserModel.find_by_email(email)
@@ -69,17 +116,111 @@ class UserDAO:
         return UserModel.find_by_username(username)
 
     @staticmethod
-    def list_users(user_id, is_verified=None):
-        users_list = UserModel.query.filter(UserModel.id!=user_id).all()
-        list_of_users = []
-        if is_verified:
-            for user in users_list:
-                if user.is_email_verified:
-                    list_of_users += [user.json()]
-        else:
-            list_of_users = [user.json() for user in users_list]
+    def list_users(user_id, is_verified=None, after_id=None, limit=None):
+        """
+        Lists one page of users ordered by ID.
+        """
+        query = UserDAO.public_users_query(user_id, is_verified)
+
+        return UserDAO.get_users_page(query, after_id, limit)
+
+    @staticmethod
+    def search_users(user_id, available_to_mentor=None, need_mentoring=None, location=None, organization=None,
+                     after_id=None, limit=None):
+        """
+        Lists one page of users matching all the given filters.
+
+        Users already in an accepted mentorship relation are left out,
+        since they cannot take a new mentorship request.
+        """
+        query = UserDAO.public_users_query(user_id)
+
+        if available_to_mentor is not None:
+            query = query.filter(UserModel.available_to_mentor == available_to_mentor)
+        if need_mentoring is not None:
+            query = query.filter(UserModel.need_mentoring == need_mentoring)
+        if location:
+            query = query.filter(UserModel.location == location)
+        if organization:
+            query = query.filter(UserModel.organization == organization)
+
+        # anti-join with the accepted relations where the user is either mentor or mentee
+        query = query.filter(~MentorshipRelationModel.has_accepted_relation(UserModel.id))
+
+        return UserDAO.get_users_page(query, after_id, limit)
+
+    @staticmethod
+    def search_users_by_text(user_id, search_text, page=None, limit=None):
+        """
+        Lists one page of the users whose bio, skills or interests match
+        search_text, ranked from the best match.
+
+        When there are more matches, the number of the next page is
+        returned in the X-Next-Page header.
+        """
+        if page is None:
+            page = 1
+        if limit is None:
+            limit = UserDAO.DEFAULT_PAGE_SIZE
+        limit = min(limit, UserDAO.MAX_PAGE_SIZE)
+
+        # fetching one extra id tells if there is a next page
+        ranked_ids = search_users_ids(search_text, limit=limit + 1, offset=(page - 1) * limit,
+                                      exclude_user_id=user_id)
+
+        headers = {}
+        if len(ranked_ids) > limit:
+            ranked_ids = ranked_ids[:limit]
+            headers[UserDAO.NEXT_PAGE_HEADER] = page + 1
+
+        if not ranked_ids:
+            return [], 200, headers
+
+        rows = UserDAO.public_users_query(user_id).filter(UserModel.id.in_(ranked_ids)).all()
+        users_by_id = {row.id: row._asdict() for row in rows}
 
-        return list_of_users, 200
+        return [users_by_id[_id] for _id in ranked_ids if _id in users_by_id], 200, headers
+
+    @staticmethod
+    def get_users_page(query, after_id=None, limit=None):
+        """
+        Returns one page of a users query, seeking on the primary key.
+
+        Pages are seeked with id > after_id instead of using OFFSET, so
+        every page costs the same. When there are more users to list, the ID
+        to send as after_id for the next page is returned in the
+        X-Next-Cursor header.
+        """
+        if limit is None:
+            limit = UserDAO.DEFAULT_PAGE_SIZE
+        limit = min(limit, UserDAO.MAX_PAGE_SIZE)
+
+        if after_id is not None:
+            query = query.filter(UserModel.id > after_id)
+
+        # fetching one extra row tells if there is a next page
+        list_of_users = query.order_by(UserModel.id).limit(limit + 1).all()
+
+        headers = {}
+        if len(list_of_users) > limit:
+            list_of_users = list_of_users[:limit]
+            headers[UserDAO.NEXT_CURSOR_HEADER] = list_of_users[-1].id
+
+        # marshalling would take a row tuple for a list, so rows are sent as dicts
+        return [row._asdict() for row in list_of_users], 200, headers
+
+    @staticmethod
+    def public_users_query(user_id, is_verified=None):
+        """
+        Returns a query over all users except user_id that selects only the
+        columns of the public user API model, so rows come back as
+        lightweight tuples instead of UserModel instances.
+        """
+        columns = [getattr(UserModel, field) for field in public_user_api_model]
+        query = db.session.query(*columns).filter(UserModel.id != user_id)
+        if is_verified:
+            query = query.filter(UserModel.is_email_verified.is_(True))
+        return query
 
     @staticmethod
     def update_user_profile(user_id, data):
@@ -90,12 +231,7 @@ class UserDAO:
 
         username = data.get('username', None)
         if username:
-            user_with_same_username = UserModel.find_by_username(username)
-
-            # username should be unique
-            if user_with_same_username:
-                return {"message": "That username is already taken by another user."}, 400
-
+            # username should be unique, which the unique indexes check when the user is saved
             user.username = username
 
         if 'name' in data and data['name']:
@@ -137,7 +273,11 @@ class UserDAO:
         if 'available_to_mentor' in data:
             user.available_to_mentor = data['available_to_mentor']
 
-        user.save_to_db()
+        try:
+            user.save_to_db()
+        except IntegrityError:
+            db.session.rollback()
+            return {"message": "That username is already taken by another user."}, 400
 
         return {"message": "User was updated successfully"}, 200
 
@@ -172,19 +312,78 @@ class UserDAO:
             return {'message': 'You have confirmed your account. Thanks!'}, 200
 
     @staticmethod
-    def authenticate(username_or_email, password):
+    def resend_email_verification_message(user_name, email):
+        add_email_verification_message_to_outbox(user_name, email)
+        db.session.commit()
+
+    @staticmethod
+    def resend_email_verification_messages(batch_size=1000):
+        """
+        Adds the email verification message of every user who did not
+        verify their email to the outbox, rendering and inserting the
+        messages of batch_size users at a time.
+
+        :return: number of messages added to the outbox
+        """
+        number_of_messages = 0
+        last_id = 0
+        while True:
+            users = db.session.query(UserModel.id, UserModel.name, UserModel.email) \
+                .filter(UserModel.is_email_verified.isnot(True), UserModel.id > last_id) \
+                .order_by(UserModel.id).limit(batch_size).all()
+            if not users:
+                return number_of_messages
+
+            add_email_verification_messages_to_outbox([(name, email) for _, name, email in users])
+            db.session.commit()
+            number_of_messages += len(users)
+            last_id = users[-1].id
+
+    @staticmethod
+    def authenticate(username_or_email, password, ip_address=None):
         """
         The user can login with two options:
         -> username + password
         -> email + password
-        """
 
-        if is_email_valid(username_or_email):
-            user = UserModel.find_by_email(username_or_email)
-        else:
-            user = UserModel.find_by_username(username_or_email)
+        After too many failed logins of the account or the IP address,
+        logins are rejected without hashing the password, see LoginThrottle.
+        """
+        user = UserDAO.find_login_user(username_or_email)
+        account = UserDAO.get_login_account(username_or_email, user)
+        if login_throttle.is_throttled(account, ip_address):
+            return None
 
         if user and user.check_password(password):
+            # the password is only known at login, when the hashing settings change
+            if user.is_password_hash_outdated():
+                user.set_password(password)
+                user.save_to_db()
+            login_throttle.record_success(account)
             return user
 
+        login_throttle.record_failure(account, ip_address)
         return None
+
+    @staticmethod
+    def find_login_user(username_or_email):
+        if is_email_valid(username_or_email):
+            return UserModel.find_by_email(username_or_email)
+        return UserModel.find_by_username(username_or_email)
+
+    @staticmethod
+    def get_login_account(username_or_email, user):
+        """
+        Returns the account whose failed logins are counted: the id of the
+        user, so logins with the username and the email count together, or
+        the lowercased login of a user that does not exist.
+        """
+        if user is not None:
+            return user.id
+        return username_or_email.lower()
+
+    @staticmethod
+    def get_login_retry_after_seconds(username_or_email, ip_address=None):
+        """Returns the seconds until the account and IP address can try to login again, 0 if they can now."""
+        account = UserDAO.get_login_account(username_or_email, UserDAO.find_login_user(username_or_email))
+        return login_throttle.get_retry_after_seconds(account, ip_address)
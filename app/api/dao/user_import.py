@@ -0,0 +1,185 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+
+from app.api.email_utils import add_email_verification_messages_to_outbox
+from app.api.validations.user import validate_user_registration_request_data
+from app.database.full_text_search import index_users
+from app.database.models.user import UserModel
+from app.database.models.users_version import UsersVersionModel
+from app.database.sqlalchemy_extension import db
+from app.utils.password_utils import generate_password_hashes
+
+
+class UserImportDAO:
+
+    # number of rows validated, checked against the database and inserted together
+    IMPORT_BATCH_SIZE = 1000
+
+    IMPORT_FORMATS = ('csv', 'ndjson')
+
+    BOOLEAN_FIELDS = ('terms_and_conditions_checked', 'need_mentoring', 'available_to_mentor')
+    TRUE_VALUES = ('true', '1', 'yes')
+    FALSE_VALUES = ('false', '0', 'no', '')
+
+    @staticmethod
+    def get_import_format(filename):
+        """Returns the import format of a file name extension, None if it is unknown."""
+        extension = (filename or '').rsplit('.', 1)[-1].lower()
+        if extension == 'json':
+            extension = 'ndjson'
+        return extension if extension in UserImportDAO.IMPORT_FORMATS else None
+
+    @staticmethod
+    def read_rows(lines, import_format):
+        """
+        Returns a generator of (row number, user data) tuples read from the
+        lines of a CSV or NDJSON file. Rows that cannot be parsed have an
+        error message instead of the user data.
+        """
+        if import_format == 'csv':
+            for row_number, row in enumerate(csv.DictReader(lines), start=1):
+                yield row_number, UserImportDAO.parse_csv_row(row)
+        else:
+            for row_number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    yield row_number, 'Row is not valid JSON.'
+                    continue
+                yield row_number, data if isinstance(data, dict) else 'Row is not a JSON object.'
+
+    @staticmethod
+    def parse_csv_row(row):
+        # CSV values are strings, while the validation expects JSON types
+        data = {field: value for field, value in row.items() if field is not None}
+        for field in UserImportDAO.BOOLEAN_FIELDS:
+            if field in data:
+                value = (data[field] or '').strip().lower()
+                if value in UserImportDAO.TRUE_VALUES:
+                    data[field] = True
+                elif value in UserImportDAO.FALSE_VALUES:
+                    data[field] = False
+                else:
+                    return 'Field %s must be true or false.' % field
+        return data
+
+    @staticmethod
+    def import_users(lines, import_format):
+        """
+        Creates the users of a CSV or NDJSON file, with the same fields and
+        validation as the registration.
+
+        Rows are handled in batches: the usernames and emails of a batch are
+        checked against the database with one query each, and the valid
+        users are inserted with one multi-row insert and one commit, along
+        with their email verification messages.
+
+        :return: report with the number of imported users and the errors of the other rows
+        """
+        report = {'imported': 0, 'failed': 0, 'errors': []}
+        usernames_in_file = set()
+        emails_in_file = set()
+        # as in the registration, the first user of the system is an admin
+        is_first_user_admin = UserModel.is_empty()
+
+        rows = UserImportDAO.read_rows(lines, import_format)
+        while True:
+            batch = list(islice(rows, UserImportDAO.IMPORT_BATCH_SIZE))
+            if not batch:
+                break
+
+            valid_rows = []
+            for row_number, data in batch:
+                error = data if isinstance(data, str) else UserImportDAO.validate_row(data)
+                if error is None:
+                    if data['username'].lower() in usernames_in_file:
+                        error = 'Username %s is repeated in the file.' % data['username']
+                    elif data['email'].lower() in emails_in_file:
+                        error = 'Email %s is repeated in the file.' % data['email']
+
+                if error is None:
+                    usernames_in_file.add(data['username'].lower())
+                    emails_in_file.add(data['email'].lower())
+                    valid_rows.append((row_number, data))
+                else:
+                    report['errors'].append({'row': row_number, 'message': error})
+
+            valid_rows = UserImportDAO.remove_existing_users(valid_rows, report)
+            if valid_rows:
+                UserImportDAO.insert_users([data for _, data in valid_rows], is_first_user_admin)
+                is_first_user_admin = False
+                report['imported'] += len(valid_rows)
+
+        report['errors'].sort(key=lambda error: error['row'])
+        report['failed'] = len(report['errors'])
+        return report
+
+    @staticmethod
+    def validate_row(data):
+        """Returns the validation error message of the user data, None if it is valid."""
+        if not isinstance(data.get('email', ''), str):
+            return 'Email must be in string format.'
+        error = validate_user_registration_request_data(data).get('message')
+        if error is None:
+            # the registration takes the JSON types as they are, while the insert needs booleans
+            for field in UserImportDAO.BOOLEAN_FIELDS:
+                if field in data and not isinstance(data[field], bool):
+                    return 'Field %s must be true or false.' % field
+        return error
+
+    @staticmethod
+    def remove_existing_users(rows, report):
+        """Returns the rows whose username and email are not taken, with one query for each field."""
+        if not rows:
+            return rows
+
+        existing_usernames = {username for username, in db.session.query(UserModel.username_lower).filter(
+            UserModel.username_lower.in_([data['username'].lower() for _, data in rows]))}
+        existing_emails = {email for email, in db.session.query(UserModel.email_lower).filter(
+            UserModel.email_lower.in_([data['email'].lower() for _, data in rows]))}
+
+        new_rows = []
+        for row_number, data in rows:
+            if data['username'].lower() in existing_usernames:
+                report['errors'].append({'row': row_number, 'message': 'A user with that username already exists'})
+            elif data['email'].lower() in existing_emails:
+                report['errors'].append({'row': row_number, 'message': 'A user with that email already exists'})
+            else:
+                new_rows.append((row_number, data))
+        return new_rows
+
+    @staticmethod
+    def insert_users(users_data, is_first_user_admin):
+        password_hashes = generate_password_hashes([data['password'] for data in users_data])
+        registration_date = datetime.now()
+
+        users = []
+        for data, password_hash in zip(users_data, password_hashes):
+            users.append({
+                'name': data['name'],
+                'username': data['username'],
+                'username_lower': data['username'].lower(),
+                'email': data['email'],
+                'email_lower': data['email'].lower(),
+                'password_hash': password_hash,
+                'terms_and_conditions_checked': data['terms_and_conditions_checked'],
+                'registration_date': registration_date,
+                'is_admin': False,
+                'is_email_verified': False,
+                'need_mentoring': data.get('need_mentoring', False),
+                'available_to_mentor': data.get('available_to_mentor', False)
+            })
+        users[0]['is_admin'] = is_first_user_admin
+
+        db.session.execute(UserModel.__table__.insert(), users)
+        # the bulk insert skips save_to_db, so the new users are added to the search index here
+        index_users([user_id for user_id, in db.session.query(UserModel.id).filter(
+            UserModel.username_lower.in_([user['username_lower'] for user in users]))])
+        UsersVersionModel.increase_version()
+        # as in the registration, the users have to verify their email before they can login
+        add_email_verification_messages_to_outbox([(data['name'], data['email']) for data in users_data])
+        db.session.commit()
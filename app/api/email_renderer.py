@@ -0,0 +1,77 @@
+import threading
+
+from flask import current_app, has_request_context, request
+
+
+class EmailRenderer:
+    """
+    Renders the HTML body of emails and builds the links they contain,
+    doing the costly work once per application instead of once per email.
+
+    Templates are compiled once and kept, so changes to the email
+    templates are seen after a restart. The external URL of a resource is
+    built once for every base URL with a placeholder for its argument,
+    which is then replaced in the pattern. The base URL is EMAIL_BASE_URL
+    or, when it is not set, the one of the request. As clients choose the
+    host of their requests, at most EMAIL_URL_PATTERNS_MAX_SIZE patterns
+    are kept.
+    """
+
+    URL_PLACEHOLDER = '__EMAIL_RENDERER_PLACEHOLDER__'
+
+    def init_app(self, app):
+        app.extensions['email_renderer'] = {'lock': threading.Lock(), 'templates': {}, 'url_patterns': {}}
+
+    def get_state(self):
+        return current_app.extensions['email_renderer']
+
+    def get_template(self, template_name):
+        state = self.get_state()
+        template = state['templates'].get(template_name)
+        if template is None:
+            with state['lock']:
+                template = current_app.jinja_env.get_template(template_name)
+                state['templates'][template_name] = template
+        return template
+
+    @staticmethod
+    def get_base_url():
+        if current_app.config['EMAIL_BASE_URL']:
+            return current_app.config['EMAIL_BASE_URL']
+        # outside of requests, e.g. in CLI commands, the host is taken from SERVER_NAME
+        return request.url_root if has_request_context() else None
+
+    def get_url_pattern(self, resource, argument):
+        base_url = self.get_base_url()
+        key = (resource, argument, base_url)
+
+        state = self.get_state()
+        url_pattern = state['url_patterns'].get(key)
+        if url_pattern is None:
+            url_pattern = self.build_url_pattern(resource, argument, base_url)
+            with state['lock']:
+                if len(state['url_patterns']) < current_app.config['EMAIL_URL_PATTERNS_MAX_SIZE']:
+                    state['url_patterns'][key] = url_pattern
+        return url_pattern
+
+    def build_url_pattern(self, resource, argument, base_url):
+        from app.api.api_extension import api  # import here to avoid circular imports
+        if base_url is None:
+            return api.url_for(resource, _external=True, **{argument: self.URL_PLACEHOLDER})
+        with current_app.test_request_context(base_url=base_url):
+            return api.url_for(resource, _external=True, **{argument: self.URL_PLACEHOLDER})
+
+    def build_url(self, resource, argument, value):
+        """Returns the external URL of a resource whose only route argument is argument, e.g. a token."""
+        return self.get_url_pattern(resource, argument).replace(self.URL_PLACEHOLDER, value)
+
+    def render(self, template_name, **context):
+        return self.get_template(template_name).render(**context)
+
+    def render_many(self, template_name, contexts):
+        """Renders the template with each context of an iterable, looking the template up once."""
+        template = self.get_template(template_name)
+        return [template.render(**context) for context in contexts]
+
+
+email_renderer = EmailRenderer()
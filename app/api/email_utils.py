@@ -1,49 +1,62 @@
-from itsdangerous import URLSafeTimedSerializer, BadSignature
+from datetime import datetime
 
-from flask_mail import Message
-from flask import render_template
+from itsdangerous import BadSignature
 
-from app.api.mail_extension import mail
+from app.api.email_renderer import email_renderer
+from app.api.token_service import token_service
+from app.database.models.email_outbox import EmailOutboxModel
+from app.database.sqlalchemy_extension import db
 
 EMAIL_VERIFICATION_TOKEN_TIME_TO_EXPIRE = 86400  # 24 hours in seconds
 
 
 def generate_confirmation_token(email):
-    from run import application
-    serializer = URLSafeTimedSerializer(application.config['SECRET_KEY'])
-    return serializer.dumps(email, salt=application.config['SECURITY_PASSWORD_SALT'])
+    return token_service.generate_token(email)
 
 
 def confirm_token(token, expiration=EMAIL_VERIFICATION_TOKEN_TIME_TO_EXPIRE):
-    from run import application
-    serializer = URLSafeTimedSerializer(application.config['SECRET_KEY'])
     try:
-        email = serializer.loads(
-            token,
-            salt=application.config['SECURITY_PASSWORD_SALT'],
-            max_age=expiration
-        )
+        email = token_service.confirm_token(token, max_age=expiration)
     except BadSignature:
         return False
     return email
 
 
-def send_email(recipient, subject, template):
-    from run import application
-    msg = Message(
-        subject,
-        recipients=[recipient],
-        html=template,
-        sender=application.config['MAIL_DEFAULT_SENDER']
-    )
-    mail.send(msg)
+def get_email_verification_message(user_name, email):
+    """Returns the subject and HTML body of the email with the link that confirms the email of a user."""
+    return get_email_verification_messages([(user_name, email)])[0]
 
 
-def send_email_verification_message(user_name, email):
-    confirmation_token = generate_confirmation_token(email)
+def get_email_verification_messages(users):
+    """
+    Returns the subject and HTML body of the email verification message
+    of each (user name, email) pair, in a single pass: the template and
+    the URL pattern of the confirmation link are looked up once.
+    """
     from app.api.resources.user import UserEmailConfirmation  # import here to avoid circular imports
-    from app.api.api_extension import api
-    confirm_url = api.url_for(UserEmailConfirmation, token=confirmation_token, _external=True)
-    html = render_template('email_confirmation.html', confirm_url=confirm_url, user_name=user_name)
+    contexts = [{
+        'user_name': user_name,
+        'confirm_url': email_renderer.build_url(UserEmailConfirmation, 'token', generate_confirmation_token(email))
+    } for user_name, email in users]
     subject = "Mentorship System - Please confirm your email"
-    send_email(email, subject, html)
+    return [(subject, html) for html in email_renderer.render_many('email_confirmation.html', contexts)]
+
+
+def add_email_verification_message_to_outbox(user_name, email):
+    """
+    Adds the email verification message to the email outbox in the
+    current transaction, so it is sent by the dispatcher if and only if
+    the transaction is committed.
+    """
+    subject, html = get_email_verification_message(user_name, email)
+    EmailOutboxModel(email, subject, html).add_to_session()
+
+
+def add_email_verification_messages_to_outbox(users):
+    """Adds the email verification messages of many (user name, email) pairs to the outbox, with one insert."""
+    messages = get_email_verification_messages(users)
+    now = datetime.now()
+    db.session.execute(EmailOutboxModel.__table__.insert(), [
+        {'recipient': email, 'subject': subject, 'html': html, 'created_at': now, 'attempts': 0}
+        for (_, email), (subject, html) in zip(users, messages)
+    ])
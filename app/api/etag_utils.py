@@ -0,0 +1,54 @@
+import hashlib
+from functools import wraps
+
+from flask import request, Response
+from flask_restplus.utils import unpack
+from werkzeug.http import quote_etag
+
+# responses with an ETag are only for the authenticated user, and clients
+# have to check with the server if they are still valid before using them
+DEFAULT_CACHE_CONTROL = 'private, no-cache'
+
+
+def get_etag(version):
+    """Returns the ETag value of a version marker, a tuple of cheap to query values."""
+    return hashlib.sha1(repr(version).encode('utf-8')).hexdigest()
+
+
+def conditional_get(get_version, cache_control=DEFAULT_CACHE_CONTROL):
+    """
+    Decorator that adds ETag support to a GET resource method.
+
+    The ETag is computed from the version marker returned by get_version,
+    which is called with the URL parameters of the request. When the
+    request If-None-Match header has the same ETag, a 304 response is
+    returned without calling the resource method. When get_version returns
+    None, the resource method handles the request as usual.
+
+    It has to be placed above marshal_with, so the marshalling is skipped
+    for not modified responses.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            version = get_version(**kwargs)
+            if version is None:
+                return func(*args, **kwargs)
+
+            etag = get_etag(version)
+            headers = {'ETag': quote_etag(etag, weak=True), 'Cache-Control': cache_control}
+            if request.if_none_match.contains_weak(etag):
+                return Response(status=304, headers=headers)
+
+            response = func(*args, **kwargs)
+            if isinstance(response, Response):
+                return response
+
+            data, code, response_headers = unpack(response)
+            if not 200 <= code < 300:
+                return data, code, response_headers
+            return data, code, dict(response_headers, **headers)
+
+        return wrapper
+
+    return decorator
@@ -1,5 +1,7 @@
 from flask_jwt_extended import JWTManager
 from app.api.api_extension import api
+from app.api.authorization import token_revocations
+from app.database.models.user import UserModel
 
 jwt = JWTManager()
 
@@ -26,3 +28,42 @@ def my_unauthorized_request_callback(error_message):
     return {
                'message': 'The authorization token is missing!'
            }, 401
+
+
+@jwt.revoked_token_loader
+def my_revoked_token_callback():
+    return {
+               'message': 'The token has been revoked! Please, login again.'
+           }, 401
+
+
+@jwt.token_in_blacklist_loader
+def is_token_revoked(decrypted_token):
+    # looked up in memory, see TokenRevocations
+    return token_revocations.is_revoked(decrypted_token['jti'])
+
+
+@jwt.user_identity_loader
+def user_identity_lookup(identity):
+    # tokens can be created either for a user or for a user id
+    if isinstance(identity, UserModel):
+        return identity.id
+    return identity
+
+
+@jwt.user_claims_loader
+def add_user_claims(identity):
+    """
+    Adds the admin status, the name and the profile version of the user to
+    the access token, so they can be read without querying the database.
+    """
+    user = identity if isinstance(identity, UserModel) else UserModel.find_by_id(identity)
+    if user is None:
+        return {}
+
+    return {
+        'is_admin': bool(user.is_admin),
+        'name': user.name,
+        'profile_version': user.updated_at.timestamp() if user.updated_at else None
+    }
+
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+from flask import current_app
+
+
+class LoginThrottle:
+    """
+    Process-local counters of the failed logins of every account and IP
+    address, used to reject logins before the password is hashed once
+    there were too many failures. An account is the id of a user, or the
+    lowercased username or email of a login that matches no user.
+
+    Failures are counted in a sliding window: an account (or IP address)
+    is throttled while it has LOGIN_THROTTLE_MAX_ACCOUNT_FAILURES (or
+    LOGIN_THROTTLE_MAX_IP_FAILURES) failures in the last
+    LOGIN_THROTTLE_WINDOW_SECONDS. Only the last failures needed to tell
+    are kept, and the counters of at most LOGIN_THROTTLE_MAX_SIZE accounts
+    and IP addresses, the least recently used being evicted.
+    """
+
+    def __init__(self):
+        self.failures_by_key = OrderedDict()  # key -> failure times, up to the key's maximum number of failures
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.throttled = 0
+
+    @staticmethod
+    def get_keys(account, ip_address):
+        keys = [('account', account, current_app.config['LOGIN_THROTTLE_MAX_ACCOUNT_FAILURES'])]
+        if ip_address:
+            keys.append(('ip', ip_address, current_app.config['LOGIN_THROTTLE_MAX_IP_FAILURES']))
+        return keys
+
+    def get_retry_after_seconds(self, account, ip_address=None):
+        """Returns the seconds until the account and IP address can try to login again, 0 if they can now."""
+        if not current_app.config['LOGIN_THROTTLE_ENABLED']:
+            return 0
+
+        window_start = time.monotonic() - current_app.config['LOGIN_THROTTLE_WINDOW_SECONDS']
+        retry_after_seconds = 0
+        with self.lock:
+            for key_type, key, max_failures in self.get_keys(account, ip_address):
+                failure_times = self.failures_by_key.get((key_type, key))
+                if failure_times and len(failure_times) >= max_failures and failure_times[0] > window_start:
+                    retry_after_seconds = max(retry_after_seconds, failure_times[0] - window_start)
+        return retry_after_seconds
+
+    def is_throttled(self, account, ip_address=None):
+        """Returns True if a login of the account from the IP address has to be rejected, counting it."""
+        if not self.get_retry_after_seconds(account, ip_address):
+            return False
+        with self.lock:
+            self.throttled += 1
+        return True
+
+    def record_failure(self, account, ip_address=None):
+        if not current_app.config['LOGIN_THROTTLE_ENABLED']:
+            return
+
+        now = time.monotonic()
+        max_size = current_app.config['LOGIN_THROTTLE_MAX_SIZE']
+        with self.lock:
+            self.failures += 1
+            for key_type, key, max_failures in self.get_keys(account, ip_address):
+                failure_times = self.failures_by_key.get((key_type, key))
+                if failure_times is None or failure_times.maxlen != max_failures:
+                    failure_times = deque(failure_times or (), maxlen=max_failures)
+                    self.failures_by_key[(key_type, key)] = failure_times
+                failure_times.append(now)
+                self.failures_by_key.move_to_end((key_type, key))
+
+            while len(self.failures_by_key) > max_size:
+                self.failures_by_key.popitem(last=False)
+
+    def record_success(self, account):
+        # the failures of the IP address are kept, so logging in to one account does not reset them
+        with self.lock:
+            self.failures_by_key.pop(('account', account), None)
+
+    def clear(self):
+        with self.lock:
+            self.failures_by_key.clear()
+            self.failures = 0
+            self.throttled = 0
+
+    def get_stats(self):
+        with self.lock:
+            return {'failures': self.failures, 'throttled': self.throttled, 'size': len(self.failures_by_key)}
+
+
+login_throttle = LoginThrottle()
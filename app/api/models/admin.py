@@ -3,6 +3,8 @@ from flask_restplus import fields, Model
 
 def add_models_to_namespace(api_namespace):
     api_namespace.models[assign_and_revoke_user_admin_request_body.name] = assign_and_revoke_user_admin_request_body
+    api_namespace.models[import_users_error_model.name] = import_users_error_model
+    api_namespace.models[import_users_report_model.name] = import_users_report_model
 
 
 assign_and_revoke_user_admin_request_body = Model('Assign User model', {
@@ -11,3 +13,14 @@ assign_and_revoke_user_admin_request_body = Model('Assign User model', {
         description='The unique identifier of a user'
     )
 })
+
+import_users_error_model = Model('Import users error model', {
+    'row': fields.Integer(required=True, description='Number of the row in the file, starting at 1'),
+    'message': fields.String(required=True, description='Reason why the row was not imported')
+})
+
+import_users_report_model = Model('Import users report model', {
+    'imported': fields.Integer(required=True, description='Number of users created'),
+    'failed': fields.Integer(required=True, description='Number of rows not imported'),
+    'errors': fields.List(fields.Nested(import_users_error_model), description='Errors of the rows not imported')
+})
@@ -9,7 +9,10 @@ def add_models_to_namespace(api_namespace):
     api_namespace.models[update_user_request_body_model.name] = update_user_request_body_model
     api_namespace.models[login_request_body_model.name] = login_request_body_model
     api_namespace.models[login_response_body_model.name] = login_response_body_model
+    api_namespace.models[refresh_response_body_model.name] = refresh_response_body_model
+    api_namespace.models[logout_request_body_model.name] = logout_request_body_model
     api_namespace.models[resend_email_request_body_model.name] = resend_email_request_body_model
+    api_namespace.models[mentor_recommendation_api_model.name] = mentor_recommendation_api_model
 
 
 public_user_api_model = Model('User list model', {
@@ -154,9 +157,20 @@ login_request_body_model = Model('Login request data model', {
 
 login_response_body_model = Model('Login response data model', {
     'access_token': fields.String(required=True, description='User\'s access token'),
+    'expiry': fields.Float(required=True, description='Access token expiry UNIX timestamp'),
+    'refresh_token': fields.String(required=True, description='User\'s refresh token, to get new access tokens'),
+    'refresh_expiry': fields.Float(required=True, description='Refresh token expiry UNIX timestamp')
+})
+
+refresh_response_body_model = Model('Refresh response data model', {
+    'access_token': fields.String(required=True, description='User\'s new access token'),
     'expiry': fields.Float(required=True, description='Access token expiry UNIX timestamp')
 })
 
+logout_request_body_model = Model('Logout request data model', {
+    'refresh_token': fields.String(required=False, description='Refresh token to revoke with the access token')
+})
+
 update_user_request_body_model = Model('Update User request data model', {
     'name': fields.String(required=False, description='User name'),
     'username': fields.String(required=False, description='User username'),
@@ -179,3 +193,10 @@ update_user_request_body_model = Model('Update User request data model', {
 resend_email_request_body_model = Model('Resend email request data model', {
     'email': fields.String(required=True, description='User\'s email'),
 })
+
+mentor_recommendation_api_model = Model('Mentor recommendation model', dict(public_user_api_model, **{
+    'score': fields.Float(
+        required=True,
+        description='How well the mentor skills, location and organization match the user'
+    )
+}))
@@ -1,11 +1,14 @@
-from flask import request
+import codecs
+
+from flask import request, Response, stream_with_context
 from flask_restplus import Resource, Namespace
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from app.api.dao.user import UserDAO
 from app.api.models.admin import *
 from app.api.dao.admin import AdminDAO
-from app.api.resources.common import auth_header_parser
+from app.api.dao.user_import import UserImportDAO
+from app.api.authorization import admin_required
+from app.api.resources.common import auth_header_parser, users_export_parser, users_import_parser
 
 admin_ns = Namespace('Admins', description='Operations related to Admin users')
 add_models_to_namespace(admin_ns)
@@ -16,21 +19,15 @@ class AssignNewUserAdmin(Resource):
 
     @classmethod
     @jwt_required
+    @admin_required("You don't have admin status. You can't assign other user as admin.")
     @admin_ns.expect(auth_header_parser, assign_and_revoke_user_admin_request_body, validate=True)
     def post(cls):
         """
         Assigns a User as a new Admin.
         """
         user_id = get_jwt_identity()
-        user = UserDAO.get_user(user_id)
-        if user.is_admin:
-            data = request.json
-            return AdminDAO.assign_new_user(user.id, data)
-
-        else:
-            return {
-                       "message": "You don't have admin status. You can't assign other user as admin."
-                   }, 403
+        data = request.json
+        return AdminDAO.assign_new_user(user_id, data)
 
 
 @admin_ns.route('admin/remove')
@@ -38,18 +35,89 @@ class RevokeUserAdmin(Resource):
 
     @classmethod
     @jwt_required
+    @admin_required("You don't have admin status. You can't revoke other admin user.")
     @admin_ns.expect(auth_header_parser, assign_and_revoke_user_admin_request_body, validate=True)
     def post(cls):
         """
         Revoke admin status from another User Admin.
         """
         user_id = get_jwt_identity()
-        user = UserDAO.get_user(user_id)
-        if user.is_admin:
-            data = request.json
-            return AdminDAO.revoke_admin_user(user.id, data)
-
-        else:
-            return {
-                       "message": "You don't have admin status. You can't revoke other admin user."
-                   }, 403
+        data = request.json
+        return AdminDAO.revoke_admin_user(user_id, data)
+
+
+@admin_ns.route('admin/users/export')
+class ExportUsers(Resource):
+
+    @classmethod
+    @jwt_required
+    @admin_required("You don't have admin status. You can't export users.")
+    @admin_ns.doc('export_users')
+    @admin_ns.expect(auth_header_parser, users_export_parser)
+    @admin_ns.response(200, 'Users exported.')
+    @admin_ns.response(400, 'Invalid export fields.')
+    @admin_ns.response(403, 'User is not an Admin.')
+    def get(cls):
+        """
+        Exports all the users as NDJSON or CSV.
+
+        The users are streamed while they are read from the database, so
+        exports of any size use a constant amount of memory. The exported
+        fields can be chosen with the columns query parameter.
+        """
+        args = users_export_parser.parse_args()
+        response = AdminDAO.export_users(args['columns'], args['format'])
+        if response[1] != 200:
+            return response
+
+        return Response(stream_with_context(response[0]),
+                        mimetype=AdminDAO.EXPORT_MIMETYPES[args['format']],
+                        headers={'Content-Disposition': 'attachment; filename=users.%s' % args['format']})
+
+
+@admin_ns.route('admin/users/import')
+class ImportUsers(Resource):
+
+    @classmethod
+    @jwt_required
+    @admin_required("You don't have admin status. You can't import users.")
+    @admin_ns.doc('import_users')
+    @admin_ns.expect(auth_header_parser, users_import_parser)
+    @admin_ns.response(200, 'Users imported.', import_users_report_model)
+    @admin_ns.response(400, 'Unknown import format.')
+    @admin_ns.response(403, 'User is not an Admin.')
+    def post(cls):
+        """
+        Creates the users of an uploaded CSV or NDJSON file.
+
+        Each row is validated as a registration. The response reports the
+        number of created users and the errors of the rows not imported.
+        """
+        args = users_import_parser.parse_args()
+        import_format = args['format'] or UserImportDAO.get_import_format(args['file'].filename)
+        if import_format is None:
+            return {"message": "The import format must be csv or ndjson."}, 400
+
+        # the upload is decoded line by line, so it is never loaded in memory at once
+        lines = codecs.iterdecode(args['file'].stream, 'utf-8-sig')
+        return UserImportDAO.import_users(lines, import_format), 200
+
+
+@admin_ns.route('admin/metrics')
+class Metrics(Resource):
+
+    @classmethod
+    @jwt_required
+    @admin_required("You don't have admin status. You can't see the metrics.")
+    @admin_ns.doc('get_metrics')
+    @admin_ns.expect(auth_header_parser)
+    @admin_ns.response(200, 'Metrics of the process.')
+    @admin_ns.response(403, 'User is not an Admin.')
+    def get(cls):
+        """
+        Returns the counters of the process that serves the request.
+
+        These are the failed and throttled logins and the hits and misses
+        of the users cache. Every process has its own counters.
+        """
+        return AdminDAO.get_metrics()
@@ -1,7 +1,121 @@
-from flask_restplus import reqparse
+from flask_restplus import reqparse, inputs
+from werkzeug.datastructures import FileStorage
 
 auth_header_parser = reqparse.RequestParser()
 auth_header_parser.add_argument('Authorization',
                                 required=True,
                                 help='Authentication access token. E.g.: Bearer <access_token>',
                                 location='headers')
+
+users_pagination_parser = reqparse.RequestParser()
+users_pagination_parser.add_argument('after_id',
+                                     type=inputs.natural,
+                                     required=False,
+                                     help='Return only users with an ID greater than this one (next page cursor)',
+                                     location='args')
+users_pagination_parser.add_argument('limit',
+                                     type=inputs.positive,
+                                     required=False,
+                                     help='Maximum number of users returned in one page',
+                                     location='args')
+
+
+def relations_cursor(value):
+    """Parses a mentorship relations cursor, the creation date and ID of a relation separated by a comma."""
+    creation_date, relation_id = value.split(',')
+    return float(creation_date), int(relation_id)
+
+
+relations_pagination_parser = reqparse.RequestParser()
+relations_pagination_parser.add_argument('after',
+                                         type=relations_cursor,
+                                         required=False,
+                                         help='Return only relations older than this cursor (next page cursor)',
+                                         location='args')
+relations_pagination_parser.add_argument('limit',
+                                         type=inputs.positive,
+                                         required=False,
+                                         help='Maximum number of relations returned in one page',
+                                         location='args')
+relations_pagination_parser.add_argument('include_total',
+                                         type=inputs.boolean,
+                                         required=False,
+                                         default=False,
+                                         help='Return the number of relations of all pages in the X-Total-Count header',
+                                         location='args')
+
+users_search_parser = users_pagination_parser.copy()
+users_search_parser.add_argument('available_to_mentor',
+                                 type=inputs.boolean,
+                                 required=False,
+                                 help='Filter users by their availability to mentor',
+                                 location='args')
+users_search_parser.add_argument('need_mentoring',
+                                 type=inputs.boolean,
+                                 required=False,
+                                 help='Filter users by their need to be mentored',
+                                 location='args')
+users_search_parser.add_argument('location',
+                                 type=str,
+                                 required=False,
+                                 help='Filter users by location',
+                                 location='args')
+users_search_parser.add_argument('organization',
+                                 type=str,
+                                 required=False,
+                                 help='Filter users by organization',
+                                 location='args')
+
+users_text_search_parser = reqparse.RequestParser()
+users_text_search_parser.add_argument('query',
+                                      type=str,
+                                      required=True,
+                                      help='Words to search in the users bio, skills and interests',
+                                      location='args')
+users_text_search_parser.add_argument('page',
+                                      type=inputs.positive,
+                                      required=False,
+                                      help='Number of the page of results, starting at 1',
+                                      location='args')
+users_text_search_parser.add_argument('limit',
+                                      type=inputs.positive,
+                                      required=False,
+                                      help='Maximum number of users returned in one page',
+                                      location='args')
+
+mentor_recommendations_parser = reqparse.RequestParser()
+mentor_recommendations_parser.add_argument('limit',
+                                           type=inputs.positive,
+                                           required=False,
+                                           help='Maximum number of recommended mentors',
+                                           location='args')
+
+users_export_parser = reqparse.RequestParser()
+users_export_parser.add_argument('format',
+                                 type=str,
+                                 required=False,
+                                 default='ndjson',
+                                 choices=('ndjson', 'csv'),
+                                 help='Export format, either ndjson (one JSON object per line) or csv',
+                                 location='args')
+users_export_parser.add_argument('columns',
+                                 type=str,
+                                 action='split',
+                                 required=False,
+                                 help='Comma separated user fields to export. E.g.: id,username,email',
+                                 location='args')
+
+users_import_parser = reqparse.RequestParser()
+users_import_parser.add_argument('file',
+                                 type=FileStorage,
+                                 required=True,
+                                 help='CSV or NDJSON file with the name, username, password, email, '
+                                      'terms_and_conditions_checked and optionally need_mentoring and '
+                                      'available_to_mentor of each user',
+                                 location='files')
+users_import_parser.add_argument('format',
+                                 type=str,
+                                 required=False,
+                                 choices=('ndjson', 'csv'),
+                                 help='Import format, by default taken from the file extension',
+                                 location='args')
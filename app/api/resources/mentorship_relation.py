@@ -3,7 +3,8 @@ from flask_restplus import Resource, Namespace, marshal
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from app.api.dao.task import TaskDAO
-from app.api.resources.common import auth_header_parser
+from app.api.etag_utils import conditional_get
+from app.api.resources.common import auth_header_parser, relations_pagination_parser
 from app.api.dao.mentorship_relation import MentorshipRelationDAO
 from app.api.models.mentorship_relation import *
 from app.database.models.mentorship_relation import MentorshipRelationModel
@@ -64,18 +65,25 @@ class GetAllMyMentorshipRelation(Resource):
 
     @classmethod
     @jwt_required
+    @conditional_get(lambda: DAO.get_relations_version(get_jwt_identity()))
     @mentorship_relation_ns.doc('get_all_user_mentorship_relations')
-    @mentorship_relation_ns.expect(auth_header_parser)
+    @mentorship_relation_ns.expect(auth_header_parser, relations_pagination_parser)
     @mentorship_relation_ns.response(200, 'Return all user\'s mentorship relations was successfully.',
                                      model=mentorship_request_response_body)
+    @mentorship_relation_ns.response(304, 'Not modified.')
     @mentorship_relation_ns.marshal_list_with(mentorship_request_response_body)
     def get(cls):
         """
-        Lists all mentorship relations of current user.
+        Lists a page of the mentorship relations of current user, from the most recent.
+
+        The cursor to use as after for the next page is returned in the
+        X-Next-Cursor header, which is absent on the last page.
         """
 
         user_id = get_jwt_identity()
-        response = DAO.list_mentorship_relations(user_id=user_id)
+        args = relations_pagination_parser.parse_args()
+        response = DAO.list_mentorship_relations(user_id=user_id, after=args['after'], limit=args['limit'],
+                                                 include_total=args['include_total'])
 
         return response
 
@@ -171,17 +179,22 @@ class ListPastMentorshipRelations(Resource):
     @classmethod
     @jwt_required
     @mentorship_relation_ns.doc('get_past_mentorship_relations')
-    @mentorship_relation_ns.expect(auth_header_parser)
+    @mentorship_relation_ns.expect(auth_header_parser, relations_pagination_parser)
     @mentorship_relation_ns.response(200, 'Returned past mentorship relations with success.',
                                      model=mentorship_request_response_body)
     @mentorship_relation_ns.marshal_list_with(mentorship_request_response_body)
     def get(cls):
         """
-        Lists past mentorship relations of the current user.
+        Lists a page of the past mentorship relations of the current user, from the most recent.
+
+        The cursor to use as after for the next page is returned in the
+        X-Next-Cursor header, which is absent on the last page.
         """
 
         user_id = get_jwt_identity()
-        response = DAO.list_past_mentorship_relations(user_id)
+        args = relations_pagination_parser.parse_args()
+        response = DAO.list_past_mentorship_relations(user_id, after=args['after'], limit=args['limit'],
+                                                      include_total=args['include_total'])
 
         return response
 
@@ -214,10 +227,12 @@ class ListPendingMentorshipRequests(Resource):
 
     @classmethod
     @jwt_required
+    @conditional_get(lambda: DAO.get_pending_relations_version(get_jwt_identity()))
     @mentorship_relation_ns.doc('get_pending_mentorship_relations')
     @mentorship_relation_ns.expect(auth_header_parser)
     @mentorship_relation_ns.response(200, 'Returned pending mentorship relation with success.',
                                      model=mentorship_request_response_body)
+    @mentorship_relation_ns.response(304, 'Not modified.')
     @mentorship_relation_ns.marshal_list_with(mentorship_request_response_body)
     def get(cls):
         """
@@ -293,10 +308,12 @@ class ListTasks(Resource):
 
     @classmethod
     @jwt_required
+    @conditional_get(lambda request_id: TaskDAO.get_tasks_version(get_jwt_identity(), request_id))
     @mentorship_relation_ns.doc('list_tasks_in_mentorship_relation')
     @mentorship_relation_ns.expect(auth_header_parser)
     @mentorship_relation_ns.response(200, 'List tasks from a mentorship relation with success.',
                                      model=list_tasks_response_body)
+    @mentorship_relation_ns.response(304, 'Not modified.')
     def get(cls, request_id):
         """
         List all tasks from a mentorship relation.
@@ -1,35 +1,51 @@
+import math
 from datetime import datetime
 
-from flask import request
-from flask_jwt_extended import jwt_required, create_access_token, get_jwt_identity
+from flask import current_app, request
+from flask_jwt_extended import jwt_required, jwt_refresh_token_required, create_access_token, \
+    create_refresh_token, decode_token, get_jwt_identity, get_raw_jwt
+from flask_jwt_extended.exceptions import JWTExtendedException
 from flask_restplus import Resource, marshal, Namespace
+from jwt import InvalidTokenError
+
+from app.api.authorization import token_revocations
 
 from app.api.validations.user import *
-from app.api.email_utils import send_email_verification_message
+from app.api.etag_utils import conditional_get
 from app.api.models.user import *
 from app.api.dao.user import UserDAO
-from app.api.resources.common import auth_header_parser
+from app.api.dao.mentor_recommendation import MentorRecommendationDAO
+from app.api.resources.common import auth_header_parser, users_pagination_parser, users_search_parser, \
+    users_text_search_parser, mentor_recommendations_parser
 
 users_ns = Namespace('Users', description='Operations related to users')
 add_models_to_namespace(users_ns)
 
 DAO = UserDAO()  # User data access object
 
+# public profiles change rarely, so clients can reuse them for a minute before checking their ETag
+PUBLIC_PROFILE_CACHE_CONTROL = 'private, max-age=60'
+
 
 @users_ns.route('users')
 class UserList(Resource):
 
     @classmethod
     @jwt_required
+    @conditional_get(lambda: DAO.get_users_version(get_jwt_identity()))
     @users_ns.doc('list_users')
     @users_ns.marshal_list_with(public_user_api_model)
-    @users_ns.expect(auth_header_parser)
+    @users_ns.expect(auth_header_parser, users_pagination_parser)
     def get(cls):
         """
-        Returns list of all the users.
+        Returns a page of the list of all the users.
+
+        The ID to use as after_id for the next page is returned in the
+        X-Next-Cursor header, which is absent on the last page.
         """
         user_id = get_jwt_identity()
-        return DAO.list_users(user_id)
+        args = users_pagination_parser.parse_args()
+        return DAO.list_users(user_id, after_id=args['after_id'], limit=args['limit'])
 
 
 @users_ns.route('users/<int:user_id>')
@@ -38,9 +54,11 @@ class OtherUser(Resource):
 
     @classmethod
     @jwt_required
+    @conditional_get(lambda user_id: DAO.get_user_version(user_id), cache_control=PUBLIC_PROFILE_CACHE_CONTROL)
     @users_ns.doc('get_user')
     @users_ns.expect(auth_header_parser)
     @users_ns.response(201, 'Success.', public_user_api_model)
+    @users_ns.response(304, 'User was not modified.')
     @users_ns.response(400, 'User id is not valid.')
     @users_ns.response(404, 'User does not exist.')
     def get(cls, user_id):
@@ -68,8 +86,10 @@ class MyUserProfile(Resource):
 
     @classmethod
     @jwt_required
+    @conditional_get(lambda: DAO.get_user_version(get_jwt_identity()))
     @users_ns.doc('get_user')
     @users_ns.expect(auth_header_parser, validate=True)
+    @users_ns.response(304, 'User was not modified.')
     @users_ns.marshal_with(full_user_api_model)  # , skip_none=True
     def get(cls):
         """
@@ -139,13 +159,91 @@ class VerifiedUser(Resource):
     @jwt_required
     @users_ns.doc('get_verified_users')
     @users_ns.marshal_list_with(public_user_api_model)  # , skip_none=True
-    @users_ns.expect(auth_header_parser)
+    @users_ns.expect(auth_header_parser, users_pagination_parser)
+    def get(cls):
+        """
+        Returns a page of the list of all verified users.
+
+        The ID to use as after_id for the next page is returned in the
+        X-Next-Cursor header, which is absent on the last page.
+        """
+        user_id = get_jwt_identity()
+        args = users_pagination_parser.parse_args()
+        return DAO.list_users(user_id, is_verified=True, after_id=args['after_id'], limit=args['limit'])
+
+
+@users_ns.route('users/search')
+class SearchUsers(Resource):
+
+    @classmethod
+    @jwt_required
+    @users_ns.doc('search_users')
+    @users_ns.marshal_list_with(public_user_api_model)
+    @users_ns.expect(auth_header_parser, users_search_parser)
+    def get(cls):
+        """
+        Returns a page of the users that match the search filters.
+
+        Users who are already in an accepted mentorship relation are not
+        returned. The ID to use as after_id for the next page is returned
+        in the X-Next-Cursor header, which is absent on the last page.
+        """
+        user_id = get_jwt_identity()
+        args = users_search_parser.parse_args()
+        return DAO.search_users(user_id,
+                                available_to_mentor=args['available_to_mentor'],
+                                need_mentoring=args['need_mentoring'],
+                                location=args['location'],
+                                organization=args['organization'],
+                                after_id=args['after_id'],
+                                limit=args['limit'])
+
+
+@users_ns.route('users/search/text')
+class TextSearchUsers(Resource):
+
+    @classmethod
+    @jwt_required
+    @users_ns.doc('text_search_users')
+    @users_ns.marshal_list_with(public_user_api_model)
+    @users_ns.expect(auth_header_parser, users_text_search_parser)
     def get(cls):
         """
-        Returns all verified users.
+        Returns a page of the users whose bio, skills or interests match the query.
+
+        Users are ranked from the best match. The number of the next page
+        is returned in the X-Next-Page header, which is absent on the last page.
         """
         user_id = get_jwt_identity()
-        return DAO.list_users(user_id, is_verified=True)
+        args = users_text_search_parser.parse_args()
+        return DAO.search_users_by_text(user_id, args['query'], page=args['page'], limit=args['limit'])
+
+
+@users_ns.route('user/mentor_recommendations')
+class MentorRecommendations(Resource):
+
+    @classmethod
+    @jwt_required
+    @users_ns.doc('get_mentor_recommendations')
+    @users_ns.expect(auth_header_parser, mentor_recommendations_parser)
+    @users_ns.response(200, 'Success.', [mentor_recommendation_api_model])
+    @users_ns.response(400, 'User is not available to be mentored.')
+    @users_ns.response(404, 'User does not exist.')
+    def get(cls):
+        """
+        Returns the mentors that best match the current user.
+
+        Mentors are ranked by how well their skills match the user interests,
+        and by sharing the user location and organization. Mentors already
+        in an accepted mentorship relation are not recommended.
+        """
+        user_id = get_jwt_identity()
+        args = mentor_recommendations_parser.parse_args()
+        response = MentorRecommendationDAO.recommend_mentors(user_id, limit=args['limit'])
+
+        if response[1] != 200:
+            return response
+        return marshal(response[0], mentor_recommendation_api_model), 200
 
 
 @users_ns.route('register')
@@ -167,12 +265,7 @@ class UserRegister(Resource):
         if is_valid != {}:
             return is_valid, 400
 
-        result = DAO.create_user(data)
-
-        if result[1] is 200:
-            send_email_verification_message(data['name'], data['email'])
-
-        return result
+        return DAO.create_user(data)
 
 
 @users_ns.route('user/confirm_email/<string:token>')
@@ -205,7 +298,7 @@ class UserResendEmailConfirmation(Resource):
         if user.is_email_verified:
             return {"message": "You already confirm your email."}, 403
 
-        send_email_verification_message(user.name, data['email'])
+        DAO.resend_email_verification_message(user.name, data['email'])
 
         return {"message": "Check your email, a new verification email was sent."}, 200
 
@@ -223,8 +316,9 @@ class LoginUser(Resource):
 
         The user can login with (username or email) + password.
         Username field can be either the User's username or the email.
-        The return value is an access token and the expiry timestamp.
-        The token is valid for 1 week.
+        The return value is an access token, valid for 15 minutes, and a
+        refresh token, valid for 4 weeks, with their expiry timestamps.
+        A new access token can be got from the refresh token at /refresh.
         """
         # if not request.is_json:
         #     return {'msg': 'Missing JSON in request'}, 400
@@ -237,21 +331,85 @@ class LoginUser(Resource):
         if not password:
             return {'message': 'The field password is missing.'}, 400
 
-        user = DAO.authenticate(username, password)
+        user = DAO.authenticate(username, password, request.remote_addr)
 
         if not user:
+            retry_after_seconds = DAO.get_login_retry_after_seconds(username, request.remote_addr)
+            if retry_after_seconds:
+                return {'message': 'Too many failed login attempts. Please, try again later.'}, 429, \
+                       {'Retry-After': int(math.ceil(retry_after_seconds))}
             return {'message': 'Username or password is wrong.'}, 404
 
         if not user.is_email_verified:
             return {'message': 'Please verify your email before login.'}, 403
 
-        access_token = create_access_token(identity=user.id)
+        # the token claims are taken from the user, see add_user_claims
+        access_token = create_access_token(identity=user)
+        refresh_token = create_refresh_token(identity=user)
 
-        from run import application
-        expiry = datetime.utcnow() + application.config.get('JWT_ACCESS_TOKEN_EXPIRES')
+        return {
+            'access_token': access_token,
+            'expiry': get_token_expiry('JWT_ACCESS_TOKEN_EXPIRES'),
+            'refresh_token': refresh_token,
+            'refresh_expiry': get_token_expiry('JWT_REFRESH_TOKEN_EXPIRES')
+        }, 200
+
+
+@users_ns.route('refresh')
+class RefreshAccessToken(Resource):
+
+    @classmethod
+    @jwt_refresh_token_required
+    @users_ns.doc('refresh')
+    @users_ns.response(200, 'Successful refresh', refresh_response_body_model)
+    @users_ns.expect(auth_header_parser)
+    def post(cls):
+        """
+        Refresh the access token
+
+        The authorization header has the refresh token returned at login,
+        instead of an access token. The return value is a new access token
+        and its expiry timestamp.
+        """
+        access_token = create_access_token(identity=get_jwt_identity())
 
         return {
             'access_token': access_token,
-            'expiry': expiry.timestamp()
+            'expiry': get_token_expiry('JWT_ACCESS_TOKEN_EXPIRES')
         }, 200
 
+
+@users_ns.route('logout')
+class LogoutUser(Resource):
+
+    @classmethod
+    @jwt_required
+    @users_ns.doc('logout')
+    @users_ns.expect(auth_header_parser, logout_request_body_model)
+    def post(cls):
+        """
+        Logout user
+
+        Revokes the access token of the authorization header and, if it is
+        sent, the refresh token of the request body.
+        """
+        refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+        if refresh_token:
+            try:
+                decoded_refresh_token = decode_token(refresh_token)
+            except (JWTExtendedException, InvalidTokenError):
+                return {'message': 'The refresh token is invalid!'}, 400
+            if decoded_refresh_token['type'] != 'refresh' or \
+                    decoded_refresh_token['identity'] != get_jwt_identity():
+                return {'message': 'The refresh token is invalid!'}, 400
+            token_revocations.revoke(decoded_refresh_token)
+
+        token_revocations.revoke(get_raw_jwt())
+
+        return {'message': 'Logged out successfully.'}, 200
+
+
+def get_token_expiry(expires_setting):
+    """Returns the UNIX timestamp at which a token created now expires."""
+    return (datetime.utcnow() + current_app.config[expires_setting]).timestamp()
+
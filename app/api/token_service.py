@@ -0,0 +1,59 @@
+import threading
+
+from flask import current_app
+from itsdangerous import TimestampSigner, URLSafeTimedSerializer, want_bytes
+
+
+class PrecomputedKeyTimestampSigner(TimestampSigner):
+    """TimestampSigner that derives its key from the secret key and the salt once, instead of for every token."""
+
+    def __init__(self, *args, **kwargs):
+        super(PrecomputedKeyTimestampSigner, self).__init__(*args, **kwargs)
+        self.derived_key = super(PrecomputedKeyTimestampSigner, self).derive_key()
+
+    def derive_key(self):
+        return self.derived_key
+
+
+class TokenService:
+    """
+    Generates and confirms the signed, timestamped tokens sent by email,
+    e.g. in the email verification link.
+
+    The serializer and its salted signer are built once per application,
+    from SECRET_KEY and SECURITY_PASSWORD_SALT of current_app, and are
+    built again only if those settings change. The tokens are the same
+    as the ones of a new URLSafeTimedSerializer.
+    """
+
+    def init_app(self, app):
+        app.extensions['token_service'] = {'lock': threading.Lock(), 'settings': None, 'signer': None}
+
+    def get_serializer_and_signer(self):
+        state = current_app.extensions['token_service']
+        settings = (current_app.config['SECRET_KEY'], current_app.config['SECURITY_PASSWORD_SALT'])
+
+        if state['settings'] != settings:
+            with state['lock']:
+                if state['settings'] != settings:
+                    secret_key, salt = settings
+                    serializer = URLSafeTimedSerializer(secret_key, signer=PrecomputedKeyTimestampSigner)
+                    state['signer'] = (serializer, serializer.make_signer(salt))
+                    state['settings'] = settings
+        return state['signer']
+
+    def generate_token(self, value):
+        serializer, signer = self.get_serializer_and_signer()
+        return signer.sign(want_bytes(serializer.dump_payload(value))).decode('utf-8')
+
+    def confirm_token(self, token, max_age):
+        """
+        Returns the value of a token.
+
+        :raises BadSignature: if the token was not signed with the current settings or is older than max_age seconds
+        """
+        serializer, signer = self.get_serializer_and_signer()
+        return serializer.load_payload(signer.unsign(token, max_age=max_age))
+
+
+token_service = TokenService()
@@ -0,0 +1,114 @@
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Repopulates the users full-text search index in bulk."""
+    from app.database.full_text_search import rebuild_users_index
+    indexed_users_count = rebuild_users_index()
+    click.echo('Indexed {} users.'.format(indexed_users_count))
+
+
+@click.command('fill-lowercase-fields')
+@with_appcontext
+def fill_lowercase_fields_command():
+    """Fills the lowercase username and email of the users created before they were stored."""
+    from app.database.models.user import UserModel
+    from app.database.sqlalchemy_extension import db
+    filled_users_count = UserModel.fill_lowercase_fields()
+    db.session.commit()
+    click.echo('Filled the lowercase fields of {} users.'.format(filled_users_count))
+
+
+@click.command('precompute-mentor-recommendations')
+@with_appcontext
+def precompute_mentor_recommendations_command():
+    """Stores the mentor recommendations of the mentees whose profile changed."""
+    from app.api.dao.mentor_recommendation import MentorRecommendationDAO
+    mentees_count = MentorRecommendationDAO.precompute_recommendations()
+    click.echo('Computed recommendations of {} mentees.'.format(mentees_count))
+
+
+@click.command('calibrate-password-hashing')
+@click.option('--target-ms', default=250, show_default=True,
+              help='Time in milliseconds that hashing one password should take.')
+@with_appcontext
+def calibrate_password_hashing_command(target_ms):
+    """Picks the password hash iterations for a target latency on this machine."""
+    from flask import current_app
+    from app.utils.password_utils import calibrate_password_hash_iterations
+    iterations = calibrate_password_hash_iterations(target_ms / 1000)
+    click.echo('Hashing a password with {} takes about {}ms with {} iterations.'.format(
+        current_app.config['PASSWORD_HASH_METHOD'], target_ms, iterations))
+    click.echo('Set PASSWORD_HASH_ITERATIONS = {} in config.py.'.format(iterations))
+
+
+@click.command('import-users')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'import_format', type=click.Choice(['csv', 'ndjson']),
+              help='Format of the file, by default taken from its extension.')
+@click.option('--base-url', help='Public URL of the API, used in the confirmation links. By default EMAIL_BASE_URL.')
+@with_appcontext
+def import_users_command(path, import_format, base_url):
+    """Creates the users of a CSV or NDJSON file, in batches, and adds their email verification messages."""
+    from flask import current_app
+    from app.api.dao.user_import import UserImportDAO
+    import_format = import_format or UserImportDAO.get_import_format(path)
+    if import_format is None:
+        raise click.BadParameter('cannot tell the format from the file extension, use --format.')
+    base_url = base_url or current_app.config['EMAIL_BASE_URL']
+    if not base_url:
+        raise click.BadParameter('the confirmation links need a base URL, use --base-url or set EMAIL_BASE_URL.')
+
+    with open(path, encoding='utf-8-sig', newline='') as lines, current_app.test_request_context(base_url=base_url):
+        report = UserImportDAO.import_users(lines, import_format)
+
+    for error in report['errors']:
+        click.echo('Row {}: {}'.format(error['row'], error['message']), err=True)
+    click.echo('Imported {} users, {} rows failed.'.format(report['imported'], report['failed']))
+
+
+@click.command('dispatch-emails')
+@click.option('--batch-size', type=int, help='Number of emails sent over one SMTP connection.')
+@click.option('--poll-seconds', default=5, show_default=True,
+              help='Seconds to wait when the outbox is empty or the emails could not be sent.')
+@click.option('--once', is_flag=True, help='Send one batch and exit, e.g. from a cron job.')
+@with_appcontext
+def dispatch_emails_command(batch_size, poll_seconds, once):
+    """Sends the emails of the outbox, in batches."""
+    import time
+    from app.api.dao.email_outbox import EmailOutboxDAO
+    while True:
+        sent_count, failed_count = EmailOutboxDAO.dispatch_emails(batch_size)
+        if sent_count or failed_count:
+            click.echo('Sent {} emails, {} failed.'.format(sent_count, failed_count))
+        if once:
+            break
+        # failed emails are not due right away, and an SMTP server that is down is not retried right away either
+        if not sent_count or failed_count:
+            time.sleep(poll_seconds)
+
+
+@click.command('resend-email-verification')
+@click.option('--base-url', required=True, help='Public URL of the API, used in the confirmation links.')
+@click.option('--batch-size', default=1000, show_default=True, help='Number of messages rendered at a time.')
+@with_appcontext
+def resend_email_verification_command(base_url, batch_size):
+    """Adds a new email verification message for every unverified user to the outbox."""
+    from flask import current_app
+    from app.api.dao.user import UserDAO
+    with current_app.test_request_context(base_url=base_url):
+        number_of_messages = UserDAO.resend_email_verification_messages(batch_size)
+    click.echo('Added {} email verification messages to the outbox.'.format(number_of_messages))
+
+
+def init_cli(app):
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(fill_lowercase_fields_command)
+    app.cli.add_command(precompute_mentor_recommendations_command)
+    app.cli.add_command(calibrate_password_hashing_command)
+    app.cli.add_command(import_users_command)
+    app.cli.add_command(dispatch_emails_command)
+    app.cli.add_command(resend_email_verification_command)
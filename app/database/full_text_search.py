@@ -0,0 +1,124 @@
+import re
+
+from sqlalchemy import DDL, bindparam, text
+
+from app.database.sqlalchemy_extension import db
+
+# Full-text search over the users free-text profile fields, using a SQLite
+# FTS5 virtual table where each row id is the id of the indexed user.
+# On other database engines the index is not created and searches return
+# no results.
+
+USERS_SEARCH_TABLE = 'users_fts'
+USERS_SEARCH_FIELDS = ['bio', 'skills', 'interests']
+
+CREATE_USERS_SEARCH_TABLE = "CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5({fields}, tokenize='unicode61')"\
+    .format(table=USERS_SEARCH_TABLE, fields=', '.join(USERS_SEARCH_FIELDS))
+
+# creates the index along with the users table of a new database
+create_users_search_table = DDL(CREATE_USERS_SEARCH_TABLE).execute_if(dialect='sqlite')
+
+drop_users_search_table = DDL(
+    'DROP TABLE IF EXISTS {table}'.format(table=USERS_SEARCH_TABLE)
+).execute_if(dialect='sqlite')
+
+
+def is_full_text_search_supported():
+    return db.engine.dialect.name == 'sqlite'
+
+
+def get_match_expression(search_text):
+    """
+    Builds an FTS5 query that matches all the words in search_text as
+    prefixes. Every word is quoted, so user input cannot use the FTS5
+    query syntax.
+    """
+    words = re.findall(r'\w+', search_text, re.UNICODE)
+    return ' '.join('"{}"*'.format(word) for word in words)
+
+
+def ensure_users_index():
+    """
+    Creates the search index if it is missing, as in databases whose users
+    table existed before the index was added, and indexes the existing
+    users in it. Does not commit.
+    """
+    if not is_full_text_search_supported():
+        return
+
+    index_exists = db.session.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :table",
+                                      {'table': USERS_SEARCH_TABLE}).first()
+    if index_exists is None:
+        db.session.execute(CREATE_USERS_SEARCH_TABLE)
+        fill_users_index()
+
+
+def fill_users_index():
+    """Indexes every user of the users table in a single statement and returns their number, without committing."""
+    return db.session.execute(
+        'INSERT INTO {table} (rowid, {fields}) SELECT id, {fields} FROM users'.format(
+            table=USERS_SEARCH_TABLE, fields=', '.join(USERS_SEARCH_FIELDS))).rowcount
+
+
+def index_user(user):
+    """Adds or replaces the search index entry of a user, without committing."""
+    if not is_full_text_search_supported():
+        return
+
+    db.session.execute('DELETE FROM {table} WHERE rowid = :id'.format(table=USERS_SEARCH_TABLE),
+                       {'id': user.id})
+    db.session.execute(
+        'INSERT INTO {table} (rowid, {fields}) VALUES (:id, :bio, :skills, :interests)'.format(
+            table=USERS_SEARCH_TABLE, fields=', '.join(USERS_SEARCH_FIELDS)),
+        {'id': user.id, 'bio': user.bio, 'skills': user.skills, 'interests': user.interests})
+
+
+def index_users(user_ids):
+    """Adds the search index entries of users that are not indexed yet, in one statement, without committing."""
+    if not is_full_text_search_supported() or not user_ids:
+        return
+
+    db.session.execute(text(
+        'INSERT INTO {table} (rowid, {fields}) SELECT id, {fields} FROM users WHERE id IN :ids'.format(
+            table=USERS_SEARCH_TABLE, fields=', '.join(USERS_SEARCH_FIELDS))
+    ).bindparams(bindparam('ids', expanding=True)), {'ids': list(user_ids)})
+
+
+def remove_user_from_index(user_id):
+    """Removes the search index entry of a user, without committing."""
+    if not is_full_text_search_supported():
+        return
+
+    db.session.execute('DELETE FROM {table} WHERE rowid = :id'.format(table=USERS_SEARCH_TABLE),
+                       {'id': user_id})
+
+
+def rebuild_users_index():
+    """
+    Repopulates the whole users search index from the users table in a
+    single statement and returns the number of indexed users.
+    """
+    if not is_full_text_search_supported():
+        return 0
+
+    db.session.execute(CREATE_USERS_SEARCH_TABLE)
+    db.session.execute('DELETE FROM {table}'.format(table=USERS_SEARCH_TABLE))
+    indexed_users_count = fill_users_index()
+    db.session.commit()
+    return indexed_users_count
+
+
+def search_users_ids(search_text, limit, offset=0, exclude_user_id=None):
+    """
+    Returns the ids of the users whose bio, skills or interests match
+    search_text, best matches first.
+    """
+    match_expression = get_match_expression(search_text)
+    if not match_expression or not is_full_text_search_supported():
+        return []
+
+    result = db.session.execute(
+        'SELECT rowid FROM {table} WHERE {table} MATCH :match AND rowid IS NOT :exclude_user_id '
+        'ORDER BY rank LIMIT :limit OFFSET :offset'.format(table=USERS_SEARCH_TABLE),
+        {'match': match_expression, 'exclude_user_id': exclude_user_id, 'limit': limit, 'offset': offset})
+    return [row[0] for row in result]
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+
+class IdentityCache:
+    """
+    Process-local LRU cache of the column values of database rows, whose
+    entries expire after a time to live.
+
+    Only plain column values are kept, never ORM instances, because those
+    belong to the session that loaded them. Every row can be cached under
+    several keys, e.g. ('id', 1) and ('username', 'joan'), which are all
+    removed together when the row identity is invalidated.
+
+    It is configured by the application settings with the given prefix:
+    <prefix>_ENABLED, <prefix>_MAX_SIZE and <prefix>_TTL (in seconds).
+    """
+
+    def __init__(self, config_prefix):
+        self.config_prefix = config_prefix
+        self.entries = OrderedDict()  # key -> (expiration time, identity, values)
+        self.keys_by_identity = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_config(self, name):
+        return current_app.config['%s_%s' % (self.config_prefix, name)]
+
+    def is_enabled(self):
+        return self.get_config('ENABLED')
+
+    def get(self, key):
+        """Returns the cached values of the key, or None if they are missing or expired."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove_identity(entry[1])
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key, identity, values):
+        expiration_time = time.monotonic() + self.get_config('TTL')
+        max_size = self.get_config('MAX_SIZE')
+
+        with self.lock:
+            self.entries[key] = (expiration_time, identity, values)
+            self.entries.move_to_end(key)
+            self.keys_by_identity.setdefault(identity, set()).add(key)
+
+            # evicts the least recently used entries
+            while len(self.entries) > max_size:
+                _, (_, evicted_identity, _) = self.entries.popitem(last=False)
+                self._remove_identity(evicted_identity)
+
+    def invalidate(self, identity):
+        with self.lock:
+            self._remove_identity(identity)
+
+    def _remove_identity(self, identity):
+        for key in self.keys_by_identity.pop(identity, ()):
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.keys_by_identity.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries)}
@@ -0,0 +1,22 @@
+from app.database.sqlalchemy_extension import db
+
+
+class AdminRevocationModel(db.Model):
+    # Specifying database table used for AdminRevocationModel
+    __tablename__ = 'admin_revocations'
+    __table_args__ = {'extend_existing': True}
+
+    # admin claims of tokens issued to the user before this timestamp are not trusted
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True, autoincrement=False)
+    revoked_at = db.Column(db.Float, nullable=False)
+
+    def __init__(self, user_id, revoked_at):
+        self.user_id = user_id
+        self.revoked_at = revoked_at
+
+    def __repr__(self):
+        return "Admin status of user %s was revoked at %s." % (self.user_id, self.revoked_at)
+
+    @classmethod
+    def find_by_user_id(cls, user_id):
+        return cls.query.filter_by(user_id=user_id).first()
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from app.database.sqlalchemy_extension import db
+
+
+class EmailOutboxModel(db.Model):
+    # Specifying database table used for EmailOutboxModel
+    __tablename__ = 'email_outbox'
+    __table_args__ = {'extend_existing': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(254), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    # a dispatcher claims a batch of emails by writing its id, so other dispatchers skip them
+    claimed_by = db.Column(db.String(32))
+    claimed_at = db.Column(db.DateTime)
+
+    sent_at = db.Column(db.DateTime, index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    # an email that failed is not claimed again before this time
+    next_attempt_at = db.Column(db.DateTime)
+
+    def __init__(self, recipient, subject, html):
+        self.recipient = recipient
+        self.subject = subject
+        self.html = html
+
+    def __repr__(self):
+        return "Email %s to %s" % (self.id, self.recipient)
+
+    def add_to_session(self):
+        """Adds the email to the current transaction, so it is only sent if the transaction is committed."""
+        db.session.add(self)
+
+    def save_to_db(self):
+        db.session.add(self)
+        db.session.commit()
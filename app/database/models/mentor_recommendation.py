@@ -0,0 +1,44 @@
+from app.database.sqlalchemy_extension import db
+
+
+class MentorRecommendationModel(db.Model):
+    # Specifying database table used for MentorRecommendationModel
+    __tablename__ = 'mentor_recommendations'
+    __table_args__ = {'extend_existing': True}
+
+    # the primary key keeps the recommendations of a mentee together and
+    # ordered by rank, so reading them is a single index range scan
+    mentee_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True, autoincrement=False)
+    rank = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    mentor_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+
+    def __repr__(self):
+        return "Mentor recommendation %s of mentee %s is mentor %s." % (self.rank, self.mentee_id, self.mentor_id)
+
+
+class MentorRecommendationsRunModel(db.Model):
+    # Specifying database table used for MentorRecommendationsRunModel
+    __tablename__ = 'mentor_recommendations_runs'
+    __table_args__ = {'extend_existing': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # profiles changed after this date were not taken into account by the run
+    started_at = db.Column(db.DateTime, nullable=False)
+    # fingerprint of the available mentors the run computed recommendations from
+    mentors_fingerprint = db.Column(db.String(40), nullable=False)
+    number_of_mentees = db.Column(db.Integer, nullable=False)
+
+    def __init__(self, started_at, mentors_fingerprint, number_of_mentees):
+        self.started_at = started_at
+        self.mentors_fingerprint = mentors_fingerprint
+        self.number_of_mentees = number_of_mentees
+
+    @classmethod
+    def find_last(cls):
+        return cls.query.order_by(cls.id.desc()).first()
+
+    def save_to_db(self):
+        db.session.add(self)
+        db.session.commit()
@@ -1,3 +1,7 @@
+from datetime import datetime
+
+from sqlalchemy import and_, or_, event, exists, inspect, literal_column, select, text, union
+
 from app.database.models.tasks_list import TasksListModel
 from app.database.models.user import UserModel
 from app.database.sqlalchemy_extension import db
@@ -7,7 +11,15 @@ from app.utils.enum_utils import MentorshipRelationState
 class MentorshipRelationModel(db.Model):
     # Specifying database table used for MentorshipRelationModel
     __tablename__ = 'mentorship_relations'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # the relations of a user are looked up as mentor or as mentee, usually of some states
+        db.Index('ix_mentorship_relations_mentor_id_state', 'mentor_id', 'state'),
+        db.Index('ix_mentorship_relations_mentee_id_state', 'mentee_id', 'state'),
+        # the accepted relations by end date, for the overdue ones; partial where the engine supports it
+        db.Index('ix_mentorship_relations_accepted_state_end_date', 'state', 'end_date',
+                 sqlite_where=text("state = 'ACCEPTED'"), postgresql_where=text("state = 'ACCEPTED'")),
+        {'extend_existing': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -33,6 +45,9 @@ class MentorshipRelationModel(db.Model):
     tasks_list_id = db.Column(db.Integer, db.ForeignKey('tasks_list.id'))
     tasks_list = db.relationship(TasksListModel, uselist=False, backref="mentorship_relation")
 
+    # last time the relation was changed, used as a version of its representation
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+
     def __init__(self, action_user_id, mentor_user, mentee_user, creation_date, end_date, state, notes, tasks_list):
 
         self.action_user_id = action_user_id
@@ -70,6 +85,24 @@ class MentorshipRelationModel(db.Model):
     def is_empty(cls):
         return cls.query.first() is None
 
+    @classmethod
+    def involves_user(cls, user_id):
+        """Returns a clause, true when the user is mentor or mentee of the relation."""
+        return or_(cls.mentor_id == user_id, cls.mentee_id == user_id)
+
+    @classmethod
+    def has_accepted_relation(cls, user_id_column):
+        """Returns an EXISTS clause, true when the user is mentor or mentee of an accepted relation."""
+        return exists().where(and_(cls.state == MentorshipRelationState.ACCEPTED,
+                                   or_(cls.mentor_id == user_id_column, cls.mentee_id == user_id_column)))
+
+    @classmethod
+    def overdue_accepted_relations(cls, timestamp):
+        """Returns a query of the accepted relations whose end date is before the timestamp."""
+        # the state is a literal, not a parameter, so the planner can tell the partial index covers the query
+        accepted = literal_column("'%s'" % MentorshipRelationState.ACCEPTED.name)
+        return cls.query.filter(cls.state == accepted, cls.end_date < timestamp)
+
     def save_to_db(self):
         db.session.add(self)
         db.session.commit()
@@ -78,3 +111,44 @@ class MentorshipRelationModel(db.Model):
         self.tasks_list.delete_from_db()
         db.session.delete(self)
         db.session.commit()
+
+
+def change_number_of_relations(connection, relation, change):
+    """Changes the relations counters of the mentor and mentee in the flush of the relation."""
+    users_table = UserModel.__table__
+    connection.execute(users_table.update()
+                       .where(users_table.c.id.in_([relation.mentor_id, relation.mentee_id]))
+                       # a counter is not a change of the profile, so the last update date is kept
+                       .values(number_of_relations=users_table.c.number_of_relations + change,
+                               relations_version=users_table.c.relations_version + 1,
+                               updated_at=users_table.c.updated_at))
+
+
+def increase_relations_version(connection, user_ids):
+    """Increases the relations versions of the users in the flush of a change of what is listed to them."""
+    users_table = UserModel.__table__
+    connection.execute(users_table.update()
+                       .where(users_table.c.id.in_(user_ids))
+                       .values(relations_version=users_table.c.relations_version + 1,
+                               updated_at=users_table.c.updated_at))
+
+
+def increase_partners_relations_version(connection, user):
+    """The names of the mentor and mentee are listed with the relations, so a new name changes the listings."""
+    if not inspect(user).attrs.name.history.has_changes():
+        return
+    relations_table = MentorshipRelationModel.__table__
+    increase_relations_version(connection, union(
+        select([relations_table.c.mentee_id]).where(relations_table.c.mentor_id == user.id),
+        select([relations_table.c.mentor_id]).where(relations_table.c.mentee_id == user.id)))
+
+
+event.listen(MentorshipRelationModel, 'after_insert',
+             lambda mapper, connection, relation: change_number_of_relations(connection, relation, 1))
+event.listen(MentorshipRelationModel, 'after_update',
+             lambda mapper, connection, relation: increase_relations_version(
+                 connection, [relation.mentor_id, relation.mentee_id]))
+event.listen(MentorshipRelationModel, 'after_delete',
+             lambda mapper, connection, relation: change_number_of_relations(connection, relation, -1))
+event.listen(UserModel, 'after_update',
+             lambda mapper, connection, user: increase_partners_relations_version(connection, user))
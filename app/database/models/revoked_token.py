@@ -0,0 +1,21 @@
+from app.database.sqlalchemy_extension import db
+
+
+class RevokedTokenModel(db.Model):
+    # Specifying database table used for RevokedTokenModel
+    __tablename__ = 'revoked_tokens'
+    __table_args__ = {'extend_existing': True}
+
+    # unique identifier (jti claim) of a revoked access or refresh token
+    jti = db.Column(db.String(36), primary_key=True)
+    revoked_at = db.Column(db.Float, nullable=False, index=True)
+    # the revocation can be forgotten once the token expires
+    expires_at = db.Column(db.Float, nullable=False, index=True)
+
+    def __init__(self, jti, revoked_at, expires_at):
+        self.jti = jti
+        self.revoked_at = revoked_at
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return "Token %s was revoked at %s." % (self.jti, self.revoked_at)
@@ -1,3 +1,4 @@
+from datetime import datetime
 from enum import unique, Enum
 
 from app.database.db_types.JsonCustomType import JsonCustomType
@@ -12,6 +13,9 @@ class TasksListModel(db.Model):
     tasks = db.Column(JsonCustomType)
     next_task_id = db.Column(db.Integer)
 
+    # last time the tasks were changed, used as a version of the tasks list
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+
     def __init__(self, tasks=None):
 
         if tasks is None:
@@ -1,12 +1,29 @@
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import bindparam, event, inspect, or_
+from sqlalchemy.orm import make_transient_to_detached, validates
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime
+from app.database.full_text_search import USERS_SEARCH_FIELDS, create_users_search_table, \
+    drop_users_search_table, index_user, remove_user_from_index
+from app.database.identity_cache import IdentityCache
+from app.database.models.users_version import UsersVersionModel
 from app.database.sqlalchemy_extension import db
+from app.utils.password_utils import generate_password_hash, check_password_hash, needs_rehash
+
+# lookups of users by id, username and email, shared by all the sessions of the process
+users_cache = IdentityCache('USER_CACHE')
 
 
 class UserModel(db.Model):
     # Specifying database table used for UserModel
     __tablename__ = 'users'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # composite indexes for the mentor/mentee discovery filters
+        db.Index('ix_users_available_to_mentor_location', 'available_to_mentor', 'location'),
+        db.Index('ix_users_available_to_mentor_organization', 'available_to_mentor', 'organization'),
+        db.Index('ix_users_need_mentoring_location', 'need_mentoring', 'location'),
+        db.Index('ix_users_need_mentoring_organization', 'need_mentoring', 'organization'),
+        {'extend_existing': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -15,6 +32,10 @@ class UserModel(db.Model):
     username = db.Column(db.String(30), unique=True)
     email = db.Column(db.String(30), unique=True)
 
+    # lowercase copies of username and email, so both are unique regardless of case
+    username_lower = db.Column(db.String(30), unique=True)
+    email_lower = db.Column(db.String(30), unique=True)
+
     # security
     password_hash = db.Column(db.String(100))
 
@@ -47,6 +68,16 @@ class UserModel(db.Model):
     need_mentoring = db.Column(db.Boolean)
     available_to_mentor = db.Column(db.Boolean)
 
+    # accepted mentorship relation of the user, if any, so it is known without querying the relations
+    active_relation_id = db.Column(db.Integer, index=True)
+    # number of mentorship relations of the user, kept by the MentorshipRelationModel events
+    number_of_relations = db.Column(db.Integer, nullable=False, default=0)
+    # version of the mentorship relations listed to the user, kept by the MentorshipRelationModel events
+    relations_version = db.Column(db.Integer, nullable=False, default=0)
+
+    # last time the user was changed, used to refresh data derived from the profile
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, index=True)
+
     def __init__(self, name, username, password, email, terms_and_conditions_checked):
         ## required fields
 
@@ -93,23 +124,94 @@ class UserModel(db.Model):
             'resume_url': self.resume_url,
             'photo_url': self.photo_url,
             'need_mentoring': self.need_mentoring,
-            'available_to_mentor': self.available_to_mentor
+            'available_to_mentor': self.available_to_mentor,
+            'updated_at': self.updated_at
         }
 
     def __repr__(self):
         return "User name id %s. Username is %s ." % (self.name, self.username)
 
+    @validates('username')
+    def normalize_username(self, key, username):
+        self.username_lower = username.lower() if username else username
+        return username
+
+    @validates('email')
+    def normalize_email(self, key, email):
+        self.email_lower = email.lower() if email else email
+        return email
+
     @classmethod
     def find_by_username(cls, username):
-        return cls.query.filter_by(username=username).first()
+        return cls.find_by_cached_field('username_lower', username.lower())
 
     @classmethod
     def find_by_email(cls, email):
-        return cls.query.filter_by(email=email).first()
+        return cls.find_by_cached_field('email_lower', email.lower())
+
+    @classmethod
+    def fill_lowercase_fields(cls):
+        """
+        Fills the lowercase username and email of the users created before
+        they were stored, so find_by_username and find_by_email find them.
+        They are lowered in Python, as by the validators, since the lower()
+        of SQLite only lowers ASCII letters. Returns the number of filled
+        users. The change is not committed.
+        """
+        users = db.session.query(cls.id, cls.username, cls.email) \
+            .filter(or_(cls.username_lower.is_(None), cls.email_lower.is_(None))) \
+            .all()
+        if users:
+            users_table = cls.__table__
+            db.session.execute(
+                users_table.update()
+                .where(users_table.c.id == bindparam('user_id'))
+                # filling derived fields is not a change of the profile, so the last update date is kept
+                .values(username_lower=bindparam('new_username_lower'), email_lower=bindparam('new_email_lower'),
+                        updated_at=users_table.c.updated_at),
+                [{'user_id': user_id, 'new_username_lower': username.lower() if username else username,
+                  'new_email_lower': email.lower() if email else email} for user_id, username, email in users])
+        return len(users)
 
     @classmethod
     def find_by_id(cls, _id):
-        return cls.query.filter_by(id=_id).first()
+        return cls.find_by_cached_field('id', _id)
+
+    @classmethod
+    def find_by_cached_field(cls, field, value):
+        """
+        Returns the user with the given field value, using the users cache.
+        Users that do not exist are not cached, so new users are found.
+        """
+        if not users_cache.is_enabled():
+            return cls.query.filter_by(**{field: value}).first()
+
+        key = (field, value)
+        values = users_cache.get(key)
+        if values is not None:
+            return cls.from_cached_values(values)
+
+        user = cls.query.filter_by(**{field: value}).first()
+        if user is not None:
+            users_cache.set(key, user.id, {column.key: getattr(user, column.key) for column in cls.__table__.columns})
+        return user
+
+    @classmethod
+    def from_cached_values(cls, values):
+        """
+        Returns a user of the current session with the cached column values,
+        without querying the database. If the session already has the user,
+        that instance is returned untouched, keeping its pending changes.
+        """
+        session_user = db.session.identity_map.get(cls.__mapper__.identity_key_from_primary_key([values['id']]))
+        if session_user is not None:
+            return session_user
+
+        user = cls.__mapper__.class_manager.new_instance()
+        for key, value in values.items():
+            set_committed_value(user, key, value)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
 
     @classmethod
     def get_all_admins(cls, is_admin=True):
@@ -119,6 +221,42 @@ class UserModel(db.Model):
     def is_empty(cls):
         return cls.query.first() is None
 
+    @classmethod
+    def set_active_relation(cls, user_ids, relation_id):
+        """
+        Sets the active relation of the users in a single UPDATE, which only
+        changes the users without an active relation, so concurrent requests
+        cannot give a user two of them. Returns True if all the users were
+        changed. The change is not committed.
+        """
+        updated_count = cls.query \
+            .filter(cls.id.in_(user_ids), cls.active_relation_id.is_(None)) \
+            .update({cls.active_relation_id: relation_id}, synchronize_session=False)
+        # the users stop being available mentors
+        UsersVersionModel.increase_version()
+        return updated_count == len(user_ids)
+
+    @classmethod
+    def clear_active_relations(cls, relation_ids):
+        """
+        Clears the active relation of the users in any of the relations and
+        returns their IDs. The change is not committed.
+        """
+        if not relation_ids:
+            return []
+
+        user_ids = [user_id for user_id, in db.session.query(cls.id).filter(cls.active_relation_id.in_(relation_ids))]
+        if user_ids:
+            cls.query.filter(cls.id.in_(user_ids)).update({cls.active_relation_id: None}, synchronize_session=False)
+            UsersVersionModel.increase_version()
+        return user_ids
+
+    @staticmethod
+    def invalidate_cached_users(user_ids):
+        # called once the changes of the users are committed, so they are not cached again before
+        for user_id in user_ids:
+            users_cache.invalidate(user_id)
+
     def set_password(self, password_plain_text):
         self.password_hash = generate_password_hash(password_plain_text)
 
@@ -126,10 +264,33 @@ class UserModel(db.Model):
     def check_password(self, password_plain_text):
         return check_password_hash(self.password_hash, password_plain_text)
 
+    # checks if the password hash was generated with outdated hashing settings
+    def is_password_hash_outdated(self):
+        return needs_rehash(self.password_hash)
+
+    def is_search_text_changed(self):
+        user_state = inspect(self)
+        return any(user_state.attrs[field].history.has_changes() for field in USERS_SEARCH_FIELDS)
+
     def save_to_db(self):
+        # the search index is kept in sync in the same transaction
+        is_search_text_changed = self.is_search_text_changed()
         db.session.add(self)
+        if is_search_text_changed:
+            db.session.flush()
+            index_user(self)
+        UsersVersionModel.increase_version()
         db.session.commit()
+        users_cache.invalidate(self.id)
 
     def delete_from_db(self):
+        user_id = self.id
+        remove_user_from_index(user_id)
         db.session.delete(self)
+        UsersVersionModel.increase_version()
         db.session.commit()
+        users_cache.invalidate(user_id)
+
+
+event.listen(UserModel.__table__, 'after_create', create_users_search_table)
+event.listen(UserModel.__table__, 'before_drop', drop_users_search_table)
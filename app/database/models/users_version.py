@@ -0,0 +1,34 @@
+from app.database.sqlalchemy_extension import db
+
+
+class UsersVersionModel(db.Model):
+    # Specifying database table used for UsersVersionModel
+    __tablename__ = 'users_version'
+    __table_args__ = {'extend_existing': True}
+
+    # a single row, whose version increases whenever a user is added, updated or removed
+    ROW_ID = 1
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.Integer, nullable=False)
+
+    def __init__(self, version):
+        self.id = UsersVersionModel.ROW_ID
+        self.version = version
+
+    def __repr__(self):
+        return "Users version %s." % self.version
+
+    @classmethod
+    def get_version(cls):
+        """Returns the current version of the users, 0 before any user changed."""
+        version = db.session.query(cls.version).filter(cls.id == UsersVersionModel.ROW_ID).scalar()
+        return version or 0
+
+    @classmethod
+    def increase_version(cls):
+        """Increases the version of the users in the current transaction, without committing."""
+        updated_count = cls.query.filter(cls.id == UsersVersionModel.ROW_ID) \
+            .update({cls.version: cls.version + 1}, synchronize_session=False)
+        if not updated_count:
+            db.session.add(cls(1))
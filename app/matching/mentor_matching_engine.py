@@ -0,0 +1,230 @@
+import re
+import zlib
+from functools import lru_cache
+from itertools import chain
+
+import numpy as np
+
+# Terms are hashed into a fixed number of features, so the engine does not
+# need to keep a vocabulary of every skill and interest ever typed.
+FEATURES_DIMENSION = 2 ** 14
+
+TERMS_REGEX = re.compile(r'\w+', re.UNICODE)
+
+
+def get_terms(text):
+    """Returns the set of lowercase words of a free-text profile field."""
+    if not text:
+        return set()
+    return set(TERMS_REGEX.findall(text.lower()))
+
+
+@lru_cache(maxsize=2 ** 16)
+def get_feature(term):
+    # crc32 is stable across processes, unlike the builtin hash of strings
+    return zlib.crc32(term.encode('utf-8')) % FEATURES_DIMENSION
+
+
+def get_features(text):
+    """Returns the sorted unique features of a text and their L2 normalized weights."""
+    features = np.unique(np.array([get_feature(term) for term in get_terms(text)], dtype=np.int64))
+    weights = np.full(len(features), 1 / np.sqrt(max(len(features), 1)), dtype=np.float32)
+    return features, weights
+
+
+def normalize_place(place):
+    return place.strip().lower() if place else ''
+
+
+class MentorMatchingEngine:
+    """
+    Scores available mentors against a mentee with matrix operations.
+
+    The score of a mentor is the cosine similarity between the mentee
+    interests and the mentor skills, plus a bonus when both have the same
+    location and another one when both have the same organization.
+
+    Mentor skills are kept as a sparse matrix of hashed terms, both in
+    compressed sparse column format, so scoring every mentor only touches
+    the mentors that share a term with the mentee, and in compressed sparse
+    row format, so a subset of mentors can be scored on its own.
+
+    For very large numbers of mentors, the optional random projection LSH
+    index narrows the scoring down to the mentors whose skills point in a
+    similar direction to the mentee interests.
+    """
+
+    LOCATION_WEIGHT = 0.5
+    ORGANIZATION_WEIGHT = 0.25
+
+    LSH_TABLES = 8
+    LSH_BITS_PER_TABLE = 8
+    LSH_SEED = 2018
+    LSH_CHUNK_SIZE = 2 ** 16
+
+    def __init__(self, mentors, use_lsh=False):
+        """
+        :param mentors: iterable of (id, skills, location, organization) tuples
+        :param use_lsh: whether to build the random projection LSH index
+        """
+        mentors = list(mentors)
+        self.mentor_ids = np.array([mentor[0] for mentor in mentors], dtype=np.int64)
+
+        features_per_mentor = [sorted({get_feature(term) for term in get_terms(mentor[1])}) for mentor in mentors]
+        lengths = np.fromiter(map(len, features_per_mentor), dtype=np.int64, count=len(mentors))
+
+        # compressed sparse row format: the features of the mentor in row r
+        # are row_features[rows_start[r]:rows_start[r + 1]]
+        self.rows_start = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        self.row_features = np.fromiter(chain.from_iterable(features_per_mentor), dtype=np.int64,
+                                        count=self.rows_start[-1])
+        self.row_weights = np.repeat((1 / np.sqrt(np.maximum(lengths, 1))).astype(np.float32), lengths)
+        rows = np.repeat(np.arange(len(mentors), dtype=np.int64), lengths)
+
+        # compressed sparse column format: the mentors having the feature f
+        # are column_rows[columns_start[f]:columns_start[f + 1]]
+        order = np.argsort(self.row_features, kind='mergesort')
+        self.column_rows = rows[order]
+        self.column_weights = self.row_weights[order]
+        self.columns_start = np.concatenate(
+            ([0], np.cumsum(np.bincount(self.row_features, minlength=FEATURES_DIMENSION)))).astype(np.int64)
+
+        self.location_codes, self.location_code_by_name = self.encode_places(
+            [mentor[2] for mentor in mentors])
+        self.organization_codes, self.organization_code_by_name = self.encode_places(
+            [mentor[3] for mentor in mentors])
+
+        self.lsh_tables = None
+        if use_lsh:
+            self.build_lsh_index(rows)
+
+    def __len__(self):
+        return len(self.mentor_ids)
+
+    @staticmethod
+    def encode_places(places):
+        """Maps place names to integer codes, where -1 stands for an empty place."""
+        code_by_name = {'': -1}
+        codes = np.fromiter((code_by_name.setdefault(normalize_place(place), len(code_by_name) - 1)
+                             for place in places), dtype=np.int64, count=len(places))
+        del code_by_name['']
+        return codes, code_by_name
+
+    def get_mentee_vector(self, interests):
+        features, weights = get_features(interests)
+        mentee_vector = np.zeros(FEATURES_DIMENSION, dtype=np.float32)
+        mentee_vector[features] = weights
+        return features, mentee_vector
+
+    def get_place_bonus(self, location, organization, rows):
+        location_codes = self.location_codes[rows]
+        bonus = np.zeros(len(location_codes), dtype=np.float32)
+
+        location_code = self.location_code_by_name.get(normalize_place(location))
+        if location_code is not None:
+            bonus += self.LOCATION_WEIGHT * (location_codes == location_code)
+
+        organization_code = self.organization_code_by_name.get(normalize_place(organization))
+        if organization_code is not None:
+            bonus += self.ORGANIZATION_WEIGHT * (self.organization_codes[rows] == organization_code)
+
+        return bonus
+
+    def get_scores(self, interests, location=None, organization=None):
+        """Returns the score of every mentor, in the order the mentors were given."""
+        features, mentee_vector = self.get_mentee_vector(interests)
+
+        scores = np.zeros(len(self.mentor_ids), dtype=np.float32)
+        for feature in features:
+            column = slice(self.columns_start[feature], self.columns_start[feature + 1])
+            scores[self.column_rows[column]] += self.column_weights[column] * mentee_vector[feature]
+
+        return scores + self.get_place_bonus(location, organization, slice(None))
+
+    def get_rows_scores(self, rows, interests, location=None, organization=None):
+        """Returns the scores of the mentors in the given rows only."""
+        _, mentee_vector = self.get_mentee_vector(interests)
+
+        starts = self.rows_start[rows]
+        lengths = self.rows_start[rows + 1] - starts
+        # positions of all the features of the given rows in the row format arrays
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        positions = offsets + np.arange(lengths.sum(), dtype=np.int64)
+
+        scores = np.zeros(len(rows), dtype=np.float32)
+        np.add.at(scores, np.repeat(np.arange(len(rows)), lengths),
+                  mentee_vector[self.row_features[positions]] * self.row_weights[positions])
+
+        return scores + self.get_place_bonus(location, organization, rows)
+
+    def build_lsh_index(self, rows):
+        random_state = np.random.RandomState(self.LSH_SEED)
+        self.projection = random_state.standard_normal(
+            (FEATURES_DIMENSION, self.LSH_TABLES * self.LSH_BITS_PER_TABLE)).astype(np.float32)
+
+        # the sparse by dense product is computed in chunks of mentors to bound memory
+        keys = np.zeros((len(self.mentor_ids), self.LSH_TABLES), dtype=np.int64)
+        for first_row in range(0, len(self.mentor_ids), self.LSH_CHUNK_SIZE):
+            last_row = min(first_row + self.LSH_CHUNK_SIZE, len(self.mentor_ids))
+            starts = self.rows_start[first_row:last_row + 1]
+            chunk = slice(starts[0], starts[-1])
+
+            weighted_projections = self.projection[self.row_features[chunk]] * self.row_weights[chunk, None]
+            projections = np.zeros((last_row - first_row, self.projection.shape[1]), dtype=np.float32)
+            # reduceat sums the features of each mentor, mentors without skills keep a null projection
+            has_features = starts[1:] > starts[:-1]
+            if has_features.any():
+                projections[has_features] = np.add.reduceat(
+                    weighted_projections, starts[:-1][has_features] - starts[0], axis=0)
+            keys[first_row:last_row] = self.get_lsh_keys(projections)
+
+        self.lsh_tables = []
+        for table in range(self.LSH_TABLES):
+            order = np.argsort(keys[:, table], kind='mergesort')
+            self.lsh_tables.append((keys[order, table], order))
+
+    def get_lsh_keys(self, projections):
+        """Packs the signs of the projections into one integer key per LSH table."""
+        bits = (projections > 0).reshape(len(projections), self.LSH_TABLES, self.LSH_BITS_PER_TABLE)
+        powers = 1 << np.arange(self.LSH_BITS_PER_TABLE, dtype=np.int64)
+        return (bits * powers).sum(axis=2)
+
+    def get_lsh_candidates(self, interests):
+        """Returns the rows of the mentors sharing an LSH bucket with the mentee in any table."""
+        features, mentee_vector = self.get_mentee_vector(interests)
+        if not len(features):
+            return np.array([], dtype=np.int64)
+
+        projection = mentee_vector[features].dot(self.projection[features])
+        keys = self.get_lsh_keys(projection[None, :])[0]
+
+        candidates = []
+        for table, (sorted_keys, table_rows) in enumerate(self.lsh_tables):
+            start, end = np.searchsorted(sorted_keys, [keys[table], keys[table] + 1])
+            candidates.append(table_rows[start:end])
+        return np.unique(np.concatenate(candidates))
+
+    def get_top_mentors(self, interests, location=None, organization=None, k=10, exclude_ids=()):
+        """
+        Returns up to k (mentor id, score) tuples with the best positive
+        scores, best first.
+        """
+        if self.lsh_tables is not None:
+            rows = self.get_lsh_candidates(interests)
+            scores = self.get_rows_scores(rows, interests, location, organization)
+        else:
+            rows = np.arange(len(self.mentor_ids))
+            scores = self.get_scores(interests, location, organization)
+
+        if exclude_ids:
+            scores[np.isin(self.mentor_ids[rows], list(exclude_ids))] = 0
+
+        k = min(k, len(scores))
+        if k < 1:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='mergesort')]
+        top = top[scores[top] > 0]
+
+        return [(int(self.mentor_ids[rows[index]]), float(scores[index])) for index in top]
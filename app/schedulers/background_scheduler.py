@@ -1,5 +1,7 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from app.schedulers.complete_mentorship_cron_job import complete_overdue_mentorship_relations_job
+from app.schedulers.dispatch_emails_cron_job import dispatch_emails_job
+from app.schedulers.mentor_recommendations_cron_job import precompute_mentor_recommendations_job
 
 
 def init_scheduler():
@@ -11,6 +13,18 @@ def init_scheduler():
                       trigger='cron', hour=23, minute=59, second=0, day='*', timezone='Etc/UTC',
                       replace_existing=True)
 
+    # This cron job runs every hour at minute 30
+    # Purpose: precompute the mentor recommendations of users whose profile changed
+    scheduler.add_job(id='precompute_mentor_recommendations_cron', func=precompute_mentor_recommendations_job,
+                      trigger='cron', minute=30, second=0, timezone='Etc/UTC',
+                      replace_existing=True)
+
+    # This job runs every 30 seconds
+    # Purpose: send the emails of the outbox, such as the email verification messages
+    scheduler.add_job(id='dispatch_emails_cron', func=dispatch_emails_job,
+                      trigger='interval', seconds=30,
+                      replace_existing=True)
+
     # for tests purposes
     # scheduler.add_job(id='complete_mentorship_relations_cron', func=complete_overdue_mentorship_relations_job,
     #                   trigger='interval', seconds=4,
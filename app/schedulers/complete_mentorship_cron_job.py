@@ -3,24 +3,23 @@ from datetime import datetime
 
 def complete_overdue_mentorship_relations_job():
     """
-    This function iterates of all the mentorship requests and
-    checks if the end date of the relation has passed the current date
-    and is in the ACCEPTED state
-    if True then marks the relation as COMPLETED, if False does nothing
+    This function marks as COMPLETED the mentorship relations
+    that are in the ACCEPTED state and whose end date has
+    passed the current date
     """
     from run import application
     with application.app_context():
         from app.utils.enum_utils import MentorshipRelationState
         from app.database.models.mentorship_relation import MentorshipRelationModel
-        all_relations = MentorshipRelationModel.query.all()
+        from app.database.models.user import UserModel
+        from app.database.sqlalchemy_extension import db
 
         current_date_timestamp = datetime.now().timestamp()
+        overdue_relations = MentorshipRelationModel.overdue_accepted_relations(current_date_timestamp).all()
 
-        for relation in all_relations:
+        for relation in overdue_relations:
+            relation.state = MentorshipRelationState.COMPLETED
+        user_ids = UserModel.clear_active_relations([relation.id for relation in overdue_relations])
 
-            if relation.state is MentorshipRelationState.ACCEPTED and relation.end_date < current_date_timestamp:
-                relation.state = MentorshipRelationState.COMPLETED
-                relation.save_to_db()
-
-            # for tests purposes
-            # print('{} | hola hola hola hola hola'.format(datetime.now()))
+        db.session.commit()
+        UserModel.invalidate_cached_users(user_ids)
@@ -0,0 +1,17 @@
+def dispatch_emails_job():
+    """
+    This function sends the emails of the outbox that are due, batch after
+    batch, until a batch is not full or some of its emails were not sent.
+    """
+    from run import application
+    with application.app_context():
+        from flask import current_app
+        if not current_app.config['EMAIL_OUTBOX_SCHEDULER_ENABLED']:
+            return
+
+        from app.api.dao.email_outbox import EmailOutboxDAO
+        batch_size = current_app.config['EMAIL_OUTBOX_BATCH_SIZE']
+        while True:
+            sent_count, failed_count = EmailOutboxDAO.dispatch_emails(batch_size)
+            if sent_count < batch_size or failed_count:
+                break
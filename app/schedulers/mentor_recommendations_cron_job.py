@@ -0,0 +1,10 @@
+def precompute_mentor_recommendations_job():
+    """
+    This function stores the top mentor recommendations of every user who
+    needs mentoring, computing them again only for the users whose profile
+    changed since the last run, unless the available mentors changed too.
+    """
+    from run import application
+    with application.app_context():
+        from app.api.dao.mentor_recommendation import MentorRecommendationDAO
+        MentorRecommendationDAO.precompute_recommendations()
@@ -0,0 +1,91 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from flask import current_app
+from werkzeug import security
+
+# Password hashing is CPU bound, so it runs in a bounded pool of worker
+# threads, shared by all the requests of the process. Under a burst of
+# logins, at most PASSWORD_HASHING_WORKERS hashes are computed at the same
+# time and the other requests keep some CPU. hashlib releases the GIL
+# while hashing, so the workers run in parallel.
+_hashing_executor = None
+_hashing_executor_lock = threading.Lock()
+
+
+def get_hashing_executor():
+    global _hashing_executor
+    if _hashing_executor is None:
+        with _hashing_executor_lock:
+            if _hashing_executor is None:
+                _hashing_executor = ThreadPoolExecutor(
+                    max_workers=current_app.config['PASSWORD_HASHING_WORKERS'],
+                    thread_name_prefix='password-hashing')
+    return _hashing_executor
+
+
+def get_password_hash_method(method=None, iterations=None):
+    """
+    Returns the werkzeug hash method of the configured hash method and
+    number of iterations, e.g. pbkdf2:sha256:50000.
+    """
+    if method is None:
+        method = current_app.config['PASSWORD_HASH_METHOD']
+    if iterations is None:
+        iterations = current_app.config['PASSWORD_HASH_ITERATIONS']
+
+    if method.startswith('pbkdf2:'):
+        return '%s:%d' % (method, iterations)
+    return method
+
+
+def generate_password_hash(password):
+    method = get_password_hash_method()
+    return get_hashing_executor().submit(security.generate_password_hash, password, method).result()
+
+
+def generate_password_hashes(passwords):
+    """Returns the hashes of many passwords, computed in parallel by the hashing workers."""
+    method = get_password_hash_method()
+    return list(get_hashing_executor().map(partial(security.generate_password_hash, method=method), passwords))
+
+
+def check_password_hash(password_hash, password):
+    return get_hashing_executor().submit(security.check_password_hash, password_hash, password).result()
+
+
+def needs_rehash(password_hash):
+    """Returns True when the hash was not generated with the configured method and iterations."""
+    return password_hash.split('$', 1)[0] != get_password_hash_method()
+
+
+def calibrate_password_hash_iterations(target_seconds, method=None, samples=5):
+    """
+    Returns the number of PBKDF2 iterations that takes about target_seconds
+    to hash a password on this machine.
+
+    The time of a hash grows linearly with the number of iterations, so
+    it is measured with a known number of iterations and then scaled.
+    The best of a few samples is used to leave out noise.
+    """
+    if method is None:
+        method = current_app.config['PASSWORD_HASH_METHOD']
+    if not method.startswith('pbkdf2:'):
+        raise ValueError('Only pbkdf2 hash methods have a configurable number of iterations.')
+
+    iterations = 10000
+    while True:
+        hash_method = get_password_hash_method(method, iterations)
+        elapsed_seconds = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            security.generate_password_hash('calibration password', hash_method)
+            elapsed_seconds.append(time.perf_counter() - start)
+        best_seconds = min(elapsed_seconds)
+
+        # measurements shorter than 50ms are too noisy to scale from
+        if best_seconds >= 0.05 or best_seconds >= target_seconds:
+            return max(1000, int(iterations * target_seconds / best_seconds))
+        iterations *= 4
@@ -0,0 +1,220 @@
+"""
+Latency benchmark of the login and registration endpoints.
+
+Seeds a database with verified users, then sends requests to POST /login
+and POST /register through the Flask test client, from several threads
+at a time, and reports the latency percentiles and the throughput of
+each endpoint at each concurrency level. No email is sent: registration
+only writes the verification email to the outbox, which the testing
+config does not dispatch.
+
+Run it from the repository root:
+
+    python -m benchmarks.auth_endpoints --users 1000 --requests 200 --output results.json
+    python -m benchmarks.auth_endpoints --compare results.json --output new_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from config import BaseConfig
+
+PASSWORD = 'benchmark password'
+ENDPOINTS = ('login', 'register')
+
+
+def create_benchmark_app(database_path, hash_iterations):
+    from run import application
+
+    application.config.from_object('config.TestingConfig')
+    application.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + database_path
+    application.config['SECRET_KEY'] = 'BENCHMARK_SECRET_KEY'
+    application.config['SECURITY_PASSWORD_SALT'] = 'BENCHMARK_SECURITY_PWD_SALT'
+    # the costs of production are measured, not the shortcuts of the tests
+    application.config['PASSWORD_HASH_ITERATIONS'] = hash_iterations
+    application.config['USER_CACHE_ENABLED'] = BaseConfig.USER_CACHE_ENABLED
+    return application
+
+
+def seed_users(number_of_users):
+    """Inserts verified users in bulk, all with the same password, and returns their usernames."""
+    from app.database.models.user import UserModel
+    from app.database.sqlalchemy_extension import db
+    from app.utils.password_utils import generate_password_hash
+
+    db.create_all()
+    password_hash = generate_password_hash(PASSWORD)
+    now = datetime.now()
+    usernames = ['benchmark_user_%d' % index for index in range(number_of_users)]
+    db.session.execute(UserModel.__table__.insert(), [dict(
+        name='Benchmark User',
+        username=username,
+        username_lower=username,
+        email='%s@email.com' % username,
+        email_lower='%s@email.com' % username,
+        password_hash=password_hash,
+        registration_date=now,
+        terms_and_conditions_checked=True,
+        is_admin=False,
+        is_email_verified=True,
+        need_mentoring=False,
+        available_to_mentor=False
+    ) for username in usernames])
+    db.session.commit()
+    return usernames
+
+
+def get_login_request(usernames):
+    def login_request(request_number):
+        return '/login', {'username': random.choice(usernames), 'password': PASSWORD}
+    return login_request
+
+
+def get_register_request(run_id):
+    def register_request(request_number):
+        username = 'new_user_%s_%d' % (run_id, request_number)
+        return '/register', {
+            'name': 'New User',
+            'username': username,
+            'password': PASSWORD,
+            'email': '%s@email.com' % username,
+            'terms_and_conditions_checked': True
+        }
+    return register_request
+
+
+def get_percentile(sorted_values, percentile):
+    """Returns the nearest-rank percentile of a sorted list."""
+    index = max(0, int(round(percentile / 100 * len(sorted_values))) - 1)
+    return sorted_values[index]
+
+
+def run_level(app, endpoint, make_request, number_of_requests, concurrency):
+    """Sends number_of_requests requests from concurrency threads and returns the latency statistics."""
+    thread_data = threading.local()
+
+    def send_request(request_number):
+        # a test client is not shared between threads
+        if not hasattr(thread_data, 'client'):
+            thread_data.client = app.test_client()
+        client = thread_data.client
+        url, data = make_request(request_number)
+        start = time.perf_counter()
+        response = client.post(url, data=json.dumps(data), content_type='application/json')
+        return time.perf_counter() - start, response.status_code
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        results = list(executor.map(send_request, range(number_of_requests)))
+        elapsed_seconds = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        'endpoint': endpoint,
+        'concurrency': concurrency,
+        'requests': number_of_requests,
+        'errors': sum(1 for _, status_code in results if status_code != 200),
+        'mean_ms': sum(latencies) / len(latencies) * 1000,
+        'p50_ms': get_percentile(latencies, 50) * 1000,
+        'p95_ms': get_percentile(latencies, 95) * 1000,
+        'p99_ms': get_percentile(latencies, 99) * 1000,
+        'requests_per_second': number_of_requests / elapsed_seconds
+    }
+
+
+def run_benchmark(number_of_users, number_of_requests, concurrency_levels, hash_iterations, endpoints=ENDPOINTS):
+    """Runs the benchmark on a new SQLite database and returns the report."""
+    with tempfile.TemporaryDirectory() as directory:
+        # an in-memory database would be a different database for every thread
+        app = create_benchmark_app(os.path.join(directory, 'benchmark.db'), hash_iterations)
+        with app.app_context():
+            usernames = seed_users(number_of_users)
+
+            results = []
+            for endpoint in endpoints:
+                for concurrency in concurrency_levels:
+                    if endpoint == 'login':
+                        make_request = get_login_request(usernames)
+                    else:
+                        make_request = get_register_request(concurrency)
+                    results.append(run_level(app, endpoint, make_request, number_of_requests, concurrency))
+
+            from app.database.sqlalchemy_extension import db
+            db.session.remove()
+            db.get_engine().dispose()
+
+    return {
+        'created_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'settings': {
+            'users': number_of_users,
+            'requests': number_of_requests,
+            'concurrency_levels': concurrency_levels,
+            'password_hash_iterations': hash_iterations
+        },
+        'results': results
+    }
+
+
+def print_results(report, previous_report=None):
+    previous_results = {}
+    if previous_report:
+        previous_results = {(result['endpoint'], result['concurrency']): result
+                            for result in previous_report['results']}
+
+    print('%-10s %11s %9s %9s %9s %9s %8s' % ('endpoint', 'concurrency', 'p50 ms', 'p95 ms', 'p99 ms', 'req/s',
+                                              'errors'))
+    for result in report['results']:
+        line = '%-10s %11d %9.1f %9.1f %9.1f %9.1f %8d' % (
+            result['endpoint'], result['concurrency'], result['p50_ms'], result['p95_ms'], result['p99_ms'],
+            result['requests_per_second'], result['errors'])
+
+        previous_result = previous_results.get((result['endpoint'], result['concurrency']))
+        if previous_result:
+            line += '   p95 %+.0f%%, req/s %+.0f%%' % (
+                (result['p95_ms'] / previous_result['p95_ms'] - 1) * 100,
+                (result['requests_per_second'] / previous_result['requests_per_second'] - 1) * 100)
+        print(line)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmark of the login and registration endpoints.')
+    parser.add_argument('--users', type=int, default=1000, help='Number of users in the database.')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Number of requests sent to each endpoint at each concurrency level.')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16],
+                        help='Numbers of requests sent at the same time.')
+    parser.add_argument('--hash-iterations', type=int, default=BaseConfig.PASSWORD_HASH_ITERATIONS,
+                        help='PBKDF2 iterations of the password hashes.')
+    parser.add_argument('--endpoint', choices=ENDPOINTS, action='append',
+                        help='Endpoint to benchmark, all of them by default.')
+    parser.add_argument('--output', help='Path of the JSON file where the results are saved.')
+    parser.add_argument('--compare', help='Path of the JSON results of a previous run to compare with.')
+    args = parser.parse_args(args)
+
+    report = run_benchmark(args.users, args.requests, args.concurrency, args.hash_iterations,
+                           endpoints=args.endpoint or ENDPOINTS)
+
+    previous_report = None
+    if args.compare:
+        with open(args.compare) as previous_file:
+            previous_report = json.load(previous_file)
+    print_results(report, previous_report)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Benchmark of the email confirmation tokens.
+
+Compares the throughput of generating and confirming tokens with a new
+URLSafeTimedSerializer for every token (what the email helpers did
+before the token service) against the cached serializer and signer of
+the token service.
+
+Run it from the repository root:
+
+    python -m benchmarks.email_tokens --tokens 5000
+"""
+import argparse
+import sys
+import timeit
+
+from itsdangerous import URLSafeTimedSerializer
+
+EMAIL = 'benchmark_user@email.com'
+
+
+def create_benchmark_app():
+    from run import application
+
+    application.config.from_object('config.TestingConfig')
+    application.config['SECRET_KEY'] = 'BENCHMARK_SECRET_KEY'
+    application.config['SECURITY_PASSWORD_SALT'] = 'BENCHMARK_SECURITY_PWD_SALT'
+    return application
+
+
+def run_benchmark(number_of_tokens):
+    """Returns the tokens per second generated and confirmed by each approach."""
+    from app.api.email_utils import confirm_token, generate_confirmation_token
+
+    app = create_benchmark_app()
+    secret_key = app.config['SECRET_KEY']
+    salt = app.config['SECURITY_PASSWORD_SALT']
+
+    def generate_and_confirm_with_new_serializer():
+        token = URLSafeTimedSerializer(secret_key).dumps(EMAIL, salt=salt)
+        return URLSafeTimedSerializer(secret_key).loads(token, salt=salt, max_age=86400)
+
+    def generate_and_confirm_with_token_service():
+        return confirm_token(generate_confirmation_token(EMAIL))
+
+    with app.app_context():
+        return {
+            'new serializer': number_of_tokens / timeit.timeit(generate_and_confirm_with_new_serializer,
+                                                               number=number_of_tokens),
+            'token service': number_of_tokens / timeit.timeit(generate_and_confirm_with_token_service,
+                                                              number=number_of_tokens)
+        }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmark of the email confirmation tokens.')
+    parser.add_argument('--tokens', type=int, default=5000, help='Number of tokens generated and confirmed.')
+    args = parser.parse_args(args)
+
+    results = run_benchmark(args.tokens)
+
+    print('%-15s %9s' % ('approach', 'tokens/s'))
+    for approach, tokens_per_second in results.items():
+        print('%-15s %9d' % (approach, tokens_per_second))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Benchmark of the verified users listing query.
+
+Seeds a database with users, half of them verified, then compares the
+rows, bytes and time of loading every user row with all its columns
+(what the listing did before filtering in SQL) against the filtered
+projection of public columns used by UserDAO.list_users.
+
+Run it from the repository root:
+
+    python -m benchmarks.list_users --users 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# rows inserted per statement when seeding the database
+SEED_BATCH_SIZE = 10000
+
+
+def create_benchmark_app(database_path):
+    from run import application
+
+    application.config.from_object('config.TestingConfig')
+    application.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + database_path
+    return application
+
+
+def seed_users(number_of_users):
+    """Inserts users in bulk, every other one verified, and returns the id of a user who lists them."""
+    from app.database.models.user import UserModel
+    from app.database.sqlalchemy_extension import db
+    from app.utils.password_utils import generate_password_hash
+
+    db.create_all()
+    # inserting rows in bulk, since building this many UserModel instances would hash every password
+    password_hash = generate_password_hash('benchmark password')
+    now = datetime.now()
+    for batch_start in range(0, number_of_users, SEED_BATCH_SIZE):
+        db.session.execute(UserModel.__table__.insert(), [dict(
+            name='User',
+            username='user_%d' % index,
+            username_lower='user_%d' % index,
+            email='user_%d@email.com' % index,
+            email_lower='user_%d@email.com' % index,
+            password_hash=password_hash,
+            registration_date=now,
+            terms_and_conditions_checked=True,
+            is_admin=False,
+            is_email_verified=index % 2 == 0,
+            bio='A short bio of the user number %d' % index,
+            need_mentoring=False,
+            available_to_mentor=True
+        ) for index in range(batch_start, min(batch_start + SEED_BATCH_SIZE, number_of_users))])
+    db.session.commit()
+    return db.session.query(UserModel.id).order_by(UserModel.id).first()[0]
+
+
+def get_rows_size_in_bytes(rows):
+    return sum(len(str(value)) for row in rows for value in row if value is not None)
+
+
+def measure(fetch_rows):
+    start = time.perf_counter()
+    rows = fetch_rows()
+    elapsed_seconds = time.perf_counter() - start
+    return {'rows': len(rows), 'bytes': get_rows_size_in_bytes(rows), 'ms': elapsed_seconds * 1000}
+
+
+def run_benchmark(number_of_users):
+    """Runs the benchmark on a new SQLite database and returns the measures of both queries."""
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_benchmark_app(os.path.join(directory, 'benchmark.db'))
+        with app.app_context():
+            from app.api.dao.user import UserDAO
+            from app.database.models.user import UserModel
+            from app.database.sqlalchemy_extension import db
+
+            user_id = seed_users(number_of_users)
+            results = {
+                'all columns': measure(lambda: db.session.execute(
+                    UserModel.__table__.select().where(UserModel.id != user_id)).fetchall()),
+                'public columns': measure(lambda: UserDAO.public_users_query(user_id, is_verified=True).all())
+            }
+
+            db.session.remove()
+            db.get_engine().dispose()
+
+    return results
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmark of the verified users listing query.')
+    parser.add_argument('--users', type=int, default=100000, help='Number of users in the database.')
+    args = parser.parse_args(args)
+
+    results = run_benchmark(args.users)
+
+    print('%-15s %9s %12s %9s' % ('query', 'rows', 'bytes', 'ms'))
+    for query, result in results.items():
+        print('%-15s %9d %12d %9.1f' % (query, result['rows'], result['bytes'], result['ms']))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
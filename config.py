@@ -11,7 +11,17 @@ class BaseConfig(object):
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
     # Flask JWT settings
-    JWT_ACCESS_TOKEN_EXPIRES = timedelta(weeks=1)
+    # access tokens are short-lived and renewed with the refresh token at /refresh
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=15)
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(weeks=4)
+    JWT_BLACKLIST_ENABLED = True
+    JWT_BLACKLIST_TOKEN_CHECKS = ['access', 'refresh']
+
+    # other processes reject a token revoked at logout after at most this number of seconds
+    TOKEN_REVOCATIONS_SYNC_SECONDS = 5
+
+    # other processes stop trusting the admin claim of a demoted admin after at most this number of seconds
+    ADMIN_REVOCATIONS_SYNC_SECONDS = 5
 
     # Security
     SECRET_KEY = os.getenv('SECRET_KEY', None)
@@ -21,6 +31,24 @@ class BaseConfig(object):
     SECURITY_PASSWORD_SALT = os.getenv('SECURITY_PASSWORD_SALT')
 
     BCRYPT_LOG_ROUNDS = 13
+
+    # logins are rejected before hashing the password after these numbers of failures in the window
+    LOGIN_THROTTLE_ENABLED = True
+    LOGIN_THROTTLE_MAX_ACCOUNT_FAILURES = 5
+    LOGIN_THROTTLE_MAX_IP_FAILURES = 50
+    LOGIN_THROTTLE_WINDOW_SECONDS = 900
+    # maximum number of accounts and IP addresses whose failures are kept
+    LOGIN_THROTTLE_MAX_SIZE = 100000
+
+    # number of proxies in front of the app, such as the Elastic Beanstalk load balancer, whose
+    # X-Forwarded-For entries are trusted for the client address
+    NUMBER_OF_TRUSTED_PROXIES = int(os.getenv('NUMBER_OF_TRUSTED_PROXIES', 0))
+
+    # password hashing, run `flask calibrate-password-hashing` to choose the iterations for this machine
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256'
+    PASSWORD_HASH_ITERATIONS = 50000
+    # maximum number of passwords hashed at the same time by the process
+    PASSWORD_HASHING_WORKERS = max(1, (os.cpu_count() or 2) // 2)
     WTF_CSRF_ENABLED = True
     # TODO put this in dev only?
 
@@ -40,6 +68,36 @@ class BaseConfig(object):
     # mail accounts
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER')
 
+    # base URL of the links in emails, e.g. https://mentorship.example.com; when not set, the
+    # links point to the host the request was sent to
+    EMAIL_BASE_URL = os.getenv('EMAIL_BASE_URL')
+    # maximum number of link URL patterns kept by the email renderer, one per resource and host
+    EMAIL_URL_PATTERNS_MAX_SIZE = 100
+
+    # after this number of consecutive SMTP connection failures, no emails are sent for
+    # MAIL_CIRCUIT_BREAKER_RESET_SECONDS
+    MAIL_CIRCUIT_BREAKER_THRESHOLD = 5
+    MAIL_CIRCUIT_BREAKER_RESET_SECONDS = 60
+
+    # email outbox, sent by the background scheduler or by `flask dispatch-emails`
+    EMAIL_OUTBOX_SCHEDULER_ENABLED = True
+    EMAIL_OUTBOX_BATCH_SIZE = 100
+    EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+    # an email refused by the SMTP server is retried after 60, 120, 240... seconds
+    EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS = 60
+    # emails claimed by a dispatcher that died are claimed again after this number of seconds
+    EMAIL_OUTBOX_CLAIM_SECONDS = 600
+
+    # mentor recommendations
+    # number of available mentors from which the LSH index is used to find match candidates
+    MENTOR_MATCHING_LSH_THRESHOLD = 100000
+
+    # process-local cache of users looked up by id, username and email
+    USER_CACHE_ENABLED = True
+    USER_CACHE_MAX_SIZE = 1024
+    # changes committed by other processes are seen after at most this number of seconds
+    USER_CACHE_TTL = 60
+
 
 class ProductionConfig(BaseConfig):
     ENV = 'production'
@@ -68,6 +126,22 @@ class TestingConfig(BaseConfig):
     # SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     # SQLALCHEMY_DATABASE_URI = 'sqlite:///test_data.db'
 
+    # the database is recreated between tests, reusing the same user ids
+    USER_CACHE_ENABLED = False
+
+    # tests recreate the database, so revocations are always read from it
+    ADMIN_REVOCATIONS_SYNC_SECONDS = 0
+    TOKEN_REVOCATIONS_SYNC_SECONDS = 0
+
+    # tests dispatch the emails of the outbox themselves
+    EMAIL_OUTBOX_SCHEDULER_ENABLED = False
+
+    # tests login from the same address many times
+    LOGIN_THROTTLE_ENABLED = False
+
+    # tests hash many passwords, their strength does not matter
+    PASSWORD_HASH_ITERATIONS = 1000
+
 
 def get_env_config():
     flask_config_name = os.getenv('FLASK_ENVIRONMENT_CONFIG', 'dev')
@@ -9,6 +9,11 @@ def create_app(config_filename):
     app.config.from_object(config_filename)
     app.url_map.strict_slashes = False
 
+    # behind a load balancer, the client address is the one it adds to X-Forwarded-For
+    if app.config['NUMBER_OF_TRUSTED_PROXIES']:
+        from werkzeug.contrib.fixers import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, num_proxies=app.config['NUMBER_OF_TRUSTED_PROXIES'])
+
     from app.database.sqlalchemy_extension import db
     db.init_app(app)
 
@@ -21,6 +26,15 @@ def create_app(config_filename):
     from app.api.mail_extension import mail
     mail.init_app(app)
 
+    from app.api.token_service import token_service
+    token_service.init_app(app)
+
+    from app.api.email_renderer import email_renderer
+    email_renderer.init_app(app)
+
+    from app.cli import init_cli
+    init_cli(app)
+
     from app.schedulers.background_scheduler import init_scheduler
     init_scheduler()
 
@@ -35,6 +49,13 @@ def create_tables():
     from app.database.sqlalchemy_extension import db
     db.create_all()
 
+    from app.database.full_text_search import ensure_users_index
+    ensure_users_index()
+
+    from app.database.models.user import UserModel
+    UserModel.fill_lowercase_fields()
+    db.session.commit()
+
 
 if __name__ == "__main__":
     application.run(port=5000)
@@ -0,0 +1,115 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from flask import json
+from flask_jwt_extended import decode_token
+
+from app.api.authorization import admin_revocations
+from app.api.jwt_extension import jwt
+from app.database.models.admin_revocation import AdminRevocationModel
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from tests.base_test_case import BaseTestCase
+from tests.test_utils import get_test_request_header
+from tests.test_data import user1, user2
+
+
+class TestAdminClaimsApi(BaseTestCase):
+
+    # Setup consists of adding 2 users into the database, besides the admin
+    # User 1 is also an admin
+    # User 2 is not an admin
+    def setUp(self):
+        super(TestAdminClaimsApi, self).setUp()
+
+        self.second_admin_user = UserModel(
+            name=user1['name'],
+            email=user1['email'],
+            username=user1['username'],
+            password=user1['password'],
+            terms_and_conditions_checked=user1['terms_and_conditions_checked']
+        )
+        self.user = UserModel(
+            name=user2['name'],
+            email=user2['email'],
+            username=user2['username'],
+            password=user2['password'],
+            terms_and_conditions_checked=user2['terms_and_conditions_checked']
+        )
+        self.second_admin_user.is_admin = True
+        self.second_admin_user.is_email_verified = True
+        db.session.add(self.second_admin_user)
+        db.session.add(self.user)
+        db.session.commit()
+
+    def assign_new_admin(self, auth_header, user_id):
+        return self.client.post('/admin/new', follow_redirects=True, headers=auth_header,
+                                data=json.dumps(dict(user_id=user_id)), content_type='application/json')
+
+    def test_login_token_has_user_claims(self):
+        response = self.client.post('/login', follow_redirects=True, content_type='application/json',
+                                    data=json.dumps(dict(username=user1['username'], password=user1['password'])))
+        claims = decode_token(response.json['access_token'])['user_claims']
+
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(claims['is_admin'])
+        self.assertEqual(user1['name'], claims['name'])
+        self.assertEqual(self.second_admin_user.updated_at.timestamp(), claims['profile_version'])
+
+    def test_admin_claim_is_checked_without_database(self):
+        auth_header = get_test_request_header(self.user.id)
+
+        # the admin status granted after the token was issued is not in its claims
+        self.user.is_admin = True
+        db.session.commit()
+        response = self.assign_new_admin(auth_header, self.admin_user.id)
+
+        self.assertEqual(403, response.status_code)
+
+    def test_revoked_admin_loses_access(self):
+        auth_header = get_test_request_header(self.second_admin_user.id)
+
+        revoke_response = self.client.post('/admin/remove', follow_redirects=True,
+                                           headers=get_test_request_header(self.admin_user.id),
+                                           data=json.dumps(dict(user_id=self.second_admin_user.id)),
+                                           content_type='application/json')
+        response = self.assign_new_admin(auth_header, self.user.id)
+
+        self.assertEqual(200, revoke_response.status_code)
+        self.assertEqual(403, response.status_code)
+        self.assertEqual({"message": "You don't have admin status. You can't assign other user as admin."},
+                         json.loads(response.data))
+
+    def test_assigned_again_admin_regains_access(self):
+        auth_header = get_test_request_header(self.second_admin_user.id)
+        admin_revocations.revoke(self.second_admin_user.id)
+        admin_revocations.restore(self.second_admin_user.id)
+
+        response = self.assign_new_admin(auth_header, self.user.id)
+
+        self.assertEqual(200, response.status_code)
+
+    def test_revocations_from_other_processes_are_synchronized(self):
+        auth_header = get_test_request_header(self.second_admin_user.id)
+        db.session.add(AdminRevocationModel(self.second_admin_user.id, time.time()))
+        db.session.commit()
+
+        response = self.assign_new_admin(auth_header, self.user.id)
+
+        self.assertEqual(403, response.status_code)
+
+    def test_token_without_claims_checks_database(self):
+        with patch.object(jwt, '_user_claims_callback', lambda identity: {}):
+            admin_auth_header = get_test_request_header(self.second_admin_user.id)
+            user_auth_header = get_test_request_header(self.user.id)
+
+        self.assertEqual(403, self.assign_new_admin(user_auth_header, self.admin_user.id).status_code)
+        self.assertEqual(200, self.assign_new_admin(admin_auth_header, self.user.id).status_code)
+        # the database says user 2 is an admin now
+        self.assertEqual({"message": "User is already an Admin."},
+                         json.loads(self.assign_new_admin(user_auth_header, self.admin_user.id).data))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import csv
+import io
+import unittest
+
+from flask import json
+
+from app.api.dao.admin import AdminDAO
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from tests.base_test_case import BaseTestCase
+from tests.test_utils import get_test_request_header
+from tests.test_data import user1
+
+
+class TestExportUsersApi(BaseTestCase):
+
+    # Setup consists of adding a non admin user into the database,
+    # besides the admin user of the base test case
+    def setUp(self):
+        super(TestExportUsersApi, self).setUp()
+
+        self.user = UserModel(
+            name=user1['name'],
+            email=user1['email'],
+            username=user1['username'],
+            password=user1['password'],
+            terms_and_conditions_checked=user1['terms_and_conditions_checked']
+        )
+        self.user.location = 'Lisbon, Portugal'
+        db.session.add(self.user)
+        db.session.commit()
+
+    def test_export_users_non_admin(self):
+        expected_response = {"message": "You don't have admin status. You can't export users."}
+        auth_header = get_test_request_header(self.user.id)
+        actual_response = self.client.get('/admin/users/export', follow_redirects=True, headers=auth_header)
+
+        self.assertEqual(403, actual_response.status_code)
+        self.assertEqual(expected_response, json.loads(actual_response.data))
+
+    def test_export_users_ndjson(self):
+        auth_header = get_test_request_header(self.admin_user.id)
+        actual_response = self.client.get('/admin/users/export', follow_redirects=True, headers=auth_header)
+        users = [json.loads(line) for line in actual_response.data.decode('utf-8').splitlines()]
+
+        self.assertEqual(200, actual_response.status_code)
+        self.assertEqual('application/x-ndjson', actual_response.mimetype)
+        self.assertEqual([self.admin_user.id, self.user.id], [user['id'] for user in users])
+        self.assertEqual(set(AdminDAO.EXPORTABLE_USER_FIELDS), set(users[1].keys()))
+        self.assertNotIn('password_hash', users[1])
+        self.assertEqual(self.user.registration_date.isoformat(), users[1]['registration_date'])
+
+    def test_export_users_csv_selected_columns(self):
+        auth_header = get_test_request_header(self.admin_user.id)
+        actual_response = self.client.get('/admin/users/export?format=csv&columns=id,username,location',
+                                          follow_redirects=True, headers=auth_header)
+        rows = list(csv.reader(io.StringIO(actual_response.data.decode('utf-8'))))
+
+        self.assertEqual(200, actual_response.status_code)
+        self.assertEqual('text/csv', actual_response.mimetype)
+        self.assertEqual([
+            ['id', 'username', 'location'],
+            [str(self.admin_user.id), self.admin_user.username, ''],
+            [str(self.user.id), self.user.username, 'Lisbon, Portugal'],
+        ], rows)
+
+    def test_export_users_invalid_columns(self):
+        expected_response = {"message": "These fields cannot be exported: password_hash."}
+        auth_header = get_test_request_header(self.admin_user.id)
+        actual_response = self.client.get('/admin/users/export?columns=id,password_hash',
+                                          follow_redirects=True, headers=auth_header)
+
+        self.assertEqual(400, actual_response.status_code)
+        self.assertEqual(expected_response, json.loads(actual_response.data))
+
+    def test_export_users_in_batches(self):
+        db.session.execute(UserModel.__table__.insert(), [
+            {'name': 'User', 'username': 'user_%d' % index, 'email': 'user_%d@email.com' % index}
+            for index in range(AdminDAO.EXPORT_BATCH_SIZE + 1)
+        ])
+        db.session.commit()
+
+        chunks, status_code = AdminDAO.export_users(['id'])
+
+        self.assertEqual(200, status_code)
+        self.assertEqual(AdminDAO.EXPORT_BATCH_SIZE + 3, len(list(chunks)))
+
+
+if __name__ == "__main__":
+    unittest.main()
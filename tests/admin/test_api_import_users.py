@@ -0,0 +1,145 @@
+import io
+import unittest
+
+from flask import json
+
+from app.api.dao.user_import import UserImportDAO
+from app.database.full_text_search import USERS_SEARCH_TABLE
+from app.database.models.email_outbox import EmailOutboxModel
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from tests.base_test_case import BaseTestCase
+from tests.test_utils import get_test_request_header
+from tests.test_data import test_admin_user, user1
+
+
+class TestImportUsersApi(BaseTestCase):
+
+    CSV_HEADER = 'name,username,password,email,terms_and_conditions_checked,need_mentoring\n'
+
+    def setUp(self):
+        super(TestImportUsersApi, self).setUp()
+
+        self.user = UserModel(
+            name=user1['name'],
+            email=user1['email'],
+            username=user1['username'],
+            password=user1['password'],
+            terms_and_conditions_checked=user1['terms_and_conditions_checked']
+        )
+        db.session.add(self.user)
+        db.session.commit()
+
+    def import_users(self, user_id, content, filename):
+        return self.client.post('/admin/users/import', follow_redirects=True,
+                                headers=get_test_request_header(user_id),
+                                data={'file': (io.BytesIO(content.encode('utf-8')), filename)},
+                                content_type='multipart/form-data')
+
+    def test_import_users_non_admin(self):
+        expected_response = {"message": "You don't have admin status. You can't import users."}
+        actual_response = self.import_users(self.user.id, self.CSV_HEADER, 'users.csv')
+
+        self.assertEqual(403, actual_response.status_code)
+        self.assertEqual(expected_response, json.loads(actual_response.data))
+
+    def test_import_users_csv(self):
+        content = self.CSV_HEADER + \
+            'Ana Silva,ana_silva,ana_password,ana@email.com,true,yes\n' + \
+            'Bea Costa,bea_costa,bea_password,bea@email.com,true,false\n'
+        actual_response = self.import_users(self.admin_user.id, content, 'users.csv')
+
+        ana = UserModel.find_by_username('ana_silva')
+
+        self.assertEqual(200, actual_response.status_code)
+        self.assertEqual({'imported': 2, 'failed': 0, 'errors': []}, json.loads(actual_response.data))
+        self.assertTrue(ana.check_password('ana_password'))
+        self.assertTrue(ana.need_mentoring)
+        self.assertFalse(ana.is_admin)
+        self.assertFalse(ana.is_email_verified)
+        self.assertFalse(UserModel.find_by_username('bea_costa').need_mentoring)
+
+    def test_import_users_adds_verification_emails_to_outbox(self):
+        content = self.CSV_HEADER + \
+            'Ana Silva,ana_silva,ana_password,ana@email.com,true,yes\n' + \
+            'Bea Costa,bea_costa,bea_password,bea@email.com,true,false\n'
+        self.import_users(self.admin_user.id, content, 'users.csv')
+
+        emails = EmailOutboxModel.query.order_by(EmailOutboxModel.recipient).all()
+        self.assertEqual(['ana@email.com', 'bea@email.com'], [email.recipient for email in emails])
+        self.assertIn('Hi Ana Silva,', emails[0].html)
+        self.assertIn('/user/confirm_email/', emails[0].html)
+
+    def test_import_users_reports_row_errors(self):
+        rows = [
+            {'name': 'Ana Silva', 'username': 'ana_silva', 'password': 'ana_password', 'email': 'ana@email.com',
+             'terms_and_conditions_checked': True},
+            {'name': 'Ana Silva', 'username': 'ana_silva', 'password': 'ana_password', 'email': 'ana2@email.com',
+             'terms_and_conditions_checked': True},
+            {'name': 'Bea Costa', 'username': 'bea_costa', 'password': 'bea_password', 'email': 'not an email',
+             'terms_and_conditions_checked': True},
+            {'name': 'Joan', 'username': user1['username'], 'password': 'joan_password', 'email': 'joan@email.com',
+             'terms_and_conditions_checked': True},
+            {'name': 'Admin', 'username': 'other_admin', 'password': 'admin_password',
+             'email': test_admin_user['email'], 'terms_and_conditions_checked': True},
+            {'username': 'no_name'},
+        ]
+        content = '\n'.join(json.dumps(row) for row in rows) + '\n{not json\n'
+        actual_response = self.import_users(self.admin_user.id, content, 'users.ndjson')
+
+        self.assertEqual(200, actual_response.status_code)
+        self.assertEqual({'imported': 1, 'failed': 6, 'errors': [
+            {'row': 2, 'message': 'Username ana_silva is repeated in the file.'},
+            {'row': 3, 'message': 'Your email is invalid.'},
+            {'row': 4, 'message': 'A user with that username already exists'},
+            {'row': 5, 'message': 'A user with that email already exists'},
+            {'row': 6, 'message': 'Name field is missing.'},
+            {'row': 7, 'message': 'Row is not valid JSON.'},
+        ]}, json.loads(actual_response.data))
+
+    def test_import_users_rejects_non_boolean_values(self):
+        rows = [
+            {'name': 'Ana Silva', 'username': 'ana_silva', 'password': 'ana_password', 'email': 'ana@email.com',
+             'terms_and_conditions_checked': 'yes'},
+            {'name': 'Bea Costa', 'username': 'bea_costa', 'password': 'bea_password', 'email': 'bea@email.com',
+             'terms_and_conditions_checked': True, 'need_mentoring': 'false'},
+            {'name': 'Joan', 'username': 'joan_smith', 'password': 'joan_password', 'email': 'joan@email.com',
+             'terms_and_conditions_checked': True, 'available_to_mentor': False},
+        ]
+        content = '\n'.join(json.dumps(row) for row in rows)
+        actual_response = self.import_users(self.admin_user.id, content, 'users.ndjson')
+
+        self.assertEqual(200, actual_response.status_code)
+        self.assertEqual({'imported': 1, 'failed': 2, 'errors': [
+            {'row': 1, 'message': 'Field terms_and_conditions_checked must be true or false.'},
+            {'row': 2, 'message': 'Field need_mentoring must be true or false.'},
+        ]}, json.loads(actual_response.data))
+
+    def test_import_users_unknown_format(self):
+        expected_response = {"message": "The import format must be csv or ndjson."}
+        actual_response = self.import_users(self.admin_user.id, self.CSV_HEADER, 'users.txt')
+
+        self.assertEqual(400, actual_response.status_code)
+        self.assertEqual(expected_response, json.loads(actual_response.data))
+
+    def test_import_users_in_batches(self):
+        lines = [self.CSV_HEADER] + ['User,user_%d,password_%d,user_%d@email.com,true,false\n' % (i, i, i)
+                                     for i in range(UserImportDAO.IMPORT_BATCH_SIZE + 10)]
+
+        report = UserImportDAO.import_users(lines, 'csv')
+
+        self.assertEqual(UserImportDAO.IMPORT_BATCH_SIZE + 10, report['imported'])
+        self.assertEqual(UserImportDAO.IMPORT_BATCH_SIZE + 12, UserModel.query.count())
+
+    def test_import_users_adds_users_to_search_index(self):
+        lines = [self.CSV_HEADER, 'Ana Silva,ana_silva,ana_password,ana@email.com,true,yes\n']
+
+        UserImportDAO.import_users(lines, 'csv')
+
+        ana = UserModel.find_by_username('ana_silva')
+        indexed_ids = [row[0] for row in db.session.execute('SELECT rowid FROM {}'.format(USERS_SEARCH_TABLE))]
+        self.assertIn(ana.id, indexed_ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -114,6 +114,17 @@ class TestCompleteMentorshipRelationCronFunction(BaseTestCase):
         self.assertEqual(MentorshipRelationState.PENDING, self.mentorship_relation_2.state)
         self.assertEqual(MentorshipRelationState.ACCEPTED, self.mentorship_relation_3.state)
 
+    @patch('run.application', side_effect=get_test_app)
+    def test_complete_mentorship_relations_clears_active_relation(self, get_test_app_fn):
+        self.first_user.active_relation_id = self.mentorship_relation_1.id
+        self.second_user.active_relation_id = self.mentorship_relation_1.id
+        db.session.commit()
+
+        complete_overdue_mentorship_relations_job()
+
+        self.assertIsNone(self.first_user.active_relation_id)
+        self.assertIsNone(self.second_user.active_relation_id)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+
+from app.matching.mentor_matching_engine import MentorMatchingEngine, get_terms
+
+# Testing the mentor matching engine on its own, without the database
+
+
+class TestMentorMatchingEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.mentors = [
+            (1, 'Python, Flask, SQL', 'Lisbon', 'Systers'),
+            (2, 'Java, Android', 'Berlin', 'Anita Borg'),
+            (3, 'Python, Machine Learning', 'Berlin', None),
+            (4, None, 'Lisbon', None),
+            (5, 'Kotlin, Android, Java', None, 'Systers'),
+        ]
+        self.engine = MentorMatchingEngine(self.mentors)
+
+    @staticmethod
+    def get_expected_score(mentor, interests, location, organization):
+        mentor_terms = get_terms(mentor[1])
+        mentee_terms = get_terms(interests)
+        score = 0.0
+        if mentor_terms and mentee_terms:
+            score += len(mentor_terms & mentee_terms) / np.sqrt(len(mentor_terms) * len(mentee_terms))
+        if location and mentor[2] and mentor[2].lower() == location.lower():
+            score += MentorMatchingEngine.LOCATION_WEIGHT
+        if organization and mentor[3] and mentor[3].lower() == organization.lower():
+            score += MentorMatchingEngine.ORGANIZATION_WEIGHT
+        return score
+
+    def test_scores_match_per_mentor_computation(self):
+        interests, location, organization = 'python and android', 'berlin', 'Systers'
+
+        expected_scores = [self.get_expected_score(mentor, interests, location, organization)
+                           for mentor in self.mentors]
+
+        np.testing.assert_allclose(expected_scores, self.engine.get_scores(interests, location, organization),
+                                   rtol=1e-5)
+
+    def test_rows_scores_match_all_scores(self):
+        interests, location, organization = 'Java python', 'Lisbon', 'Systers'
+        rows = np.array([4, 0, 2])
+
+        all_scores = self.engine.get_scores(interests, location, organization)
+
+        np.testing.assert_allclose(all_scores[rows],
+                                   self.engine.get_rows_scores(rows, interests, location, organization))
+
+    def test_top_mentors(self):
+        top_mentors = self.engine.get_top_mentors('Python', location='Lisbon', k=2)
+
+        self.assertEqual([1, 3], [mentor_id for mentor_id, _ in top_mentors])
+
+    def test_top_mentors_excludes_ids_and_non_matching_mentors(self):
+        top_mentors = self.engine.get_top_mentors('Android', k=10, exclude_ids={2})
+
+        self.assertEqual([5], [mentor_id for mentor_id, _ in top_mentors])
+
+    def test_top_mentors_without_mentors(self):
+        engine = MentorMatchingEngine([])
+
+        self.assertEqual([], engine.get_top_mentors('Python', 'Lisbon', 'Systers'))
+
+    def test_lsh_finds_best_mentors(self):
+        random_state = np.random.RandomState(7)
+        vocabulary = ['skill%d' % index for index in range(200)]
+        mentors = [(index, ' '.join(random_state.choice(vocabulary, 5, replace=False)), None, None)
+                   for index in range(5000)]
+        interests = mentors[42][1]
+
+        exact_engine = MentorMatchingEngine(mentors)
+        lsh_engine = MentorMatchingEngine(mentors, use_lsh=True)
+
+        exact_top_mentors = exact_engine.get_top_mentors(interests, k=5)
+        lsh_top_mentors = lsh_engine.get_top_mentors(interests, k=5)
+
+        self.assertEqual(42, exact_top_mentors[0][0])
+        self.assertEqual(42, lsh_top_mentors[0][0])
+        # the LSH candidates are a small part of all the mentors
+        self.assertLess(len(lsh_engine.get_lsh_candidates(interests)), len(mentors) // 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
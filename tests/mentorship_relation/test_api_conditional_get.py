@@ -0,0 +1,99 @@
+import unittest
+
+from app.database.sqlalchemy_extension import db
+from app.utils.enum_utils import MentorshipRelationState
+from tests.tasks.tasks_base_setup import TasksBaseTestCase
+from tests.test_utils import get_test_request_header
+
+
+class TestMentorshipRelationsConditionalGetApi(TasksBaseTestCase):
+
+    def setUp(self):
+        super(TestMentorshipRelationsConditionalGetApi, self).setUp()
+
+        self.auth_header = get_test_request_header(self.first_user.id)
+        self.tasks_url = '/mentorship_relation/%s/tasks' % self.mentorship_relation_w_second_user.id
+
+    def get_with_etag(self, url, etag):
+        return self.client.get(url, follow_redirects=True, headers=dict(self.auth_header, **{'If-None-Match': etag}))
+
+    def test_relations_not_modified(self):
+        first_response = self.client.get('/mentorship_relations', follow_redirects=True, headers=self.auth_header)
+        second_response = self.get_with_etag('/mentorship_relations', first_response.headers['ETag'])
+
+        self.assertEqual(200, first_response.status_code)
+        self.assertEqual(304, second_response.status_code)
+
+    def test_relations_modified_when_relation_changes(self):
+        first_response = self.client.get('/mentorship_relations', follow_redirects=True, headers=self.auth_header)
+
+        self.mentorship_relation_w_second_user.state = MentorshipRelationState.CANCELLED
+        db.session.commit()
+        second_response = self.get_with_etag('/mentorship_relations', first_response.headers['ETag'])
+
+        self.assertEqual(200, second_response.status_code)
+
+    def test_relations_modified_when_other_user_name_changes(self):
+        first_response = self.client.get('/mentorship_relations', follow_redirects=True, headers=self.auth_header)
+
+        self.second_user.name = 'New name'
+        db.session.commit()
+        second_response = self.get_with_etag('/mentorship_relations', first_response.headers['ETag'])
+
+        self.assertEqual(200, second_response.status_code)
+
+    def test_relations_modified_when_other_user_removed(self):
+        first_response = self.client.get('/mentorship_relations', follow_redirects=True, headers=self.auth_header)
+
+        self.second_user.delete_from_db()
+        second_response = self.get_with_etag('/mentorship_relations', first_response.headers['ETag'])
+
+        self.assertEqual(200, second_response.status_code)
+
+    def test_relations_not_modified_when_relation_of_other_users_changes(self):
+        first_response = self.client.get('/mentorship_relations', follow_redirects=True, headers=self.auth_header)
+
+        self.mentorship_relation_without_first_user.notes = 'New notes'
+        db.session.commit()
+        second_response = self.get_with_etag('/mentorship_relations', first_response.headers['ETag'])
+
+        self.assertEqual(304, second_response.status_code)
+
+    def test_pending_relations_modified_when_request_sent(self):
+        first_response = self.client.get('/mentorship_relations/pending', follow_redirects=True,
+                                         headers=self.auth_header)
+
+        self.mentorship_relation_w_admin_user.state = MentorshipRelationState.PENDING
+        db.session.commit()
+        second_response = self.get_with_etag('/mentorship_relations/pending', first_response.headers['ETag'])
+
+        self.assertEqual(200, second_response.status_code)
+        self.assertEqual(1, len(second_response.json))
+
+    def test_tasks_not_modified(self):
+        first_response = self.client.get(self.tasks_url, follow_redirects=True, headers=self.auth_header)
+        second_response = self.get_with_etag(self.tasks_url, first_response.headers['ETag'])
+
+        self.assertEqual(200, first_response.status_code)
+        self.assertEqual(304, second_response.status_code)
+
+    def test_tasks_modified_when_task_added(self):
+        first_response = self.client.get(self.tasks_url, follow_redirects=True, headers=self.auth_header)
+
+        self.tasks_list_1.add_task(description=self.description_example, created_at=self.now_datetime.timestamp())
+        self.tasks_list_1.save_to_db()
+        second_response = self.get_with_etag(self.tasks_url, first_response.headers['ETag'])
+
+        self.assertEqual(200, second_response.status_code)
+        self.assertEqual(3, len(second_response.json))
+
+    def test_tasks_of_relation_without_user_have_no_etag(self):
+        url = '/mentorship_relation/%s/tasks' % self.mentorship_relation_without_first_user.id
+        response = self.client.get(url, follow_redirects=True, headers=self.auth_header)
+
+        self.assertEqual(401, response.status_code)
+        self.assertNotIn('ETag', response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,11 +3,13 @@ import unittest
 from datetime import datetime, timedelta
 
 from flask_restplus import marshal
+from sqlalchemy import event
 
 from app.api.models.mentorship_relation import mentorship_request_response_body
 from app.database.models.tasks_list import TasksListModel
 from app.database.sqlalchemy_extension import db
 from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.models.user import UserModel
 from app.utils.enum_utils import MentorshipRelationState
 from tests.mentorship_relation.relation_base_setup import MentorshipRelationBaseTestCase
 from tests.test_utils import get_test_request_header
@@ -132,6 +134,68 @@ class TestListMentorshipRelationsApi(MentorshipRelationBaseTestCase):
                              json.loads(response.data))
             self.assertTrue(self.future_accepted_mentorship_relation.sent_by_me)
 
+    def add_mentees_relations(self, indexes, end_date, state):
+        for index in indexes:
+            mentee = UserModel(
+                name='Mentee %d' % index,
+                email='mentee_%d_%s@email.com' % (index, state.name.lower()),
+                username='mentee_%d_%s' % (index, state.name.lower()),
+                password='mentee password',
+                terms_and_conditions_checked=True
+            )
+            db.session.add(MentorshipRelationModel(
+                action_user_id=self.first_user.id,
+                mentor_user=self.first_user,
+                mentee_user=mentee,
+                creation_date=self.now_datetime.timestamp(),
+                end_date=end_date.timestamp(),
+                state=state,
+                notes=self.notes_example,
+                tasks_list=TasksListModel()
+            ))
+        db.session.commit()
+
+    def get_list_queries(self, url):
+        auth_header = get_test_request_header(self.first_user.id)
+        # the users must be loaded by the request, not found in the session of the test
+        db.session.remove()
+        queries = []
+
+        def count_query(conn, cursor, statement, parameters, context, executemany):
+            queries.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+        try:
+            response = self.client.get(url, headers=auth_header)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_query)
+
+        self.assertEqual(200, response.status_code)
+        return queries, json.loads(response.data)
+
+    def test_list_mentorship_relations_queries_do_not_grow_with_relations(self):
+        # the first request of the process also loads data that is kept between requests
+        self.get_list_queries('/mentorship_relations')
+
+        for url, end_date, state in [('/mentorship_relations', self.future_end_date_example,
+                                      MentorshipRelationState.REJECTED),
+                                     ('/mentorship_relations/past', self.past_end_date_example,
+                                      MentorshipRelationState.COMPLETED),
+                                     ('/mentorship_relations/pending', self.future_end_date_example,
+                                      MentorshipRelationState.PENDING)]:
+            self.add_mentees_relations(range(1), end_date, state)
+            few_relations_queries, few_relations = self.get_list_queries(url)
+
+            self.add_mentees_relations(range(1, 11), end_date, state)
+            many_relations_queries, many_relations = self.get_list_queries(url)
+
+            self.assertEqual(len(few_relations) + 10, len(many_relations))
+            self.assertEqual(len(few_relations_queries), len(many_relations_queries))
+            # the relations are listed with their mentors and mentees in one query
+            self.assertEqual(1, len([query for query in many_relations_queries
+                                     if 'mentorship_relations.notes' in query]))
+            self.assertIn('Mentee 10', [relation['mentee']['name'] for relation in many_relations])
+
 
 if __name__ == "__main__":
     unittest.main()
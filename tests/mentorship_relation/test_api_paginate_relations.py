@@ -0,0 +1,114 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.api.dao.mentorship_relation import MentorshipRelationDAO
+from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.models.tasks_list import TasksListModel
+from app.database.sqlalchemy_extension import db
+from app.utils.enum_utils import MentorshipRelationState
+from tests.mentorship_relation.relation_base_setup import MentorshipRelationBaseTestCase
+from tests.test_utils import get_test_request_header
+
+
+class TestPaginateMentorshipRelationsApi(MentorshipRelationBaseTestCase):
+
+    # Setup consists of adding 7 relations between the 2 users, 5 of them past ones,
+    # where the last 3 relations were created at the same time
+    def setUp(self):
+        super(TestPaginateMentorshipRelationsApi, self).setUp()
+
+        now_datetime = datetime.now()
+        creation_dates = [now_datetime - timedelta(weeks=weeks) for weeks in (30, 20, 10, 10, 10, 5, 1)]
+        end_dates = [now_datetime + timedelta(weeks=weeks) for weeks in (-5, -5, -5, -5, -5, 5, 5)]
+
+        self.relations = []
+        for creation_date, end_date in zip(creation_dates, end_dates):
+            relation = MentorshipRelationModel(
+                action_user_id=self.first_user.id,
+                mentor_user=self.first_user,
+                mentee_user=self.second_user,
+                creation_date=creation_date.timestamp(),
+                end_date=end_date.timestamp(),
+                state=MentorshipRelationState.COMPLETED,
+                notes='description of a good mentorship relation',
+                tasks_list=TasksListModel()
+            )
+            db.session.add(relation)
+            self.relations.append(relation)
+        db.session.commit()
+
+        self.auth_header = get_test_request_header(self.first_user.id)
+
+    def get_all_pages(self, url, limit):
+        pages = []
+        after = None
+        while True:
+            query_string = {'limit': limit}
+            if after is not None:
+                query_string['after'] = after
+            response = self.client.get(url, headers=self.auth_header, query_string=query_string)
+            self.assertEqual(200, response.status_code)
+
+            pages.append([relation['id'] for relation in json.loads(response.data)])
+            after = response.headers.get(MentorshipRelationDAO.NEXT_CURSOR_HEADER)
+            if after is None:
+                return pages
+
+    def test_list_relations_pages(self):
+        pages = self.get_all_pages('/mentorship_relations', limit=2)
+
+        expected_ids = [relation.id for relation in reversed(self.relations)]
+        self.assertEqual([expected_ids[0:2], expected_ids[2:4], expected_ids[4:6], expected_ids[6:]], pages)
+
+    def test_list_past_relations_pages(self):
+        pages = self.get_all_pages('/mentorship_relations/past', limit=2)
+
+        expected_ids = [relation.id for relation in reversed(self.relations[:5])]
+        self.assertEqual([expected_ids[0:2], expected_ids[2:4], expected_ids[4:]], pages)
+
+    def test_list_relations_default_page_is_complete(self):
+        response = self.client.get('/mentorship_relations', headers=self.auth_header)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(7, len(json.loads(response.data)))
+        self.assertNotIn(MentorshipRelationDAO.NEXT_CURSOR_HEADER, response.headers)
+        self.assertNotIn(MentorshipRelationDAO.TOTAL_COUNT_HEADER, response.headers)
+
+    @patch.object(MentorshipRelationDAO, 'MAX_PAGE_SIZE', 3)
+    def test_list_relations_page_size_is_capped(self):
+        response = self.client.get('/mentorship_relations', headers=self.auth_header, query_string={'limit': 100})
+
+        self.assertEqual(3, len(json.loads(response.data)))
+        self.assertIn(MentorshipRelationDAO.NEXT_CURSOR_HEADER, response.headers)
+
+    def test_list_relations_total_count(self):
+        response = self.client.get('/mentorship_relations', headers=self.auth_header,
+                                   query_string={'limit': 2, 'include_total': 'true'})
+
+        self.assertEqual('7', response.headers[MentorshipRelationDAO.TOTAL_COUNT_HEADER])
+
+        response = self.client.get('/mentorship_relations/past', headers=self.auth_header,
+                                   query_string={'limit': 2, 'include_total': 'true'})
+
+        self.assertEqual('5', response.headers[MentorshipRelationDAO.TOTAL_COUNT_HEADER])
+
+    def test_relations_counters_follow_created_and_deleted_relations(self):
+        self.assertEqual(7, MentorshipRelationDAO.count_relations(self.first_user.id))
+        self.assertEqual(7, MentorshipRelationDAO.count_relations(self.second_user.id))
+
+        self.relations[0].delete_from_db()
+
+        self.assertEqual(6, MentorshipRelationDAO.count_relations(self.first_user.id))
+        self.assertEqual(6, MentorshipRelationDAO.count_relations(self.second_user.id))
+
+    def test_list_relations_invalid_cursor(self):
+        response = self.client.get('/mentorship_relations', headers=self.auth_header,
+                                   query_string={'after': 'not a cursor'})
+
+        self.assertEqual(400, response.status_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,7 +8,6 @@ from tests.mentorship_relation.relation_base_setup import MentorshipRelationBase
 from app.database.sqlalchemy_extension import db
 
 
-# TODO test when a user is in a current relation and tries to accept another relation
 # TODO test when a user tries to accept a relation where this user is not involved
 
 class TestMentorshipRelationAcceptRequestDAO(MentorshipRelationBaseTestCase):
@@ -101,3 +100,51 @@ class TestMentorshipRelationAcceptRequestDAO(MentorshipRelationBaseTestCase):
 
         result = DAO.accept_request(self.second_user.id, self.mentorship_relation.id)
         self.assertEqual(({'message': 'This mentorship relation is not in the pending state.'}, 400), result)
+
+    def test_dao_receiver_accepts_mentorship_request_sets_active_relation(self):
+        DAO = MentorshipRelationDAO()
+
+        DAO.accept_request(self.second_user.id, self.mentorship_relation.id)
+
+        self.assertEqual(self.mentorship_relation.id, self.first_user.active_relation_id)
+        self.assertEqual(self.mentorship_relation.id, self.second_user.active_relation_id)
+
+    def create_accepted_relation(self, mentor_user, mentee_user):
+        relation = MentorshipRelationModel(
+            action_user_id=mentor_user.id,
+            mentor_user=mentor_user,
+            mentee_user=mentee_user,
+            creation_date=self.now_datetime.timestamp(),
+            end_date=self.end_date_example.timestamp(),
+            state=MentorshipRelationState.ACCEPTED,
+            notes=self.notes_example,
+            tasks_list=TasksListModel()
+        )
+        db.session.add(relation)
+        db.session.commit()
+
+        mentor_user.active_relation_id = relation.id
+        mentee_user.active_relation_id = relation.id
+        db.session.commit()
+        return relation
+
+    def test_dao_receiver_in_current_relation_accepts_mentorship_request(self):
+        DAO = MentorshipRelationDAO()
+        self.create_accepted_relation(self.admin_user, self.second_user)
+
+        result = DAO.accept_request(self.second_user.id, self.mentorship_relation.id)
+
+        self.assertEqual(({'message': 'You are currently involved in a mentorship relation.'}, 400), result)
+        self.assertEqual(MentorshipRelationState.PENDING, self.mentorship_relation.state)
+
+    def test_dao_receiver_accepts_mentorship_request_of_sender_in_current_relation(self):
+        DAO = MentorshipRelationDAO()
+        current_relation = self.create_accepted_relation(self.first_user, self.admin_user)
+
+        result = DAO.accept_request(self.second_user.id, self.mentorship_relation.id)
+
+        self.assertEqual(({'message': 'A user of this mentorship relation is currently involved in another one.'},
+                          400), result)
+        self.assertEqual(MentorshipRelationState.PENDING, self.mentorship_relation.state)
+        self.assertEqual(current_relation.id, self.first_user.active_relation_id)
+        self.assertIsNone(self.second_user.active_relation_id)
@@ -105,4 +105,14 @@ class TestMentorshipRelationListingDAO(MentorshipRelationBaseTestCase):
         db.session.commit()
 
         result = DAO.cancel_relation(self.second_user.id, self.mentorship_relation.id)
-        self.assertEqual(({'message': 'This mentorship relation is not in the accepted state.'}, 400), result)
\ No newline at end of file
+        self.assertEqual(({'message': 'This mentorship relation is not in the accepted state.'}, 400), result)
+
+    def test_dao_cancel_mentorship_relation_clears_active_relation(self):
+        DAO = MentorshipRelationDAO()
+        DAO.accept_request(self.second_user.id, self.mentorship_relation.id)
+
+        DAO.cancel_relation(self.first_user.id, self.mentorship_relation.id)
+
+        self.assertEqual(MentorshipRelationState.CANCELLED, self.mentorship_relation.state)
+        self.assertIsNone(self.first_user.active_relation_id)
+        self.assertIsNone(self.second_user.active_relation_id)
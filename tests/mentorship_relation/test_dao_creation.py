@@ -164,6 +164,12 @@ class TestMentorshipRelationCreationDAO(MentorshipRelationBaseTestCase):
 
         db.session.add(self.mentorship_relation)
         db.session.commit()
+
+        # accepting the relation marks both users as in it
+        self.admin_user.active_relation_id = self.mentorship_relation.id
+        self.second_user.active_relation_id = self.mentorship_relation.id
+        db.session.commit()
+
         dao = MentorshipRelationDAO()
         data = dict(
             mentor_id=self.first_user.id,
@@ -199,6 +205,11 @@ class TestMentorshipRelationCreationDAO(MentorshipRelationBaseTestCase):
         db.session.add(self.mentorship_relation)
         db.session.commit()
 
+        # accepting the relation marks both users as in it
+        self.admin_user.active_relation_id = self.mentorship_relation.id
+        self.second_user.active_relation_id = self.mentorship_relation.id
+        db.session.commit()
+
         dao = MentorshipRelationDAO()
         data = dict(
             mentor_id=self.second_user.id,
@@ -9,8 +9,6 @@ from tests.mentorship_relation.relation_base_setup import MentorshipRelationBase
 from app.database.sqlalchemy_extension import db
 
 
-# TODO test combination of parameters while listing relations
-
 class TestMentorshipRelationListingDAO(MentorshipRelationBaseTestCase):
 
     # Setup consists of adding 2 users into the database
@@ -46,7 +44,7 @@ class TestMentorshipRelationListingDAO(MentorshipRelationBaseTestCase):
 
         result = DAO.list_mentorship_relations(user_id=self.first_user.id, accepted=True)
 
-        self.assertEqual(({'message': 'Not implemented.'}, 200), result)
+        self.assertEqual(([self.mentorship_relation], 200, {}), result)
 
     def test_dao_list_mentorship_relation_cancelled(self):
         DAO = MentorshipRelationDAO()
@@ -57,7 +55,7 @@ class TestMentorshipRelationListingDAO(MentorshipRelationBaseTestCase):
 
         result = DAO.list_mentorship_relations(user_id=self.first_user.id, cancelled=True)
 
-        self.assertEqual(({'message': 'Not implemented.'}, 200), result)
+        self.assertEqual(([self.mentorship_relation], 200, {}), result)
 
     def test_dao_list_mentorship_relation_rejected(self):
         DAO = MentorshipRelationDAO()
@@ -68,7 +66,7 @@ class TestMentorshipRelationListingDAO(MentorshipRelationBaseTestCase):
 
         result = DAO.list_mentorship_relations(user_id=self.first_user.id, rejected=True)
 
-        self.assertEqual(({'message': 'Not implemented.'}, 200), result)
+        self.assertEqual(([self.mentorship_relation], 200, {}), result)
 
     def test_dao_list_mentorship_relation_completed(self):
         DAO = MentorshipRelationDAO()
@@ -79,7 +77,7 @@ class TestMentorshipRelationListingDAO(MentorshipRelationBaseTestCase):
 
         result = DAO.list_mentorship_relations(user_id=self.first_user.id, completed=True)
 
-        self.assertEqual(({'message': 'Not implemented.'}, 200), result)
+        self.assertEqual(([self.mentorship_relation], 200, {}), result)
 
     def test_dao_list_mentorship_relation_pending(self):
         DAO = MentorshipRelationDAO()
@@ -90,7 +88,7 @@ class TestMentorshipRelationListingDAO(MentorshipRelationBaseTestCase):
 
         result = DAO.list_mentorship_relations(user_id=self.first_user.id, pending=True)
 
-        self.assertEqual(({'message': 'Not implemented.'}, 200), result)
+        self.assertEqual(([self.mentorship_relation], 200, {}), result)
 
     def test_dao_list_mentorship_relation_all(self):
         DAO = MentorshipRelationDAO()
@@ -100,11 +98,63 @@ class TestMentorshipRelationListingDAO(MentorshipRelationBaseTestCase):
         db.session.commit()
 
         result = DAO.list_mentorship_relations(user_id=self.first_user.id)
-        expected_response = [self.mentorship_relation], 200
+        expected_response = [self.mentorship_relation], 200, {}
 
         self.assertIsNotNone(result)
         self.assertEqual(expected_response, result)
 
+    def test_dao_list_mentorship_relation_other_state(self):
+        DAO = MentorshipRelationDAO()
+
+        result = DAO.list_mentorship_relations(user_id=self.first_user.id, accepted=True)
+
+        self.assertEqual(([], 200, {}), result)
+
+    def test_dao_list_mentorship_relation_combination_of_states(self):
+        DAO = MentorshipRelationDAO()
+
+        rejected_relation = MentorshipRelationModel(
+            action_user_id=self.second_user.id,
+            mentor_user=self.first_user,
+            mentee_user=self.second_user,
+            creation_date=self.now_datetime.timestamp(),
+            end_date=self.end_date_example.timestamp(),
+            state=MentorshipRelationState.REJECTED,
+            notes=self.notes_example,
+            tasks_list=TasksListModel()
+        )
+        cancelled_relation = MentorshipRelationModel(
+            action_user_id=self.first_user.id,
+            mentor_user=self.second_user,
+            mentee_user=self.first_user,
+            creation_date=self.now_datetime.timestamp(),
+            end_date=self.end_date_example.timestamp(),
+            state=MentorshipRelationState.CANCELLED,
+            notes=self.notes_example,
+            tasks_list=TasksListModel()
+        )
+        db.session.add(rejected_relation)
+        db.session.add(cancelled_relation)
+        db.session.commit()
+
+        relations, status, _ = DAO.list_mentorship_relations(user_id=self.first_user.id, pending=True, cancelled=True)
+
+        self.assertEqual(200, status)
+        self.assertEqual([cancelled_relation, self.mentorship_relation], relations)
+        self.assertEqual([True, True], [relation.sent_by_me for relation in relations])
+
+        relations, status, _ = DAO.list_mentorship_relations(user_id=self.second_user.id, rejected=True, cancelled=True)
+
+        self.assertEqual([cancelled_relation, rejected_relation], relations)
+        self.assertEqual([False, True], [relation.sent_by_me for relation in relations])
+
+    def test_dao_list_mentorship_relation_non_existing_user(self):
+        DAO = MentorshipRelationDAO()
+
+        result = DAO.list_mentorship_relations(user_id=1234, pending=True)
+
+        self.assertEqual(({'message': 'User does not exist.'}, 404), result)
+
 
 if __name__ == '__main__':
     unittest.main()
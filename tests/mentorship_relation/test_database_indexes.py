@@ -0,0 +1,115 @@
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.api.dao.mentorship_relation import MentorshipRelationDAO
+from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from app.utils.enum_utils import MentorshipRelationState
+from tests.mentorship_relation.relation_base_setup import MentorshipRelationBaseTestCase
+
+
+class TestMentorshipRelationIndexes(MentorshipRelationBaseTestCase):
+
+    # Setup consists of adding many relations between 100 users, mostly completed ones,
+    # and gathering statistics, so the query planner has the same data to choose from as in production
+    def setUp(self):
+        super(TestMentorshipRelationIndexes, self).setUp()
+
+        self.now_timestamp = datetime.now().timestamp()
+        states = [MentorshipRelationState.COMPLETED] * 6 + list(MentorshipRelationState)
+        db.session.execute(MentorshipRelationModel.__table__.insert(), [dict(
+            mentor_id=index % 100 + 1,
+            mentee_id=(index * 7 + 3) % 100 + 1,
+            action_user_id=index % 100 + 1,
+            creation_date=self.now_timestamp,
+            end_date=self.now_timestamp + (index % 9 - 4) * timedelta(weeks=1).total_seconds(),
+            state=states[index % len(states)].name
+        ) for index in range(2000)])
+        db.session.commit()
+        db.session.execute('ANALYZE')
+
+    def get_query_plan(self, query):
+        statement = query.with_labels().statement if hasattr(query, 'with_labels') else query
+        compiled_query = statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+        return str(db.session.execute('EXPLAIN QUERY PLAN %s' % compiled_query).fetchall())
+
+    def get_executed_query_plan(self, run_query):
+        """Returns the query plan of the last statement run_query executes, with the parameters it was bound to."""
+        executions = []
+
+        def capture_execution(connection, cursor, statement, parameters, context, executemany):
+            executions.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', capture_execution)
+        try:
+            run_query()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture_execution)
+        statement, parameters = executions[-1]
+        return str(db.session.connection().execute('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall())
+
+    def assert_uses_user_indexes(self, query_plan):
+        self.assertIn('ix_mentorship_relations_mentor_id_state', query_plan)
+        self.assertIn('ix_mentorship_relations_mentee_id_state', query_plan)
+        self.assertNotIn('SCAN mentorship_relations', query_plan)
+
+    def test_list_relations_uses_index(self):
+        query_plan = self.get_query_plan(MentorshipRelationDAO.get_relations_query(self.first_user.id))
+
+        self.assert_uses_user_indexes(query_plan)
+
+    def test_list_relations_by_state_uses_index(self):
+        query_plan = self.get_query_plan(MentorshipRelationDAO.get_relations_query(
+            self.first_user.id,
+            MentorshipRelationModel.state.in_([MentorshipRelationState.PENDING, MentorshipRelationState.CANCELLED])))
+
+        self.assert_uses_user_indexes(query_plan)
+        self.assertIn('mentor_id=? AND state=?', query_plan)
+
+    def test_list_past_relations_uses_index(self):
+        query_plan = self.get_query_plan(MentorshipRelationDAO.get_relations_query(
+            self.first_user.id, MentorshipRelationModel.end_date < self.now_timestamp))
+
+        self.assert_uses_user_indexes(query_plan)
+
+    def test_list_pending_relations_uses_index(self):
+        query_plan = self.get_query_plan(MentorshipRelationDAO.get_relations_query(
+            self.first_user.id,
+            MentorshipRelationModel.state == MentorshipRelationState.PENDING,
+            MentorshipRelationModel.end_date > self.now_timestamp))
+
+        self.assert_uses_user_indexes(query_plan)
+        self.assertIn('mentor_id=? AND state=?', query_plan)
+
+    def test_overdue_accepted_relations_use_index(self):
+        query_plan = self.get_executed_query_plan(
+            lambda: MentorshipRelationModel.overdue_accepted_relations(self.now_timestamp).all())
+
+        self.assertIn('ix_mentorship_relations_accepted_state_end_date (state=? AND end_date<?)', query_plan)
+
+    def test_accepted_relations_index_is_partial(self):
+        index_sql = db.session.execute("SELECT sql FROM sqlite_master WHERE name = "
+                                       "'ix_mentorship_relations_accepted_state_end_date'").scalar()
+
+        self.assertIn("WHERE state = 'ACCEPTED'", index_sql)
+
+    def test_accepted_relation_check_uses_index(self):
+        query = db.session.query(UserModel.id).filter(~MentorshipRelationModel.has_accepted_relation(UserModel.id))
+        query_plan = self.get_query_plan(query)
+
+        self.assert_uses_user_indexes(query_plan)
+
+    def test_overdue_accepted_relations(self):
+        relations = MentorshipRelationModel.overdue_accepted_relations(self.now_timestamp).all()
+
+        self.assertTrue(relations)
+        for relation in relations:
+            self.assertEqual(MentorshipRelationState.ACCEPTED, relation.state)
+            self.assertLess(relation.end_date, self.now_timestamp)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -24,7 +24,8 @@ class TestTestingConfig(TestCase):
         self.assertIsNotNone(current_app)
 
         # testing JWT configurations
-        self.assertEqual(timedelta(weeks=1), application.config['JWT_ACCESS_TOKEN_EXPIRES'])
+        self.assertEqual(timedelta(minutes=15), application.config['JWT_ACCESS_TOKEN_EXPIRES'])
+        self.assertEqual(timedelta(weeks=4), application.config['JWT_REFRESH_TOKEN_EXPIRES'])
 
 
 class TestDevelopmentConfig(TestCase):
@@ -44,7 +45,8 @@ class TestDevelopmentConfig(TestCase):
         self.assertIsNotNone(current_app)
 
         # testing JWT configurations
-        self.assertEqual(timedelta(weeks=1), application.config['JWT_ACCESS_TOKEN_EXPIRES'])
+        self.assertEqual(timedelta(minutes=15), application.config['JWT_ACCESS_TOKEN_EXPIRES'])
+        self.assertEqual(timedelta(weeks=4), application.config['JWT_REFRESH_TOKEN_EXPIRES'])
 
 
 class TestProductionConfig(TestCase):
@@ -64,7 +66,8 @@ class TestProductionConfig(TestCase):
         self.assertIsNotNone(current_app)
 
         # testing JWT configurations
-        self.assertEqual(timedelta(weeks=1), application.config['JWT_ACCESS_TOKEN_EXPIRES'])
+        self.assertEqual(timedelta(minutes=15), application.config['JWT_ACCESS_TOKEN_EXPIRES'])
+        self.assertEqual(timedelta(weeks=4), application.config['JWT_REFRESH_TOKEN_EXPIRES'])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,65 @@
+import time
+import unittest
+
+from app.api.circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        circuit_breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+
+        circuit_breaker.record_failure()
+        self.assertEqual(0, circuit_breaker.get_seconds_until_call())
+        circuit_breaker.record_failure()
+
+        self.assertEqual(CircuitBreaker.OPEN, circuit_breaker.state)
+        self.assertGreater(circuit_breaker.get_seconds_until_call(), 59)
+
+    def test_success_resets_failures(self):
+        circuit_breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+
+        circuit_breaker.record_failure()
+        circuit_breaker.record_success()
+        circuit_breaker.record_failure()
+
+        self.assertEqual(CircuitBreaker.CLOSED, circuit_breaker.state)
+
+    def test_single_trial_call_after_reset(self):
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.01)
+        circuit_breaker.record_failure()
+        time.sleep(0.02)
+
+        self.assertEqual(0, circuit_breaker.get_seconds_until_call())
+        self.assertEqual(CircuitBreaker.HALF_OPEN, circuit_breaker.state)
+        # other calls wait for the result of the trial call
+        self.assertGreater(circuit_breaker.get_seconds_until_call(), 0)
+
+        circuit_breaker.record_failure()
+        self.assertEqual(CircuitBreaker.OPEN, circuit_breaker.state)
+
+    def test_cancelled_trial_lets_next_call_through(self):
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+        circuit_breaker.record_failure()
+        circuit_breaker.opened_at -= 60
+
+        self.assertEqual(0, circuit_breaker.get_seconds_until_call())
+        circuit_breaker.cancel_trial()
+
+        self.assertEqual(0, circuit_breaker.get_seconds_until_call())
+        self.assertGreater(circuit_breaker.get_seconds_until_call(), 59)
+
+    def test_trial_times_out(self):
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+        circuit_breaker.record_failure()
+        circuit_breaker.opened_at -= 60
+        self.assertEqual(0, circuit_breaker.get_seconds_until_call())
+
+        circuit_breaker.trial_started_at -= 60
+
+        self.assertEqual(0, circuit_breaker.get_seconds_until_call())
+        self.assertEqual(CircuitBreaker.HALF_OPEN, circuit_breaker.state)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,274 @@
+import asyncore
+import smtpd
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from flask import json
+
+from app.api.circuit_breaker import CircuitBreaker
+from app.api.dao.email_outbox import EmailOutboxDAO
+from app.api.mail_extension import mail
+from app.database.models.email_outbox import EmailOutboxModel
+from app.database.sqlalchemy_extension import db
+from app.schedulers.dispatch_emails_cron_job import dispatch_emails_job
+from config import TestingConfig
+from tests.base_test_case import BaseTestCase
+from tests.test_data import test_admin_user, user1
+
+
+class LocalSMTPServer(smtpd.SMTPServer):
+    """SMTP server stand-in that keeps the messages, failing the first ones if asked to."""
+
+    def __init__(self, number_of_failures=0):
+        super(LocalSMTPServer, self).__init__(('127.0.0.1', 0), None, decode_data=True)
+        self.port = self.socket.getsockname()[1]
+        self.number_of_failures = number_of_failures
+        self.messages = []
+        self.number_of_connections = 0
+        self.is_stopped = False
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while not self.is_stopped:
+            asyncore.loop(timeout=0.05, map=self._map, count=1)
+        self.close()
+
+    def handle_accepted(self, conn, addr):
+        self.number_of_connections += 1
+        super(LocalSMTPServer, self).handle_accepted(conn, addr)
+
+    def process_message(self, peer, mailfrom, rcpttos, data, **kwargs):
+        if self.number_of_failures > 0:
+            self.number_of_failures -= 1
+            return '451 Temporary failure'
+        self.messages.append((rcpttos, data))
+
+    def stop(self):
+        self.is_stopped = True
+        self.thread.join()
+
+
+class TestEmailOutbox(BaseTestCase):
+
+    def setUp(self):
+        super(TestEmailOutbox, self).setUp()
+        self.mail_state = self.app.extensions['mail']
+        self.app.extensions.pop('email_outbox_circuit_breaker', None)
+        self.smtp_server = None
+
+    def tearDown(self):
+        if self.smtp_server:
+            self.smtp_server.stop()
+        self.app.extensions['mail'] = self.mail_state
+        self.app.config['MAIL_DEFAULT_SENDER'] = TestingConfig.MAIL_DEFAULT_SENDER
+        self.app.config['EMAIL_OUTBOX_SCHEDULER_ENABLED'] = TestingConfig.EMAIL_OUTBOX_SCHEDULER_ENABLED
+        self.app.config['EMAIL_OUTBOX_BATCH_SIZE'] = TestingConfig.EMAIL_OUTBOX_BATCH_SIZE
+        self.app.extensions.pop('email_outbox_circuit_breaker', None)
+        super(TestEmailOutbox, self).tearDown()
+
+    def start_smtp_server(self, **kwargs):
+        self.smtp_server = LocalSMTPServer(**kwargs)
+        self.use_smtp_port(self.smtp_server.port)
+
+    def use_smtp_port(self, port):
+        self.app.extensions['mail'] = mail.init_mail({
+            'MAIL_SERVER': '127.0.0.1',
+            'MAIL_PORT': port,
+            'MAIL_SUPPRESS_SEND': False
+        })
+        self.app.config['MAIL_DEFAULT_SENDER'] = 'mentorship@email.com'
+
+    def add_emails(self, number_of_emails):
+        for i in range(number_of_emails):
+            EmailOutboxModel('user%d@email.com' % i, 'Subject %d' % i, '<p>Email %d</p>' % i).add_to_session()
+        db.session.commit()
+
+    def register_user(self, username):
+        return self.client.post('/register', data=json.dumps(dict(
+            name=user1['name'],
+            username=username,
+            password=user1['password'],
+            email=user1['email'],
+            terms_and_conditions_checked=user1['terms_and_conditions_checked']
+        )), follow_redirects=True, content_type='application/json')
+
+    def test_registration_adds_verification_email_to_outbox(self):
+        response = self.register_user(user1['username'])
+
+        self.assertEqual(200, response.status_code)
+        email = EmailOutboxModel.query.one()
+        self.assertEqual(user1['email'], email.recipient)
+        self.assertIn('/user/confirm_email/', email.html)
+        self.assertIsNone(email.sent_at)
+
+    def test_failed_registration_does_not_add_email_to_outbox(self):
+        response = self.register_user(test_admin_user['username'])
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(0, EmailOutboxModel.query.count())
+
+    def test_resend_email_adds_verification_email_to_outbox(self):
+        self.register_user(user1['username'])
+
+        response = self.client.post('/user/resend_email', data=json.dumps(dict(email=user1['email'])),
+                                    follow_redirects=True, content_type='application/json')
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, EmailOutboxModel.query.filter_by(recipient=user1['email']).count())
+
+    def test_dispatch_sends_batch_over_one_connection(self):
+        self.start_smtp_server()
+        self.add_emails(3)
+
+        self.assertEqual((3, 0), EmailOutboxDAO.dispatch_emails())
+
+        self.assertEqual(1, self.smtp_server.number_of_connections)
+        self.assertEqual([['user0@email.com'], ['user1@email.com'], ['user2@email.com']],
+                         [recipients for recipients, _ in self.smtp_server.messages])
+        self.assertEqual(0, EmailOutboxModel.query.filter_by(sent_at=None).count())
+        self.assertEqual((0, 0), EmailOutboxDAO.dispatch_emails())
+
+    def test_dispatch_sends_at_most_batch_size_emails(self):
+        self.start_smtp_server()
+        self.add_emails(3)
+
+        self.assertEqual((2, 0), EmailOutboxDAO.dispatch_emails(batch_size=2))
+        self.assertEqual((1, 0), EmailOutboxDAO.dispatch_emails(batch_size=2))
+
+    def test_dispatch_skips_emails_claimed_by_other_dispatcher(self):
+        self.start_smtp_server()
+        self.add_emails(2)
+        EmailOutboxDAO.claim_emails('other dispatcher', batch_size=1)
+
+        self.assertEqual((1, 0), EmailOutboxDAO.dispatch_emails())
+
+        self.assertEqual([['user1@email.com']], [recipients for recipients, _ in self.smtp_server.messages])
+
+    def test_dispatch_claims_emails_of_dead_dispatcher_again(self):
+        self.start_smtp_server()
+        self.add_emails(1)
+        EmailOutboxDAO.claim_emails('dead dispatcher', batch_size=1)
+        email = EmailOutboxModel.query.one()
+        email.claimed_at = datetime.now() - timedelta(seconds=self.app.config['EMAIL_OUTBOX_CLAIM_SECONDS'] + 1)
+        db.session.commit()
+
+        self.assertEqual((1, 0), EmailOutboxDAO.dispatch_emails())
+
+    def test_dispatch_keeps_connection_after_message_error(self):
+        self.start_smtp_server(number_of_failures=1)
+        self.add_emails(2)
+
+        self.assertEqual((1, 1), EmailOutboxDAO.dispatch_emails())
+
+        failed_email = EmailOutboxModel.query.filter_by(recipient='user0@email.com').one()
+        self.assertIsNone(failed_email.sent_at)
+        self.assertIsNone(failed_email.claimed_by)
+        self.assertEqual(1, failed_email.attempts)
+        self.assertIn('451', failed_email.last_error)
+
+        # the failed email is only retried once it is due
+        self.assertEqual((0, 0), EmailOutboxDAO.dispatch_emails())
+        failed_email.next_attempt_at = datetime.now() - timedelta(seconds=1)
+        db.session.commit()
+        self.assertEqual((1, 0), EmailOutboxDAO.dispatch_emails())
+
+    def test_dispatch_backs_off_exponentially(self):
+        self.start_smtp_server(number_of_failures=2)
+        self.add_emails(1)
+        email = EmailOutboxModel.query.one()
+        backoff_seconds = self.app.config['EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS']
+
+        before_dispatch = datetime.now()
+        self.assertEqual((0, 1), EmailOutboxDAO.dispatch_emails())
+        self.assertGreaterEqual(email.next_attempt_at, before_dispatch + timedelta(seconds=backoff_seconds))
+
+        email.next_attempt_at = None
+        db.session.commit()
+        before_dispatch = datetime.now()
+        self.assertEqual((0, 1), EmailOutboxDAO.dispatch_emails())
+        self.assertEqual(2, email.attempts)
+        self.assertGreaterEqual(email.next_attempt_at, before_dispatch + timedelta(seconds=2 * backoff_seconds))
+
+    def test_dispatch_releases_batch_when_smtp_server_is_down(self):
+        # nothing listens on the port of a stopped server
+        server = LocalSMTPServer()
+        server.stop()
+        self.use_smtp_port(server.port)
+        self.add_emails(2)
+
+        self.assertEqual((0, 2), EmailOutboxDAO.dispatch_emails())
+
+        # the emails did not fail, the server did, so no attempt is charged
+        emails = EmailOutboxModel.query.order_by(EmailOutboxModel.id).all()
+        self.assertEqual([0, 0], [email.attempts for email in emails])
+        self.assertEqual([None, None], [email.next_attempt_at for email in emails])
+        self.assertEqual(0, EmailOutboxModel.query.filter(EmailOutboxModel.claimed_by.isnot(None)).count())
+
+    def test_dispatch_stops_connecting_while_smtp_server_is_down(self):
+        server = LocalSMTPServer()
+        server.stop()
+        self.use_smtp_port(server.port)
+        self.add_emails(1)
+        threshold = self.app.config['MAIL_CIRCUIT_BREAKER_THRESHOLD']
+
+        with patch.object(mail, 'connect', wraps=mail.connect) as connect:
+            for _ in range(threshold):
+                self.assertEqual((0, 1), EmailOutboxDAO.dispatch_emails())
+            self.assertEqual((0, 0), EmailOutboxDAO.dispatch_emails())
+
+        self.assertEqual(threshold, connect.call_count)
+        self.assertEqual(0, EmailOutboxModel.query.one().attempts)
+
+    def test_dispatch_tries_again_after_trial_pass_without_due_emails(self):
+        server = LocalSMTPServer()
+        server.stop()
+        self.use_smtp_port(server.port)
+        self.add_emails(1)
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+        self.app.extensions['email_outbox_circuit_breaker'] = circuit_breaker
+        self.assertEqual((0, 1), EmailOutboxDAO.dispatch_emails())
+
+        # the trial pass after the reset period claims nothing, so it does not try the server
+        circuit_breaker.opened_at -= 60
+        email = EmailOutboxModel.query.one()
+        email.next_attempt_at = datetime.now() + timedelta(hours=1)
+        db.session.commit()
+        self.assertEqual((0, 0), EmailOutboxDAO.dispatch_emails())
+
+        self.start_smtp_server()
+        email.next_attempt_at = None
+        db.session.commit()
+
+        self.assertEqual((1, 0), EmailOutboxDAO.dispatch_emails())
+        self.assertEqual(CircuitBreaker.CLOSED, circuit_breaker.state)
+
+    def test_dispatch_gives_up_after_max_attempts(self):
+        self.start_smtp_server()
+        self.add_emails(1)
+        email = EmailOutboxModel.query.one()
+        email.attempts = self.app.config['EMAIL_OUTBOX_MAX_ATTEMPTS']
+        db.session.commit()
+
+        self.assertEqual((0, 0), EmailOutboxDAO.dispatch_emails())
+
+    def get_test_app(self):
+        return self.app
+
+    @patch('run.application', side_effect=get_test_app)
+    def test_dispatch_emails_job_sends_outbox(self, get_test_app_fn):
+        self.start_smtp_server()
+        self.add_emails(3)
+        self.app.config['EMAIL_OUTBOX_SCHEDULER_ENABLED'] = True
+        self.app.config['EMAIL_OUTBOX_BATCH_SIZE'] = 2
+
+        dispatch_emails_job()
+
+        self.assertEqual(0, EmailOutboxModel.query.filter(EmailOutboxModel.sent_at.is_(None)).count())
+        self.assertEqual(2, self.smtp_server.number_of_connections)
+
+
+if __name__ == "__main__":
+    unittest.main()
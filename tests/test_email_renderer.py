@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import patch
+
+from flask import render_template
+
+from app.api.api_extension import api
+from app.api.email_renderer import email_renderer
+from app.api.email_utils import confirm_token, get_email_verification_message, get_email_verification_messages
+from app.api.dao.user import UserDAO
+from app.api.resources.user import UserEmailConfirmation
+from app.database.models.email_outbox import EmailOutboxModel
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from tests.base_test_case import BaseTestCase
+from tests.test_data import user1, user2
+
+
+class TestEmailRenderer(BaseTestCase):
+
+    def setUp(self):
+        super(TestEmailRenderer, self).setUp()
+        email_renderer.init_app(self.app)
+
+        for user_data in (user1, user2):
+            db.session.add(UserModel(
+                name=user_data['name'],
+                email=user_data['email'],
+                username=user_data['username'],
+                password=user_data['password'],
+                terms_and_conditions_checked=user_data['terms_and_conditions_checked']
+            ))
+        db.session.commit()
+
+    def test_message_is_rendered_as_with_render_template(self):
+        subject, html = get_email_verification_message(user1['name'], user1['email'])
+
+        confirm_url = html.split('<a href="', 1)[1].split('"', 1)[0]
+        token = confirm_url.rsplit('/', 1)[1]
+        self.assertEqual(api.url_for(UserEmailConfirmation, token=token, _external=True), confirm_url)
+        self.assertEqual(render_template('email_confirmation.html', confirm_url=confirm_url,
+                                         user_name=user1['name']), html)
+        self.assertEqual(user1['email'], confirm_token(token))
+
+    def test_template_and_url_are_looked_up_once(self):
+        with patch.object(self.app.jinja_env, 'get_template', wraps=self.app.jinja_env.get_template) as get_template, \
+                patch.object(api, 'url_for', wraps=api.url_for) as url_for:
+            get_email_verification_message(user1['name'], user1['email'])
+            get_email_verification_messages([(user1['name'], user1['email']), (user2['name'], user2['email'])])
+
+        self.assertEqual(1, get_template.call_count)
+        self.assertEqual(1, url_for.call_count)
+
+    def test_url_pattern_is_cached_by_host(self):
+        with self.app.test_request_context(base_url='https://mentorship.example.com'):
+            _, html = get_email_verification_message(user1['name'], user1['email'])
+        self.assertIn('https://mentorship.example.com/user/confirm_email/', html)
+
+        _, html = get_email_verification_message(user1['name'], user1['email'])
+        self.assertIn('http://localhost/user/confirm_email/', html)
+
+    def test_configured_base_url_is_used_for_every_host(self):
+        self.app.config['EMAIL_BASE_URL'] = 'https://mentorship.example.com'
+        try:
+            with self.app.test_request_context(base_url='https://attacker.example.com'):
+                _, html = get_email_verification_message(user1['name'], user1['email'])
+        finally:
+            self.app.config['EMAIL_BASE_URL'] = None
+
+        self.assertIn('https://mentorship.example.com/user/confirm_email/', html)
+        self.assertNotIn('attacker', html)
+
+    def test_url_patterns_cache_is_bounded(self):
+        for host_number in range(self.app.config['EMAIL_URL_PATTERNS_MAX_SIZE'] + 10):
+            with self.app.test_request_context(base_url='https://host%d.example.com' % host_number):
+                _, html = get_email_verification_message(user1['name'], user1['email'])
+            self.assertIn('https://host%d.example.com/user/confirm_email/' % host_number, html)
+
+        self.assertEqual(self.app.config['EMAIL_URL_PATTERNS_MAX_SIZE'],
+                         len(self.app.extensions['email_renderer']['url_patterns']))
+
+    def test_messages_are_personalised(self):
+        messages = get_email_verification_messages([(user1['name'], user1['email']), (user2['name'], user2['email'])])
+
+        for (_, html), user_data in zip(messages, (user1, user2)):
+            token = html.split('/user/confirm_email/', 1)[1].split('"', 1)[0]
+            self.assertIn('Hi %s,' % user_data['name'], html)
+            self.assertEqual(user_data['email'], confirm_token(token))
+
+    def test_resend_email_verification_messages_to_unverified_users(self):
+        number_of_messages = UserDAO.resend_email_verification_messages(batch_size=1)
+
+        self.assertEqual(2, number_of_messages)
+        self.assertEqual({user1['email'], user2['email']},
+                         {email.recipient for email in EmailOutboxModel.query.all()})
+
+    def test_resend_email_verification_messages_with_base_url(self):
+        # as done by the resend-email-verification command
+        with self.app.test_request_context(base_url='https://mentorship.example.com'):
+            UserDAO.resend_email_verification_messages()
+
+        for email in EmailOutboxModel.query.all():
+            self.assertIn('https://mentorship.example.com/user/confirm_email/', email.html)
+
+
+if __name__ == "__main__":
+    unittest.main()
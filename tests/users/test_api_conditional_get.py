@@ -0,0 +1,93 @@
+import unittest
+
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from tests.base_test_case import BaseTestCase
+from tests.test_utils import get_test_request_header
+from tests.test_data import user1
+
+
+class TestUsersConditionalGetApi(BaseTestCase):
+
+    def setUp(self):
+        super(TestUsersConditionalGetApi, self).setUp()
+
+        self.other_user = UserModel(
+            name=user1['name'],
+            email=user1['email'],
+            username=user1['username'],
+            password=user1['password'],
+            terms_and_conditions_checked=user1['terms_and_conditions_checked']
+        )
+        db.session.add(self.other_user)
+        db.session.commit()
+
+        self.auth_header = get_test_request_header(self.admin_user.id)
+
+    def get_with_etag(self, url, etag):
+        return self.client.get(url, follow_redirects=True, headers=dict(self.auth_header, **{'If-None-Match': etag}))
+
+    def test_user_profile_not_modified(self):
+        first_response = self.client.get('/user', follow_redirects=True, headers=self.auth_header)
+        second_response = self.get_with_etag('/user', first_response.headers['ETag'])
+
+        self.assertEqual(200, first_response.status_code)
+        self.assertEqual(304, second_response.status_code)
+        self.assertEqual(b'', second_response.data)
+        self.assertEqual(first_response.headers['ETag'], second_response.headers['ETag'])
+
+    def test_user_profile_modified(self):
+        first_response = self.client.get('/user', follow_redirects=True, headers=self.auth_header)
+
+        self.admin_user.bio = 'New bio'
+        db.session.commit()
+        second_response = self.get_with_etag('/user', first_response.headers['ETag'])
+
+        self.assertEqual(200, second_response.status_code)
+        self.assertEqual('New bio', second_response.json['bio'])
+        self.assertNotEqual(first_response.headers['ETag'], second_response.headers['ETag'])
+
+    def test_other_user_cache_headers(self):
+        url = '/users/%s' % self.other_user.id
+        first_response = self.client.get(url, follow_redirects=True, headers=self.auth_header)
+        second_response = self.get_with_etag(url, first_response.headers['ETag'])
+
+        self.assertEqual(201, first_response.status_code)
+        self.assertEqual('private, max-age=60', first_response.headers['Cache-Control'])
+        self.assertEqual(304, second_response.status_code)
+
+    def test_other_user_not_found_has_no_etag(self):
+        response = self.client.get('/users/1234', follow_redirects=True, headers=self.auth_header)
+
+        self.assertEqual(404, response.status_code)
+        self.assertNotIn('ETag', response.headers)
+
+    def test_users_list_modified_when_user_added(self):
+        first_response = self.client.get('/users', follow_redirects=True, headers=self.auth_header)
+        second_response = self.get_with_etag('/users', first_response.headers['ETag'])
+
+        UserModel('New user', 'new_user', 'password', 'new_user@email.com', True).save_to_db()
+        third_response = self.get_with_etag('/users', first_response.headers['ETag'])
+
+        self.assertEqual(200, first_response.status_code)
+        self.assertEqual(304, second_response.status_code)
+        self.assertEqual(200, third_response.status_code)
+        self.assertEqual(2, len(third_response.json))
+
+    def test_users_list_modified_when_user_updated_or_removed(self):
+        first_response = self.client.get('/users', follow_redirects=True, headers=self.auth_header)
+
+        self.other_user.bio = 'New bio'
+        self.other_user.save_to_db()
+        second_response = self.get_with_etag('/users', first_response.headers['ETag'])
+        self.other_user.delete_from_db()
+        third_response = self.get_with_etag('/users', second_response.headers['ETag'])
+
+        self.assertEqual(200, second_response.status_code)
+        self.assertEqual('New bio', second_response.json[0]['bio'])
+        self.assertEqual(200, third_response.status_code)
+        self.assertEqual([], third_response.json)
+
+
+if __name__ == "__main__":
+    unittest.main()
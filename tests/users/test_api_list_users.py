@@ -56,6 +56,31 @@ class TestListUsersApi(BaseTestCase):
         self.assertEqual(200, actual_response.status_code)
         self.assertEqual(expected_response, json.loads(actual_response.data))
 
+    def test_list_users_api_resource_first_page(self):
+        auth_header = get_test_request_header(self.admin_user.id)
+        expected_response = [marshal(self.verified_user, public_user_api_model)]
+        actual_response = self.client.get('/users?limit=1', follow_redirects=True, headers=auth_header)
+
+        self.assertEqual(200, actual_response.status_code)
+        self.assertEqual(expected_response, json.loads(actual_response.data))
+        self.assertEqual(str(self.verified_user.id), actual_response.headers.get('X-Next-Cursor'))
+
+    def test_list_users_api_resource_last_page(self):
+        auth_header = get_test_request_header(self.admin_user.id)
+        expected_response = [marshal(self.other_user, public_user_api_model)]
+        actual_response = self.client.get('/users?limit=1&after_id=%d' % self.verified_user.id,
+                                          follow_redirects=True, headers=auth_header)
+
+        self.assertEqual(200, actual_response.status_code)
+        self.assertEqual(expected_response, json.loads(actual_response.data))
+        self.assertIsNone(actual_response.headers.get('X-Next-Cursor'))
+
+    def test_list_users_api_resource_invalid_limit(self):
+        auth_header = get_test_request_header(self.admin_user.id)
+        actual_response = self.client.get('/users?limit=0', follow_redirects=True, headers=auth_header)
+
+        self.assertEqual(400, actual_response.status_code)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -64,7 +64,9 @@ class TestUserLoginApi(BaseTestCase):
             )), follow_redirects=True, content_type='application/json')
             self.assertIsNotNone(response.json.get('access_token'))
             self.assertIsNotNone(response.json.get('expiry'))
-            self.assertEqual(2, len(response.json))
+            self.assertIsNotNone(response.json.get('refresh_token'))
+            self.assertIsNotNone(response.json.get('refresh_expiry'))
+            self.assertEqual(4, len(response.json))
             self.assertEqual(200, response.status_code)
 
 
@@ -0,0 +1,130 @@
+import unittest
+from unittest.mock import patch
+
+from flask import json
+
+from app.api.login_throttle import login_throttle
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from config import TestingConfig
+from tests.base_test_case import BaseTestCase
+from tests.test_data import user1
+from tests.test_utils import get_test_request_header
+
+
+class TestLoginThrottleApi(BaseTestCase):
+
+    CONFIG = {
+        'LOGIN_THROTTLE_ENABLED': True,
+        'LOGIN_THROTTLE_MAX_ACCOUNT_FAILURES': 3,
+        'LOGIN_THROTTLE_MAX_IP_FAILURES': 5,
+        'LOGIN_THROTTLE_WINDOW_SECONDS': 60,
+        'LOGIN_THROTTLE_MAX_SIZE': 100
+    }
+
+    def setUp(self):
+        super(TestLoginThrottleApi, self).setUp()
+        self.app.config.update(self.CONFIG)
+        login_throttle.clear()
+
+        self.user = UserModel(
+            name=user1['name'],
+            email=user1['email'],
+            username=user1['username'],
+            password=user1['password'],
+            terms_and_conditions_checked=user1['terms_and_conditions_checked']
+        )
+        self.user.is_email_verified = True
+        db.session.add(self.user)
+        db.session.commit()
+
+    def tearDown(self):
+        for name in self.CONFIG:
+            self.app.config[name] = getattr(TestingConfig, name)
+        login_throttle.clear()
+        super(TestLoginThrottleApi, self).tearDown()
+
+    def login(self, username, password, ip_address='10.0.0.1'):
+        return self.client.post('/login', data=json.dumps(dict(username=username, password=password)),
+                                follow_redirects=True, content_type='application/json',
+                                environ_base={'REMOTE_ADDR': ip_address})
+
+    def test_account_is_throttled_after_failures(self):
+        for _ in range(2):
+            self.assertEqual(404, self.login(user1['username'], 'wrong password').status_code)
+
+        response = self.login(user1['username'], 'wrong password')
+
+        self.assertEqual(429, response.status_code)
+        self.assertEqual('60', response.headers['Retry-After'])
+        # the right password is not checked either, from any address
+        self.assertEqual(429, self.login(user1['username'].upper(), user1['password'], '10.0.0.2').status_code)
+
+    def test_username_and_email_failures_count_for_same_account(self):
+        for _ in range(2):
+            self.login(user1['username'], 'wrong password')
+        self.login(user1['email'], 'wrong password')
+
+        self.assertEqual(429, self.login(user1['email'].upper(), user1['password'], '10.0.0.2').status_code)
+
+    def test_throttled_login_does_not_hash_password(self):
+        for _ in range(3):
+            self.login(user1['username'], 'wrong password')
+
+        with patch('app.database.models.user.check_password_hash') as check_password_hash:
+            self.login(user1['username'], user1['password'])
+
+        check_password_hash.assert_not_called()
+
+    def test_ip_address_is_throttled_after_failures(self):
+        for i in range(5):
+            self.login('user_%d' % i, 'wrong password')
+
+        self.assertEqual(429, self.login(user1['username'], user1['password']).status_code)
+        self.assertEqual(200, self.login(user1['username'], user1['password'], '10.0.0.2').status_code)
+
+    def test_successful_login_resets_account_failures(self):
+        for _ in range(2):
+            self.login(user1['username'], 'wrong password')
+        self.assertEqual(200, self.login(user1['username'], user1['password']).status_code)
+
+        self.assertEqual(404, self.login(user1['username'], 'wrong password').status_code)
+
+    def test_failures_out_of_window_are_forgotten(self):
+        self.app.config['LOGIN_THROTTLE_WINDOW_SECONDS'] = 0
+        for _ in range(3):
+            self.login(user1['username'], 'wrong password')
+
+        self.assertEqual(200, self.login(user1['username'], user1['password']).status_code)
+
+    def test_least_recently_used_counters_are_evicted(self):
+        self.app.config['LOGIN_THROTTLE_MAX_SIZE'] = 2
+        for _ in range(3):
+            self.login(user1['username'], 'wrong password')
+
+        # the counters of the new account and address evict the ones of user1
+        self.login('other_user', 'wrong password', '10.0.0.2')
+
+        self.assertEqual(2, login_throttle.get_stats()['size'])
+        self.assertEqual(200, self.login(user1['username'], user1['password']).status_code)
+
+    def test_metrics_expose_login_counters(self):
+        for _ in range(4):
+            self.login(user1['username'], 'wrong password')
+
+        response = self.client.get('/admin/metrics', follow_redirects=True,
+                                   headers=get_test_request_header(self.admin_user.id))
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'failures': 3, 'throttled': 1, 'size': 2}, response.json['login_throttle'])
+        self.assertIn('users_cache', response.json)
+
+    def test_metrics_non_admin(self):
+        response = self.client.get('/admin/metrics', follow_redirects=True,
+                                   headers=get_test_request_header(self.user.id))
+
+        self.assertEqual(403, response.status_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
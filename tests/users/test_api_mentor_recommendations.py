@@ -0,0 +1,107 @@
+import unittest
+from datetime import datetime, timedelta
+
+from flask import json
+
+from app.api.dao.mentor_recommendation import MentorRecommendationDAO
+from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.models.tasks_list import TasksListModel
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from app.utils.enum_utils import MentorshipRelationState
+from tests.base_test_case import BaseTestCase
+from tests.test_utils import get_test_request_header
+from tests.test_data import user1, user2
+
+
+class TestMentorRecommendationsApi(BaseTestCase):
+
+    # Setup consists of adding 3 users into the database
+    # User 1 needs mentoring in Python and lives in Lisbon
+    # User 2 is an available Python mentor in Lisbon
+    # User 3 is an available Python mentor, already in an accepted relation
+    def setUp(self):
+        super(TestMentorRecommendationsApi, self).setUp()
+        # the users version starts again with every database, so no engine is kept between tests
+        self.app.extensions.pop('mentor_matching_engine', None)
+
+        self.mentee_user = UserModel(
+            name=user1['name'],
+            email=user1['email'],
+            username=user1['username'],
+            password=user1['password'],
+            terms_and_conditions_checked=user1['terms_and_conditions_checked']
+        )
+        self.mentor_user = UserModel(
+            name=user2['name'],
+            email=user2['email'],
+            username=user2['username'],
+            password=user2['password'],
+            terms_and_conditions_checked=user2['terms_and_conditions_checked']
+        )
+        self.busy_mentor_user = UserModel(
+            name='Busy Mentor',
+            email='busy_mentor@email.com',
+            username='busy_mentor',
+            password='busy_mentor_pwd',
+            terms_and_conditions_checked=True
+        )
+
+        self.mentee_user.need_mentoring = True
+        self.mentee_user.interests = 'Python, Open Source'
+        self.mentee_user.location = 'Lisbon'
+        self.mentor_user.available_to_mentor = True
+        self.mentor_user.skills = 'Python'
+        self.mentor_user.location = 'Lisbon'
+        self.busy_mentor_user.available_to_mentor = True
+        self.busy_mentor_user.skills = 'Python, Open Source'
+
+        db.session.add(self.mentee_user)
+        db.session.add(self.mentor_user)
+        db.session.add(self.busy_mentor_user)
+        db.session.commit()
+
+        accepted_relation = MentorshipRelationModel(
+            action_user_id=self.admin_user.id,
+            mentor_user=self.busy_mentor_user,
+            mentee_user=self.admin_user,
+            creation_date=datetime.now().timestamp(),
+            end_date=(datetime.now() + timedelta(weeks=5)).timestamp(),
+            state=MentorshipRelationState.ACCEPTED,
+            notes='',
+            tasks_list=TasksListModel()
+        )
+        db.session.add(accepted_relation)
+        db.session.commit()
+
+    def test_mentor_recommendations_non_auth(self):
+        expected_response = {'message': 'The authorization token is missing!'}
+        actual_response = self.client.get('/user/mentor_recommendations', follow_redirects=True)
+
+        self.assertEqual(401, actual_response.status_code)
+        self.assertEqual(expected_response, json.loads(actual_response.data))
+
+    def test_mentor_recommendations(self):
+        auth_header = get_test_request_header(self.mentee_user.id)
+        actual_response = self.client.get('/user/mentor_recommendations', follow_redirects=True,
+                                          headers=auth_header)
+        recommendations = json.loads(actual_response.data)
+
+        self.assertEqual(200, actual_response.status_code)
+        self.assertEqual([self.mentor_user.id], [mentor['id'] for mentor in recommendations])
+        self.assertEqual(self.mentor_user.username, recommendations[0]['username'])
+        self.assertGreater(recommendations[0]['score'], 0)
+
+    def test_mentor_recommendations_user_not_needing_mentoring(self):
+        result = MentorRecommendationDAO.recommend_mentors(self.mentor_user.id)
+
+        self.assertEqual(({'message': 'You are not available to be mentored.'}, 400), result)
+
+    def test_mentor_recommendations_exclude_mentors_in_accepted_relation(self):
+        mentors_ids = [mentor.id for mentor in MentorRecommendationDAO.get_available_mentors()]
+
+        self.assertEqual([self.mentor_user.id], mentors_ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
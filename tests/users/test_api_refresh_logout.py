@@ -0,0 +1,130 @@
+import time
+import unittest
+
+from flask import json
+from flask_jwt_extended import create_refresh_token, decode_token
+from sqlalchemy import event
+
+from app.api.authorization import token_revocations
+from app.database.models.revoked_token import RevokedTokenModel
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from config import TestingConfig
+from tests.base_test_case import BaseTestCase
+from tests.test_data import user1
+
+
+class TestRefreshAndLogoutApi(BaseTestCase):
+
+    def setUp(self):
+        super(TestRefreshAndLogoutApi, self).setUp()
+
+        self.user = UserModel(
+            name=user1['name'],
+            email=user1['email'],
+            username=user1['username'],
+            password=user1['password'],
+            terms_and_conditions_checked=user1['terms_and_conditions_checked']
+        )
+        self.user.is_email_verified = True
+        db.session.add(self.user)
+        db.session.commit()
+
+        response = self.client.post('/login', data=json.dumps(dict(
+            username=user1['username'],
+            password=user1['password']
+        )), follow_redirects=True, content_type='application/json')
+        self.access_token = response.json['access_token']
+        self.refresh_token = response.json['refresh_token']
+
+    def tearDown(self):
+        self.app.config['TOKEN_REVOCATIONS_SYNC_SECONDS'] = TestingConfig.TOKEN_REVOCATIONS_SYNC_SECONDS
+        super(TestRefreshAndLogoutApi, self).tearDown()
+
+    @staticmethod
+    def get_header(token):
+        return {'Authorization': 'Bearer {}'.format(token)}
+
+    def get_user(self, token):
+        return self.client.get('/user', follow_redirects=True, headers=self.get_header(token))
+
+    def refresh(self, token):
+        return self.client.post('/refresh', follow_redirects=True, headers=self.get_header(token))
+
+    def logout(self, token, refresh_token=None):
+        data = json.dumps(dict(refresh_token=refresh_token)) if refresh_token else None
+        return self.client.post('/logout', follow_redirects=True, headers=self.get_header(token), data=data,
+                                content_type='application/json')
+
+    def test_refresh_returns_new_access_token(self):
+        response = self.refresh(self.refresh_token)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'access_token', 'expiry'}, set(response.json))
+        self.assertEqual(200, self.get_user(response.json['access_token']).status_code)
+        self.assertTrue(decode_token(response.json['access_token'])['user_claims']['name'])
+
+    def test_refresh_with_access_token(self):
+        response = self.refresh(self.access_token)
+
+        self.assertEqual(401, response.status_code)
+        self.assertEqual({'message': 'The token is invalid!'}, response.json)
+
+    def test_logout_revokes_access_token(self):
+        response = self.logout(self.access_token)
+
+        self.assertEqual(200, response.status_code)
+        response = self.get_user(self.access_token)
+        self.assertEqual(401, response.status_code)
+        self.assertEqual({'message': 'The token has been revoked! Please, login again.'}, response.json)
+        # the refresh token was not sent, so it still works
+        self.assertEqual(200, self.refresh(self.refresh_token).status_code)
+
+    def test_logout_revokes_refresh_token(self):
+        response = self.logout(self.access_token, self.refresh_token)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(401, self.refresh(self.refresh_token).status_code)
+
+    def test_logout_with_refresh_token_of_other_user(self):
+        other_refresh_token = create_refresh_token(identity=self.admin_user.id)
+
+        response = self.logout(self.access_token, other_refresh_token)
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(200, self.get_user(self.access_token).status_code)
+
+    def test_revocation_by_other_process_is_synchronized(self):
+        decoded_token = decode_token(self.access_token)
+        db.session.add(RevokedTokenModel(decoded_token['jti'], time.time(), decoded_token['exp']))
+        db.session.commit()
+
+        self.assertEqual(401, self.get_user(self.access_token).status_code)
+
+    def test_revocation_check_does_not_query_database_between_synchronizations(self):
+        self.app.config['TOKEN_REVOCATIONS_SYNC_SECONDS'] = 60
+        token_revocations.sync_if_outdated()
+        queries = []
+
+        def count_query(conn, cursor, statement, parameters, context, executemany):
+            queries.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+        try:
+            self.assertFalse(token_revocations.is_revoked(decode_token(self.access_token)['jti']))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_query)
+
+        self.assertEqual([], queries)
+
+    def test_expired_revocations_are_forgotten(self):
+        decoded_token = decode_token(self.access_token)
+        token_revocations.revoke(dict(decoded_token, exp=time.time() - 1))
+        token_revocations.revoke(decode_token(self.refresh_token))
+
+        self.assertFalse(token_revocations.is_revoked(decoded_token['jti']))
+        self.assertEqual(1, RevokedTokenModel.query.count())
+
+
+if __name__ == "__main__":
+    unittest.main()
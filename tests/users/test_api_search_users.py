@@ -0,0 +1,126 @@
+import unittest
+from datetime import datetime, timedelta
+
+from flask import json
+from flask_restplus import marshal
+
+from app.api.dao.user import UserDAO
+from app.api.models.user import public_user_api_model
+from app.database.models.mentorship_relation import MentorshipRelationModel
+from app.database.models.tasks_list import TasksListModel
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from app.utils.enum_utils import MentorshipRelationState
+from tests.base_test_case import BaseTestCase
+from tests.test_utils import get_test_request_header
+from tests.test_data import user1, user2
+
+
+class TestSearchUsersApi(BaseTestCase):
+
+    # Setup consists of adding 3 users into the database
+    # User 1 is an available mentor in Lisbon
+    # User 2 needs mentoring in Berlin
+    # User 3 is an available mentor in Lisbon, already in an accepted relation
+    def setUp(self):
+        super(TestSearchUsersApi, self).setUp()
+
+        self.mentor_user = UserModel(
+            name=user1['name'],
+            email=user1['email'],
+            username=user1['username'],
+            password=user1['password'],
+            terms_and_conditions_checked=user1['terms_and_conditions_checked']
+        )
+        self.mentee_user = UserModel(
+            name=user2['name'],
+            email=user2['email'],
+            username=user2['username'],
+            password=user2['password'],
+            terms_and_conditions_checked=user2['terms_and_conditions_checked']
+        )
+        self.busy_mentor_user = UserModel(
+            name='Busy Mentor',
+            email='busy_mentor@email.com',
+            username='busy_mentor',
+            password='busy_mentor_pwd',
+            terms_and_conditions_checked=True
+        )
+
+        self.mentor_user.available_to_mentor = True
+        self.mentor_user.location = 'Lisbon'
+        self.mentor_user.organization = 'Systers'
+        self.mentee_user.need_mentoring = True
+        self.mentee_user.location = 'Berlin'
+        self.busy_mentor_user.available_to_mentor = True
+        self.busy_mentor_user.location = 'Lisbon'
+
+        db.session.add(self.mentor_user)
+        db.session.add(self.mentee_user)
+        db.session.add(self.busy_mentor_user)
+        db.session.commit()
+
+        accepted_relation = MentorshipRelationModel(
+            action_user_id=self.admin_user.id,
+            mentor_user=self.busy_mentor_user,
+            mentee_user=self.admin_user,
+            creation_date=datetime.now().timestamp(),
+            end_date=(datetime.now() + timedelta(weeks=5)).timestamp(),
+            state=MentorshipRelationState.ACCEPTED,
+            notes='',
+            tasks_list=TasksListModel()
+        )
+        db.session.add(accepted_relation)
+        db.session.commit()
+
+    def test_search_users_non_auth(self):
+        expected_response = {'message': 'The authorization token is missing!'}
+        actual_response = self.client.get('/users/search', follow_redirects=True)
+
+        self.assertEqual(401, actual_response.status_code)
+        self.assertEqual(expected_response, json.loads(actual_response.data))
+
+    def test_search_available_mentors_in_location(self):
+        auth_header = get_test_request_header(self.mentee_user.id)
+        expected_response = [marshal(self.mentor_user, public_user_api_model)]
+        actual_response = self.client.get('/users/search?available_to_mentor=true&location=Lisbon',
+                                          follow_redirects=True, headers=auth_header)
+
+        self.assertEqual(200, actual_response.status_code)
+        self.assertEqual(expected_response, json.loads(actual_response.data))
+
+    def test_search_users_by_organization(self):
+        auth_header = get_test_request_header(self.mentee_user.id)
+        expected_response = [marshal(self.mentor_user, public_user_api_model)]
+        actual_response = self.client.get('/users/search?organization=Systers',
+                                          follow_redirects=True, headers=auth_header)
+
+        self.assertEqual(200, actual_response.status_code)
+        self.assertEqual(expected_response, json.loads(actual_response.data))
+
+    def test_search_users_needing_mentoring(self):
+        auth_header = get_test_request_header(self.mentor_user.id)
+        expected_response = [marshal(self.mentee_user, public_user_api_model)]
+        actual_response = self.client.get('/users/search?need_mentoring=true',
+                                          follow_redirects=True, headers=auth_header)
+
+        self.assertEqual(200, actual_response.status_code)
+        self.assertEqual(expected_response, json.loads(actual_response.data))
+
+    def test_search_users_excludes_users_in_accepted_relation(self):
+        result = UserDAO.search_users(self.mentee_user.id)
+        found_ids = [user['id'] for user in result[0]]
+
+        self.assertEqual([self.mentor_user.id], found_ids)
+
+    def test_search_available_mentors_uses_index(self):
+        query = UserDAO.public_users_query(self.mentee_user.id).filter(
+            UserModel.available_to_mentor == True, UserModel.location == 'Lisbon')
+        compiled_query = query.statement.compile(compile_kwargs={'literal_binds': True})
+        query_plan = db.session.execute('EXPLAIN QUERY PLAN %s' % compiled_query).fetchall()
+
+        self.assertIn('ix_users_available_to_mentor_location', str(query_plan))
+
+
+if __name__ == "__main__":
+    unittest.main()
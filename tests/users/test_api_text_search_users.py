@@ -0,0 +1,141 @@
+import unittest
+
+from flask import json
+from flask_restplus import marshal
+
+from app.api.dao.user import UserDAO
+from app.api.models.user import public_user_api_model
+from app.database.full_text_search import USERS_SEARCH_TABLE, ensure_users_index, rebuild_users_index, \
+    search_users_ids
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from tests.base_test_case import BaseTestCase
+from tests.test_utils import get_test_request_header
+from tests.test_data import user1, user2
+
+
+class TestTextSearchUsersApi(BaseTestCase):
+
+    # Setup consists of adding 2 users with profile text into the database
+    # User 1 knows Python and Flask
+    # User 2 is interested in Python
+    def setUp(self):
+        super(TestTextSearchUsersApi, self).setUp()
+
+        self.first_user = UserModel(
+            name=user1['name'],
+            email=user1['email'],
+            username=user1['username'],
+            password=user1['password'],
+            terms_and_conditions_checked=user1['terms_and_conditions_checked']
+        )
+        self.second_user = UserModel(
+            name=user2['name'],
+            email=user2['email'],
+            username=user2['username'],
+            password=user2['password'],
+            terms_and_conditions_checked=user2['terms_and_conditions_checked']
+        )
+
+        self.first_user.bio = 'Backend Python developer'
+        self.first_user.skills = 'Python, Flask'
+        self.second_user.interests = 'Learning Python, gardening, photography and travelling'
+
+        self.first_user.save_to_db()
+        self.second_user.save_to_db()
+
+    def test_text_search_users_non_auth(self):
+        expected_response = {'message': 'The authorization token is missing!'}
+        actual_response = self.client.get('/users/search/text?query=python', follow_redirects=True)
+
+        self.assertEqual(401, actual_response.status_code)
+        self.assertEqual(expected_response, json.loads(actual_response.data))
+
+    def test_text_search_users_ranked(self):
+        auth_header = get_test_request_header(self.admin_user.id)
+        expected_response = [marshal(self.first_user, public_user_api_model),
+                             marshal(self.second_user, public_user_api_model)]
+        actual_response = self.client.get('/users/search/text?query=python',
+                                          follow_redirects=True, headers=auth_header)
+
+        self.assertEqual(200, actual_response.status_code)
+        self.assertEqual(expected_response, json.loads(actual_response.data))
+
+    def test_text_search_users_pages(self):
+        auth_header = get_test_request_header(self.admin_user.id)
+        first_page = self.client.get('/users/search/text?query=python&limit=1',
+                                     follow_redirects=True, headers=auth_header)
+        second_page = self.client.get('/users/search/text?query=python&limit=1&page=2',
+                                      follow_redirects=True, headers=auth_header)
+
+        self.assertEqual([marshal(self.first_user, public_user_api_model)], json.loads(first_page.data))
+        self.assertEqual('2', first_page.headers.get('X-Next-Page'))
+        self.assertEqual([marshal(self.second_user, public_user_api_model)], json.loads(second_page.data))
+        self.assertIsNone(second_page.headers.get('X-Next-Page'))
+
+    def test_text_search_users_by_word_prefix(self):
+        result = UserDAO.search_users_by_text(self.admin_user.id, 'back')
+
+        self.assertEqual([self.first_user.id], [user['id'] for user in result[0]])
+
+    def test_text_search_excludes_current_user(self):
+        result = UserDAO.search_users_by_text(self.first_user.id, 'python')
+
+        self.assertEqual([self.second_user.id], [user['id'] for user in result[0]])
+
+    def test_text_search_ignores_query_syntax(self):
+        result = UserDAO.search_users_by_text(self.admin_user.id, '"python" OR NEAR(')
+
+        self.assertEqual(([], 200, {}), result)
+
+    def test_index_follows_profile_update(self):
+        UserDAO.update_user_profile(self.second_user.id, {'interests': 'Gardening'})
+
+        self.assertEqual([self.first_user.id], search_users_ids('python', limit=10))
+        self.assertEqual([self.second_user.id], search_users_ids('gardening', limit=10))
+
+    def test_index_follows_user_deletion(self):
+        self.first_user.delete_from_db()
+
+        self.assertEqual([self.second_user.id], search_users_ids('python', limit=10))
+
+    def test_rebuild_index(self):
+        # changes that bypass save_to_db are only indexed by a rebuild
+        self.admin_user.bio = 'Python mentor'
+        db.session.commit()
+        self.assertNotIn(self.admin_user.id, search_users_ids('python', limit=10))
+
+        indexed_users_count = rebuild_users_index()
+
+        self.assertEqual(3, indexed_users_count)
+        self.assertIn(self.admin_user.id, search_users_ids('python', limit=10))
+
+    def test_rebuild_index_creates_missing_index(self):
+        # databases created before the index have a users table but no index
+        db.session.execute('DROP TABLE {}'.format(USERS_SEARCH_TABLE))
+        db.session.commit()
+
+        indexed_users_count = rebuild_users_index()
+
+        self.assertEqual(3, indexed_users_count)
+        self.assertEqual([self.first_user.id, self.second_user.id], search_users_ids('python', limit=10))
+
+    def test_ensure_index_indexes_existing_users_when_missing(self):
+        db.session.execute('DROP TABLE {}'.format(USERS_SEARCH_TABLE))
+        db.session.commit()
+
+        ensure_users_index()
+        db.session.commit()
+
+        self.assertEqual([self.first_user.id, self.second_user.id], search_users_ids('python', limit=10))
+
+    def test_ensure_index_keeps_existing_index(self):
+        ensure_users_index()
+        db.session.commit()
+
+        # the users are not indexed twice
+        self.assertEqual([self.first_user.id, self.second_user.id], search_users_ids('python', limit=10))
+
+
+if __name__ == "__main__":
+    unittest.main()
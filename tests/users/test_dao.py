@@ -139,6 +139,16 @@ class TestUserDao(BaseTestCase):
         self.assertEqual(({"message": "You cannot delete your account, since you are the only Admin left."}, 400),
                          dao_result)
 
+    def test_dao_list_users_rows_are_not_user_model_instances(self):
+        db.session.add(UserModel('User2', 'user2', 'test_password', 'user2@email.com', True))
+        db.session.commit()
+
+        page = UserDAO.list_users(1)[0]
+
+        self.assertEqual(['user2'], [row['username'] for row in page])
+        self.assertFalse(any(isinstance(row, UserModel) for row in page))
+        self.assertNotIn('password_hash', page[0])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+from unittest.mock import patch
+
+from app.api.dao.mentor_recommendation import MentorRecommendationDAO
+from app.database.models.mentor_recommendation import MentorRecommendationModel, MentorRecommendationsRunModel
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from tests.base_test_case import BaseTestCase
+from tests.test_data import user1, user2
+
+
+class TestMentorRecommendationsPrecomputation(BaseTestCase):
+
+    # Setup consists of adding 2 users into the database
+    # User 1 needs mentoring in Python
+    # User 2 is an available Python mentor
+    def setUp(self):
+        super(TestMentorRecommendationsPrecomputation, self).setUp()
+        self.app.extensions.pop('mentor_matching_engine', None)
+
+        self.mentee_user = UserModel(
+            name=user1['name'],
+            email=user1['email'],
+            username=user1['username'],
+            password=user1['password'],
+            terms_and_conditions_checked=user1['terms_and_conditions_checked']
+        )
+        self.mentor_user = UserModel(
+            name=user2['name'],
+            email=user2['email'],
+            username=user2['username'],
+            password=user2['password'],
+            terms_and_conditions_checked=user2['terms_and_conditions_checked']
+        )
+
+        self.mentee_user.need_mentoring = True
+        self.mentee_user.interests = 'Python'
+        self.mentor_user.available_to_mentor = True
+        self.mentor_user.skills = 'Python, Flask'
+
+        db.session.add(self.mentee_user)
+        db.session.add(self.mentor_user)
+        db.session.commit()
+
+    def test_precompute_stores_recommendations(self):
+        self.assertEqual(1, MentorRecommendationDAO.precompute_recommendations())
+
+        recommendations = MentorRecommendationModel.query.all()
+        last_run = MentorRecommendationsRunModel.find_last()
+
+        self.assertEqual([(self.mentee_user.id, 0, self.mentor_user.id)],
+                         [(row.mentee_id, row.rank, row.mentor_id) for row in recommendations])
+        self.assertEqual(1, last_run.number_of_mentees)
+
+    def test_recommendations_are_read_from_precomputation(self):
+        MentorRecommendationDAO.precompute_recommendations()
+        MentorRecommendationModel.query.update({'score': 0.125})
+        db.session.commit()
+
+        recommendations, status_code = MentorRecommendationDAO.recommend_mentors(self.mentee_user.id)
+
+        self.assertEqual(200, status_code)
+        self.assertEqual([(self.mentor_user.id, 0.125)],
+                         [(mentor['id'], mentor['score']) for mentor in recommendations])
+
+    def test_recommendations_are_computed_when_profile_changed_after_precomputation(self):
+        MentorRecommendationDAO.precompute_recommendations()
+        MentorRecommendationModel.query.update({'score': 0.125})
+        self.mentee_user.interests = 'Flask, Python'
+        db.session.commit()
+
+        recommendations, status_code = MentorRecommendationDAO.recommend_mentors(self.mentee_user.id)
+
+        self.assertEqual(200, status_code)
+        self.assertEqual(self.mentor_user.id, recommendations[0]['id'])
+        self.assertAlmostEqual(1.0, recommendations[0]['score'], places=5)
+
+    def test_precompute_only_changed_mentees(self):
+        MentorRecommendationDAO.precompute_recommendations()
+        self.assertEqual(0, MentorRecommendationDAO.precompute_recommendations())
+
+        self.mentee_user.location = 'Lisbon'
+        db.session.commit()
+
+        self.assertEqual(1, MentorRecommendationDAO.precompute_recommendations())
+
+    def test_precompute_removes_mentees_no_longer_needing_mentoring(self):
+        MentorRecommendationDAO.precompute_recommendations()
+
+        self.mentee_user.need_mentoring = False
+        db.session.commit()
+        MentorRecommendationDAO.precompute_recommendations()
+
+        self.assertEqual([], MentorRecommendationModel.query.all())
+
+    def test_precompute_all_mentees_when_mentors_changed(self):
+        MentorRecommendationDAO.precompute_recommendations()
+
+        self.mentor_user.skills = 'Java'
+        db.session.commit()
+
+        self.assertEqual(1, MentorRecommendationDAO.precompute_recommendations())
+        self.assertEqual([], MentorRecommendationModel.query.all())
+
+    def test_mentors_fingerprint_ignores_unscored_changes(self):
+        MentorRecommendationDAO.precompute_recommendations()
+
+        self.mentor_user.bio = 'Backend developer'
+        self.mentor_user.is_email_verified = True
+        db.session.commit()
+
+        self.assertEqual(0, MentorRecommendationDAO.precompute_recommendations())
+
+    def test_precompute_all_mentees_keeps_recommendations_until_replaced(self):
+        MentorRecommendationDAO.precompute_recommendations()
+        self.mentor_user.location = 'Lisbon'
+        db.session.commit()
+
+        commits = []
+        original_commit = db.session.commit
+
+        def commit():
+            commits.append([(row.mentee_id, row.mentor_id) for row in MentorRecommendationModel.query.all()])
+            original_commit()
+
+        with patch.object(db.session, 'commit', side_effect=commit):
+            MentorRecommendationDAO.precompute_recommendations()
+
+        # no transaction leaves the mentee without recommendations
+        self.assertEqual([[(self.mentee_user.id, self.mentor_user.id)]] * len(commits), commits)
+
+    def test_matching_engine_of_precomputation_is_used_by_requests(self):
+        MentorRecommendationDAO.precompute_recommendations()
+        self.mentee_user.interests = 'Flask'
+        self.mentee_user.save_to_db()
+
+        with patch.object(MentorRecommendationDAO, 'get_available_mentors') as get_available_mentors:
+            MentorRecommendationDAO.recommend_mentors(self.mentee_user.id)
+
+        # the profile change of the mentee changed the users version, so the mentors are loaded again
+        self.assertEqual(1, get_available_mentors.call_count)
+
+        with patch.object(MentorRecommendationDAO, 'get_available_mentors') as get_available_mentors:
+            MentorRecommendationDAO.recommend_mentors(self.mentee_user.id)
+
+        get_available_mentors.assert_not_called()
+
+    def test_matching_engine_is_built_once_for_same_mentors(self):
+        self.mentee_user.interests = 'Flask'
+        db.session.commit()
+
+        with patch.object(MentorRecommendationDAO, 'build_matching_engine',
+                          wraps=MentorRecommendationDAO.build_matching_engine) as build_matching_engine:
+            MentorRecommendationDAO.recommend_mentors(self.mentee_user.id)
+            MentorRecommendationDAO.recommend_mentors(self.mentee_user.id)
+            self.assertEqual(1, build_matching_engine.call_count)
+
+            self.mentor_user.skills = 'Java'
+            self.mentor_user.save_to_db()
+            recommendations, _ = MentorRecommendationDAO.recommend_mentors(self.mentee_user.id)
+
+            self.assertEqual(2, build_matching_engine.call_count)
+            self.assertEqual([], recommendations)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+from sqlalchemy import event
+
+from app.api.dao.user import UserDAO
+from app.database.models.user import UserModel
+from app.database.sqlalchemy_extension import db
+from tests.base_test_case import BaseTestCase
+from tests.test_data import test_admin_user
+
+
+class TestUserUniquenessDao(BaseTestCase):
+
+    def get_registration_data(self, username, email):
+        return dict(
+            name='User2',
+            username=username,
+            email=email,
+            password='test_password',
+            terms_and_conditions_checked=True
+        )
+
+    def test_dao_create_user_username_taken_in_other_case(self):
+        data = self.get_registration_data(test_admin_user['username'].upper(), 'user2@email.com')
+
+        result = UserDAO.create_user(data)
+
+        self.assertEqual(({"message": "A user with that username already exists"}, 400), result)
+        self.assertEqual(1, UserModel.query.count())
+
+    def test_dao_create_user_email_taken_in_other_case(self):
+        data = self.get_registration_data('user2', test_admin_user['email'].upper())
+
+        result = UserDAO.create_user(data)
+
+        self.assertEqual(({"message": "A user with that email already exists"}, 400), result)
+        self.assertEqual(1, UserModel.query.count())
+
+    def test_dao_create_user_does_not_query_uniqueness(self):
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+        try:
+            UserDAO.create_user(self.get_registration_data('user2', 'user2@email.com'))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_statement)
+
+        # the unique indexes are checked by the insert, without a query before it
+        self.assertFalse([statement for statement in statements if 'WHERE users.username_lower' in statement])
+        self.assertEqual(1, len([statement for statement in statements if statement.startswith('INSERT INTO users ')]))
+
+    def test_dao_find_user_regardless_of_case(self):
+        self.assertEqual(self.admin_user.id, UserModel.find_by_username(test_admin_user['username'].upper()).id)
+        self.assertEqual(self.admin_user.id, UserModel.find_by_email(test_admin_user['email'].upper()).id)
+
+    def test_dao_update_username_taken_in_other_case(self):
+        UserDAO.create_user(self.get_registration_data('user2', 'user2@email.com'))
+        user = UserModel.find_by_username('user2')
+
+        result = UserDAO.update_user_profile(user.id, dict(username=test_admin_user['username'].upper()))
+
+        self.assertEqual(({"message": "That username is already taken by another user."}, 400), result)
+        self.assertEqual('user2', UserModel.find_by_id(user.id).username)
+
+    def test_dao_update_own_username_case(self):
+        result = UserDAO.update_user_profile(self.admin_user.id, dict(username=test_admin_user['username'].upper()))
+
+        self.assertEqual(({"message": "User was updated successfully"}, 200), result)
+        self.assertEqual(test_admin_user['username'].upper(), UserModel.find_by_id(self.admin_user.id).username)
+
+    def test_fill_lowercase_fields_of_users_created_before_them(self):
+        users_table = UserModel.__table__
+        db.session.execute(users_table.update().values(username_lower=None, email_lower=None))
+        db.session.commit()
+        self.assertIsNone(UserModel.find_by_username(test_admin_user['username']))
+
+        filled_users_count = UserModel.fill_lowercase_fields()
+        db.session.commit()
+
+        self.assertEqual(1, filled_users_count)
+        self.assertEqual(self.admin_user.id, UserModel.find_by_username(test_admin_user['username'].upper()).id)
+        self.assertEqual(self.admin_user.id, UserModel.find_by_email(test_admin_user['email'].upper()).id)
+        self.assertEqual(0, UserModel.fill_lowercase_fields())
+
+
+if __name__ == "__main__":
+    unittest.main()
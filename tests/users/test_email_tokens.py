@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import patch
+
+from itsdangerous import TimestampSigner, URLSafeTimedSerializer
+
+from app.api.email_utils import confirm_token, generate_confirmation_token
+from app.api.token_service import PrecomputedKeyTimestampSigner, token_service
+from tests.base_test_case import BaseTestCase
+from tests.test_data import user1
+
+
+class TestEmailTokens(BaseTestCase):
+
+    def tearDown(self):
+        self.app.config['SECURITY_PASSWORD_SALT'] = 'TEST_SECURITY_PWD_SALT'
+        super(TestEmailTokens, self).tearDown()
+
+    def test_tokens_are_compatible_with_serializer(self):
+        serializer = URLSafeTimedSerializer(self.app.config['SECRET_KEY'])
+        salt = self.app.config['SECURITY_PASSWORD_SALT']
+
+        token = generate_confirmation_token(user1['email'])
+
+        self.assertEqual(user1['email'], serializer.loads(token, salt=salt))
+        self.assertEqual(user1['email'], confirm_token(serializer.dumps(user1['email'], salt=salt)))
+
+    def test_precomputed_key_signer_is_compatible_with_signer(self):
+        signer = TimestampSigner('secret key', salt='salt')
+        precomputed_key_signer = PrecomputedKeyTimestampSigner('secret key', salt='salt')
+
+        with patch.object(TimestampSigner, 'get_timestamp', return_value=1500000000):
+            token = signer.sign('value')
+            self.assertEqual(token, precomputed_key_signer.sign('value'))
+            self.assertEqual(b'value', precomputed_key_signer.unsign(token, max_age=60))
+            self.assertEqual(b'value', signer.unsign(precomputed_key_signer.sign('value'), max_age=60))
+
+    def test_signer_is_built_once(self):
+        generate_confirmation_token(user1['email'])
+        serializer_and_signer = token_service.get_serializer_and_signer()
+
+        confirm_token(generate_confirmation_token(user1['email']))
+
+        self.assertIs(serializer_and_signer, token_service.get_serializer_and_signer())
+
+    def test_signer_is_built_again_when_settings_change(self):
+        token = generate_confirmation_token(user1['email'])
+
+        self.app.config['SECURITY_PASSWORD_SALT'] = 'NEW_SECURITY_PWD_SALT'
+
+        self.assertFalse(confirm_token(token))
+        self.assertEqual(user1['email'], confirm_token(generate_confirmation_token(user1['email'])))
+
+    def test_expired_token(self):
+        token = generate_confirmation_token(user1['email'])
+
+        self.assertFalse(confirm_token(token, expiration=-1))
+
+
+if __name__ == "__main__":
+    unittest.main()
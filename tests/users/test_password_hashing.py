@@ -0,0 +1,61 @@
+import unittest
+
+from app.api.dao.user import UserDAO
+from app.database.models.user import UserModel
+from app.utils.password_utils import calibrate_password_hash_iterations, needs_rehash
+from config import TestingConfig
+from tests.base_test_case import BaseTestCase
+from tests.test_data import user1
+
+
+class TestPasswordHashing(BaseTestCase):
+
+    def setUp(self):
+        super(TestPasswordHashing, self).setUp()
+
+        self.user = UserModel(
+            name=user1['name'],
+            email=user1['email'],
+            username=user1['username'],
+            password=user1['password'],
+            terms_and_conditions_checked=user1['terms_and_conditions_checked']
+        )
+        self.user.save_to_db()
+
+    def tearDown(self):
+        self.app.config['PASSWORD_HASH_ITERATIONS'] = TestingConfig.PASSWORD_HASH_ITERATIONS
+        super(TestPasswordHashing, self).tearDown()
+
+    def test_password_hash_uses_configured_settings(self):
+        self.assertTrue(self.user.password_hash.startswith('pbkdf2:sha256:1000$'))
+        self.assertTrue(self.user.check_password(user1['password']))
+        self.assertFalse(needs_rehash(self.user.password_hash))
+
+    def test_authenticate_rehashes_outdated_password_hash(self):
+        self.app.config['PASSWORD_HASH_ITERATIONS'] = 2000
+
+        user = UserDAO.authenticate(user1['username'], user1['password'])
+
+        self.assertEqual(self.user.id, user.id)
+        self.assertTrue(UserModel.find_by_id(self.user.id).password_hash.startswith('pbkdf2:sha256:2000$'))
+        self.assertEqual(self.user.id, UserDAO.authenticate(user1['email'], user1['password']).id)
+
+    def test_authenticate_wrong_password_does_not_rehash(self):
+        self.app.config['PASSWORD_HASH_ITERATIONS'] = 2000
+        password_hash = self.user.password_hash
+
+        self.assertIsNone(UserDAO.authenticate(user1['username'], 'wrong password'))
+        self.assertEqual(password_hash, UserModel.find_by_id(self.user.id).password_hash)
+
+    def test_calibrate_password_hash_iterations(self):
+        iterations = calibrate_password_hash_iterations(0.01, samples=1)
+
+        self.assertGreaterEqual(iterations, 1000)
+
+    def test_calibrate_password_hash_iterations_without_iterations(self):
+        with self.assertRaises(ValueError):
+            calibrate_password_hash_iterations(0.01, method='sha256')
+
+
+if __name__ == "__main__":
+    unittest.main()
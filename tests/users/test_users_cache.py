@@ -0,0 +1,137 @@
+import unittest
+
+from sqlalchemy import event
+
+from app.database.models.user import UserModel, users_cache
+from app.database.sqlalchemy_extension import db
+from config import TestingConfig
+from tests.base_test_case import BaseTestCase
+from tests.test_data import user1
+
+
+class TestUsersCache(BaseTestCase):
+
+    def setUp(self):
+        super(TestUsersCache, self).setUp()
+        self.app.config['USER_CACHE_ENABLED'] = True
+        users_cache.clear()
+
+        self.user = UserModel(
+            name=user1['name'],
+            email=user1['email'],
+            username=user1['username'],
+            password=user1['password'],
+            terms_and_conditions_checked=user1['terms_and_conditions_checked']
+        )
+        self.user.save_to_db()
+        self.user_id = self.user.id
+
+        self.queries = []
+        event.listen(db.engine, 'before_cursor_execute', self.count_query)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self.count_query)
+        for name in ('USER_CACHE_ENABLED', 'USER_CACHE_MAX_SIZE', 'USER_CACHE_TTL'):
+            self.app.config[name] = getattr(TestingConfig, name)
+        users_cache.clear()
+        super(TestUsersCache, self).tearDown()
+
+    def count_query(self, conn, cursor, statement, parameters, context, executemany):
+        self.queries.append(statement)
+
+    def find_in_new_session(self, find, value):
+        db.session.remove()
+        return find(value)
+
+    def test_find_by_id_is_cached_across_sessions(self):
+        first_user = self.find_in_new_session(UserModel.find_by_id, self.user_id)
+        self.queries = []
+        second_user = self.find_in_new_session(UserModel.find_by_id, self.user_id)
+
+        self.assertEqual([], self.queries)
+        self.assertIsNot(first_user, second_user)
+        self.assertIn(second_user, db.session)
+        self.assertEqual(user1['username'], second_user.username)
+        self.assertTrue(second_user.check_password(user1['password']))
+        self.assertEqual({'hits': 1, 'misses': 1, 'size': 1}, users_cache.get_stats())
+
+    def test_cached_user_can_be_updated(self):
+        self.find_in_new_session(UserModel.find_by_id, self.user_id)
+        user = self.find_in_new_session(UserModel.find_by_id, self.user_id)
+
+        user.bio = 'New bio'
+        user.save_to_db()
+        db.session.remove()
+
+        self.assertEqual('New bio', UserModel.query.get(self.user_id).bio)
+
+    def test_cached_lookup_keeps_pending_changes_of_session_user(self):
+        self.find_in_new_session(UserModel.find_by_username, user1['username'])
+        self.find_in_new_session(UserModel.find_by_id, self.user_id)
+        user = self.find_in_new_session(UserModel.find_by_id, self.user_id)
+        self.queries = []
+
+        user.bio = 'New bio'
+
+        self.assertIs(user, UserModel.find_by_id(self.user_id))
+        self.assertIs(user, UserModel.find_by_username(user1['username']))
+        self.assertEqual('New bio', user.bio)
+        self.assertEqual([], self.queries)
+
+    def test_find_by_username_and_email_are_cached(self):
+        self.find_in_new_session(UserModel.find_by_username, user1['username'])
+        self.find_in_new_session(UserModel.find_by_email, user1['email'])
+        self.queries = []
+
+        self.assertEqual(self.user_id, self.find_in_new_session(UserModel.find_by_username, user1['username']).id)
+        self.assertEqual(self.user_id, self.find_in_new_session(UserModel.find_by_email, user1['email']).id)
+        self.assertEqual([], self.queries)
+
+    def test_missing_users_are_not_cached(self):
+        self.assertIsNone(UserModel.find_by_username('new_user'))
+        UserModel('New user', 'new_user', 'password', 'new_user@email.com', True).save_to_db()
+
+        self.assertIsNotNone(self.find_in_new_session(UserModel.find_by_username, 'new_user'))
+
+    def test_save_to_db_invalidates_user(self):
+        self.find_in_new_session(UserModel.find_by_username, user1['username'])
+        user = self.find_in_new_session(UserModel.find_by_id, self.user_id)
+
+        user.username = 'new_username'
+        user.save_to_db()
+
+        self.assertIsNone(self.find_in_new_session(UserModel.find_by_username, user1['username']))
+        self.assertEqual('new_username', self.find_in_new_session(UserModel.find_by_id, self.user_id).username)
+
+    def test_delete_from_db_invalidates_user(self):
+        user = self.find_in_new_session(UserModel.find_by_id, self.user_id)
+
+        user.delete_from_db()
+
+        self.assertIsNone(self.find_in_new_session(UserModel.find_by_id, self.user_id))
+
+    def test_least_recently_used_users_are_evicted(self):
+        self.app.config['USER_CACHE_MAX_SIZE'] = 2
+
+        UserModel.find_by_id(self.user_id)
+        UserModel.find_by_id(self.admin_user.id)
+        UserModel.find_by_id(self.user_id)
+        UserModel.find_by_username(user1['username'])
+
+        self.assertEqual(2, users_cache.get_stats()['size'])
+        self.assertIsNone(users_cache.get(('id', self.admin_user.id)))
+        self.assertIsNotNone(users_cache.get(('id', self.user_id)))
+
+    def test_expired_users_are_loaded_again(self):
+        self.app.config['USER_CACHE_TTL'] = -1
+
+        self.find_in_new_session(UserModel.find_by_id, self.user_id)
+        self.queries = []
+        self.find_in_new_session(UserModel.find_by_id, self.user_id)
+
+        self.assertEqual(1, len(self.queries))
+        self.assertEqual({'hits': 0, 'misses': 2, 'size': 1}, users_cache.get_stats())
+
+
+if __name__ == "__main__":
+    unittest.main()